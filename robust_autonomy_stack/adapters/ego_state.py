@@ -0,0 +1,41 @@
+# Ego state record - fixed-layout structured array filled in place every tick
+# Kept separate from metadrive_adapter so consumers (logger, features) can use
+# the layout without importing MetaDrive.
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+EGO_STATE_DTYPE = np.dtype([
+    ("x", np.float64),
+    ("y", np.float64),
+    ("z", np.float64),
+    ("vx", np.float64),
+    ("vy", np.float64),
+    ("speed", np.float64),
+    ("heading", np.float64),
+    ("steering", np.float64),
+    ("on_lane", np.bool_),
+    ("valid", np.bool_),  # False when there is no ego vehicle
+])
+
+
+def new_ego_record() -> np.ndarray:
+    # 0-d structured array; fields read as record["speed"] and never reallocate
+    return np.zeros((), dtype=EGO_STATE_DTYPE)
+
+
+def ego_record_to_dict(record: np.ndarray, lane_index: Optional[Any] = None) -> Dict[str, Any]:
+    # Nested dict view matching MetaDriveAdapter.get_ego_state()
+    if not record["valid"]:
+        return {}
+    return {
+        "position": {"x": float(record["x"]), "y": float(record["y"]), "z": float(record["z"])},
+        "velocity": {"x": float(record["vx"]), "y": float(record["vy"])},
+        "speed": float(record["speed"]),
+        "heading": float(record["heading"]),
+        "steering": float(record["steering"]),
+        "lane_index": lane_index,
+        "on_lane": bool(record["on_lane"]),
+    }
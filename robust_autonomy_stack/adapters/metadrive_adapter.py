@@ -1,9 +1,18 @@
 # MetaDrive environment adapter - creates and manages MetaDrive simulator instance
 
+import math
 import numpy as np
 import os
-from typing import Dict, Tuple, Optional, Any
-from metadrive import MetaDriveEnv
+import time
+from typing import Dict, List, Tuple, Optional, Any
+
+from robust_autonomy_stack.adapters.ego_state import ego_record_to_dict, new_ego_record
+from robust_autonomy_stack.config.schema import SensorConfig
+from robust_autonomy_stack.sensors.frame_buffer import Frame, FrameRingBuffer
+from robust_autonomy_stack.utils.lazy import lazy_import
+from robust_autonomy_stack.utils.profiling import timed
+
+metadrive = lazy_import("metadrive")  # loads the simulator on the first env build
 
 
 def check_display_available() -> bool:
@@ -42,10 +51,16 @@ def check_display_available() -> bool:
 
 class MetaDriveAdapter:
     # Wraps MetaDrive environment and provides clean interface for autonomy stack
+    # In warm mode the engine is built once and reused: map, seed and traffic density
+    # are switched between episodes with reconfigure()/reset(seed=...) instead of
+    # tearing the engine down
     
-    def __init__(self, config):
+    # Seed range a warm engine is built with, so any scenario seed in it can be reset to
+    WARM_NUM_SCENARIOS = 10000
+    
+    def __init__(self, config, warm: bool = False, sensor_config: Optional[SensorConfig] = None):
         # Initialize MetaDrive environment with given configuration
-        # config can be SimulatorConfig or dict
+        # config can be SimulatorConfig or dict; sensor_config sizes the camera frame ring
         
         if hasattr(config, 'model_dump'):
             # Pydantic model
@@ -55,7 +70,7 @@ class MetaDriveAdapter:
             config_dict = config.dict()
         else:
             # Already a dict
-            config_dict = config
+            config_dict = dict(config)
         
         # Check if rendering is requested but display is not available
         if config_dict.get("use_render", False) and not check_display_available():
@@ -65,7 +80,7 @@ class MetaDriveAdapter:
             config_dict["use_render"] = False
         
         # Map our config to MetaDrive config
-        metadrive_config = {
+        self.metadrive_config = {
             "use_render": config_dict.get("use_render", False),
             "manual_control": config_dict.get("manual_control", False),
             "map": config_dict.get("map_name", "X"),
@@ -73,28 +88,143 @@ class MetaDriveAdapter:
             "num_scenarios": config_dict.get("num_scenarios", 1),
             "traffic_density": config_dict.get("traffic_density", 0.1),
         }
+        self.warm = warm
+        if warm:
+            # Cover a wide seed range starting at 0 so seeds can change without a rebuild
+            self._initial_seed = self.metadrive_config["start_seed"]
+            self.metadrive_config["start_seed"] = 0
+            self.metadrive_config["num_scenarios"] = max(
+                self.WARM_NUM_SCENARIOS, self._initial_seed + 1
+            )
+        else:
+            self._initial_seed = None
         
-        # Try to create environment with rendering, fall back to headless if it fails
+        self.env = None
+        self.current_obs = None
+        self.current_info = None
+        self.num_engine_builds = 0
+        self.build_time_s = 0.0
+        self.last_setup_time_s = 0.0
+        self._pending_setup_s = 0.0
+        
+        # Camera frames: one ring shared by all consumers, allocated on the first frame
+        self.sensor_config = sensor_config if sensor_config is not None else SensorConfig()
+        self.frames: Optional[FrameRingBuffer] = None
+        self.step_count = 0
+        self._tick = 0  # increments on every reset and step, never rewinds
+        self._frame_tick = -1
+        self._ego_record = new_ego_record()
+        self._ego_tick = -1
+        self._vehicle_list: list = []
+        self._vehicles_tick = -1
+        self._build_env()
+    
+    def _build_env(self):
+        # Create the MetaDrive environment from self.metadrive_config
+        # Try with rendering first, fall back to headless if the window can't open
+        start = time.perf_counter()
         try:
-            self.env = MetaDriveEnv(metadrive_config)
-            self.current_obs = None
-            self.current_info = None
+            self.env = metadrive.MetaDriveEnv(dict(self.metadrive_config))
         except Exception as e:
-            if metadrive_config["use_render"] and "window" in str(e).lower():
+            if self.metadrive_config["use_render"] and "window" in str(e).lower():
                 print(f"Warning: Could not open rendering window: {e}")
                 print("Falling back to headless mode (no rendering)")
-                metadrive_config["use_render"] = False
-                self.env = MetaDriveEnv(metadrive_config)
-                self.current_obs = None
-                self.current_info = None
+                self.metadrive_config["use_render"] = False
+                self.env = metadrive.MetaDriveEnv(dict(self.metadrive_config))
             else:
                 raise
+        self.build_time_s = time.perf_counter() - start
+        self._vehicles_tick = -1  # the old engine's vehicles are gone
+        self._pending_setup_s += self.build_time_s
+        self.num_engine_builds += 1
+    
+    def _rebuild_env(self):
+        # Tear down the current engine and build a new one from self.metadrive_config
+        if self.env is not None:
+            try:
+                self.env.close()
+            except:
+                # A half-initialized engine (e.g. failed window) may not close cleanly
+                from metadrive.engine.engine_utils import close_engine
+                try:
+                    close_engine()
+                except:
+                    pass
+            self.env = None
+        self._build_env()
+    
+    def _seed_in_range(self, seed: int) -> bool:
+        start_seed = self.metadrive_config["start_seed"]
+        return start_seed <= seed < start_seed + self.metadrive_config["num_scenarios"]
+    
+    def reconfigure(
+        self,
+        map_name: Optional[str] = None,
+        traffic_density: Optional[float] = None,
+    ):
+        # Switch map and/or traffic density for the next reset() without rebuilding
+        # the engine when possible; the change takes effect on the next reset
+        start = time.perf_counter()
+        needs_rebuild = False
+        
+        if traffic_density is not None and traffic_density != self.metadrive_config["traffic_density"]:
+            self.metadrive_config["traffic_density"] = traffic_density
+            self.env.config.update({"traffic_density": traffic_density})
+            # PG traffic manager caches the density when it is created
+            engine = self.env.engine
+            traffic_manager = getattr(engine, "traffic_manager", None) if engine is not None else None
+            if traffic_manager is not None and hasattr(traffic_manager, "density"):
+                traffic_manager.density = traffic_density
+        
+        if map_name is not None and map_name != self.metadrive_config["map"]:
+            self.metadrive_config["map"] = map_name
+            needs_rebuild = not self._switch_map_in_place(map_name)
         
-    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        self._pending_setup_s += time.perf_counter() - start
+        if needs_rebuild:
+            self._rebuild_env()
+    
+    def _switch_map_in_place(self, map_name: str) -> bool:
+        # Point the map generator at a new block sequence and drop cached maps
+        # Returns False if this MetaDrive build doesn't support it (caller rebuilds)
+        engine = self.env.engine
+        map_manager = getattr(engine, "map_manager", None) if engine is not None else None
+        if map_manager is not None and not hasattr(map_manager, "clear_stored_maps"):
+            return False
+        try:
+            self._update_map_config(map_name)
+            if map_manager is not None:
+                map_manager.clear_stored_maps()
+            return True
+        except Exception as e:
+            print(f"Warning: In-place map switch failed ({e}), rebuilding engine")
+            return False
+    
+    def _update_map_config(self, map_name: str):
+        # Mirror MetaDriveEnv's own "map" -> "map_config" post-processing
+        from metadrive.component.map.base_map import BaseMap
+        from metadrive.component.map.pg_map import MapGenerateMethod
+        
+        map_config = dict(self.env.config["map_config"])
+        map_config[BaseMap.GENERATE_TYPE] = MapGenerateMethod.BIG_BLOCK_SEQUENCE
+        map_config[BaseMap.GENERATE_CONFIG] = map_name
+        self.env.config.update({"map": map_name, "map_config": map_config})
+        
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
         # Reset environment and return initial observation and info
+        # info["setup_time_s"] reports engine build/reconfigure + reset time for this episode
+        if seed is None and self._initial_seed is not None:
+            seed = self._initial_seed
+        self._initial_seed = None
+        
+        start = time.perf_counter()
+        if seed is not None and not self._seed_in_range(seed):
+            # Seed outside the engine's scenario range: this one costs a rebuild
+            self.metadrive_config["start_seed"] = seed
+            self._rebuild_env()
+        
         try:
-            self.current_obs, self.current_info = self.env.reset()
-            return self.current_obs, self.current_info
+            self.current_obs, self.current_info = self.env.reset(seed=seed)
         except Exception as e:
             if "window" in str(e).lower() and self.env.config.get("use_render", False):
                 print(f"\nWarning: Could not open rendering window: {e}")
@@ -102,72 +232,154 @@ class MetaDriveAdapter:
                 print("Falling back to headless mode...\n")
                 
                 # Close and recreate without rendering
-                from metadrive.engine.engine_utils import close_engine
-                try:
-                    close_engine()
-                except:
-                    pass
-                
-                # Get original config and disable rendering
-                config = {
-                    "use_render": False,
-                    "manual_control": False,
-                    "map": self.env.config.get("map", "X"),
-                    "start_seed": self.env.config.get("start_seed", 0),
-                    "num_scenarios": self.env.config.get("num_scenarios", 1),
-                    "traffic_density": self.env.config.get("traffic_density", 0.1),
-                }
-                
-                self.env = MetaDriveEnv(config)
-                self.current_obs, self.current_info = self.env.reset()
-                return self.current_obs, self.current_info
+                self.metadrive_config["use_render"] = False
+                self._rebuild_env()
+                self.current_obs, self.current_info = self.env.reset(seed=seed)
             else:
                 raise
+        
+        self.last_setup_time_s = self._pending_setup_s + (time.perf_counter() - start)
+        self._pending_setup_s = 0.0
+        self.current_info["setup_time_s"] = self.last_setup_time_s
+        self.step_count = 0
+        self._tick += 1
+        return self.current_obs, self.current_info
     
+    @timed("sim_step")
     def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
         # Execute action and return (observation, reward, terminated, truncated, info)
         # action is [steering, throttle/brake] in range [-1, 1]
         obs, reward, terminated, truncated, info = self.env.step(action)
         self.current_obs = obs
         self.current_info = info
+        self.step_count += 1
+        self._tick += 1
         return obs, reward, terminated, truncated, info
     
+    @property
+    def dt(self) -> float:
+        # Simulated seconds per step() (physics step size x decision repeat)
+        config = self.env.config
+        return config.get("physics_world_step_size", 0.02) * config.get("decision_repeat", 5)
+    
+    def get_ego_record(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        # Fast path: ego state in a preallocated EGO_STATE_DTYPE record, filled in place
+        # The vehicle is read at most once per simulator step; repeated calls in the
+        # same step return the cached record (or copy it into out)
+        record = self._ego_record
+        if self._ego_tick != self._tick:
+            self._ego_tick = self._tick
+            vehicle = self.env.agent  # In MetaDrive, agent IS the vehicle
+            if vehicle is None:
+                record["valid"] = False
+            else:
+                pos = vehicle.position
+                velocity = vehicle.velocity
+                vx, vy = velocity[0], velocity[1]
+                # Single tuple assignment fills every field without temporaries
+                record[()] = (
+                    pos[0], pos[1], pos[2] if len(pos) > 2 else 0.0,
+                    vx, vy, math.hypot(vx, vy),
+                    vehicle.heading_theta, vehicle.steering, vehicle.on_lane, True,
+                )
+        if out is not None:
+            out[()] = record
+            return out
+        return record
+    
     def get_ego_state(self) -> Dict[str, Any]:
         # Extract ego vehicle state: position, velocity, heading, etc.
-        
-        if self.env.agent is None:
+        # Compatibility view over get_ego_record(); prefer the record in per-tick code
+        record = self.get_ego_record()
+        if not record["valid"]:
             return {}
-        
-        # In MetaDrive, agent IS the vehicle
+        return ego_record_to_dict(record, self.env.agent.lane_index)
+    
+    def get_lane_index(self) -> Optional[Any]:
+        # MetaDrive lane key of the ego vehicle (None without an ego vehicle)
         vehicle = self.env.agent
+        return None if vehicle is None else vehicle.lane_index
+    
+    def _vehicles(self) -> list:
+        # Ego first, then every other vehicle in engine spawn order (cached per tick;
+        # vehicles only spawn or despawn on reset and step)
+        from metadrive.component.vehicle.base_vehicle import BaseVehicle
         
-        # Get position
-        pos = vehicle.position
-        
-        # Get velocity (m/s)
-        velocity = vehicle.velocity
-        speed = np.linalg.norm([velocity[0], velocity[1]])
-        
-        # Get heading (radians)
-        heading = vehicle.heading_theta
-        
-        # Get steering angle
-        steering = vehicle.steering
-        
-        state = {
-            "position": {"x": float(pos[0]), "y": float(pos[1]), "z": float(pos[2] if len(pos) > 2 else 0.0)},
-            "velocity": {"x": float(velocity[0]), "y": float(velocity[1])},
-            "speed": float(speed),
-            "heading": float(heading),
-            "steering": float(steering),
-            "lane_index": vehicle.lane_index,
-            "on_lane": vehicle.on_lane,
-        }
+        if self._vehicles_tick != self._tick:
+            ego = self.env.agent
+            others = self.env.engine.get_objects(lambda obj: isinstance(obj, BaseVehicle))
+            self._vehicle_list = [ego] + [v for v in others.values() if v is not ego]
+            self._vehicles_tick = self._tick
+        return self._vehicle_list
+    
+    def snapshot_state(self) -> np.ndarray:
+        # Kinematic snapshot of all vehicles, (V, 5) rows of [x, y, heading, vx, vy]
+        # Covers poses and velocities only; traffic policy internals are not captured
+        vehicles = self._vehicles()
+        snapshot = np.empty((len(vehicles), 5))
+        for row, vehicle in enumerate(vehicles):
+            pos, vel = vehicle.position, vehicle.velocity
+            snapshot[row] = (pos[0], pos[1], vehicle.heading_theta, vel[0], vel[1])
+        return snapshot
+    
+    def restore_state(self, snapshot: np.ndarray):
+        # Put vehicles back to a snapshot_state() pose/velocity, matched by spawn order
+        vehicles = self._vehicles()
+        if len(vehicles) != snapshot.shape[0]:
+            raise ValueError(
+                f"Snapshot has {snapshot.shape[0]} vehicles, scene has {len(vehicles)}"
+            )
+        for vehicle, (x, y, heading, vx, vy) in zip(vehicles, snapshot):
+            vehicle.set_position((x, y))
+            vehicle.set_heading_theta(heading)
+            vehicle.set_velocity((vx, vy))
+        # Cached per-step reads are stale now (the vehicle list is not)
+        self._tick += 1
+        self._vehicles_tick = self._tick
+    
+    def set_vehicle_velocity(self, index: int, vx: float, vy: float):
+        # Set one vehicle's velocity; index is its snapshot_state() row
+        vehicles = self._vehicles()
+        if not 0 <= index < len(vehicles):
+            raise IndexError(f"Vehicle {index} out of range for {len(vehicles)} vehicles")
+        vehicles[index].set_velocity((vx, vy))
+        if index == 0:
+            self._ego_tick = -1  # cached ego record is stale
+    
+    def get_lane_centerlines(self, spacing: float = 1.0) -> Tuple[List[str], List[np.ndarray]]:
+        # (lane keys, (K, 2) centerline per lane) for the current map, sampled every
+        # spacing metres from each lane start plus the lane end
+        keys, centerlines = [], []
+        for lane in self.env.current_map.road_network.get_all_lanes():
+            count = max(1, math.ceil(lane.length / spacing))
+            s_values = np.minimum(np.arange(count + 1) * spacing, lane.length)
+            points = np.array([lane.position(s, 0.0)[:2] for s in s_values], dtype=float)
+            keys.append(str(lane.index))
+            centerlines.append(points)
+        return keys, centerlines
+    
+    def get_camera_frame(self) -> Optional[Frame]:
+        # Latest camera frame as a read-only ring-buffer view tagged with id/timestamp
+        # The camera is read at most once per simulator step; later calls in the same
+        # step (segmentation, BEV, logging, video) share that frame without copying
+        if self._frame_tick == self._tick and self.frames is not None:
+            return self.frames.latest()
         
-        return state
+        image = self._perceive_camera()
+        if image is None:
+            return None
+        if self.frames is None or self.frames.shape != image.shape:
+            self.frames = FrameRingBuffer.for_sensor(self.sensor_config, image.shape, image.dtype)
+        self._frame_tick = self._tick
+        return self.frames.write(image, step=self.step_count)
     
     def get_camera_image(self) -> Optional[np.ndarray]:
-        # Get RGB camera image if available
+        # Get RGB camera image if available (read-only view, see get_camera_frame)
+        frame = self.get_camera_frame()
+        return frame.image if frame is not None else None
+    
+    @timed("sensors")
+    def _perceive_camera(self) -> Optional[np.ndarray]:
         # MetaDrive uses sensor manager, check if camera is available
         
         if not hasattr(self.env, 'main_camera') or self.env.main_camera is None:
@@ -0,0 +1,464 @@
+# Shared-memory simulator transport - runs MetaDriveAdapter in its own process
+# Observations (+ ego record and optionally the camera frame) and actions travel
+# through multiprocessing.shared_memory ring buffers of fixed-layout records, so
+# nothing is pickled per step. Each slot carries a seqlock counter (odd while being
+# written); readers copy a slot out and retry if the counter moved, so neither side
+# ever takes a lock. Each observation also carries the kinematic snapshot of every
+# vehicle (up to max_vehicles rows) from the same sim step, so per-tick
+# snapshot_state() reads never leave shared memory. A Pipe is only used for the
+# startup handshake and rare calls (restore, velocity pushes, oversized snapshots).
+#
+# Modes:
+#   lockstep - the simulator steps exactly once per action; deterministic, same
+#              results as an in-process adapter
+#   async    - the simulator steps N+1 (holding the latest action) while the stack
+#              plans on observation N, so actions take effect one step later
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.adapters.ego_state import EGO_STATE_DTYPE
+from robust_autonomy_stack.utils.profiling import timed
+
+
+# Action record commands
+CMD_STEP = 0
+CMD_RESET = 1
+CMD_CLOSE = 2
+
+# Ring header (int64 words): published record count, capacity, consumer cursor
+_HEADER_WORDS = 8
+_H_COUNT, _H_CAPACITY, _H_CONSUMED = 0, 1, 2
+_ALIGN = 64
+
+ACTION_DTYPE = np.dtype([
+    ("command", np.int64),
+    ("seed", np.int64),  # reset seed, -1 for the adapter's default
+    ("action", np.float64, (2,)),
+])
+
+
+# Default snapshot rows carried in each observation record
+DEFAULT_MAX_VEHICLES = 64
+
+
+def observation_dtype(
+    obs_shape: Tuple[int, ...],
+    image_shape: Optional[Tuple[int, ...]],
+    max_vehicles: int = DEFAULT_MAX_VEHICLES,
+) -> np.dtype:
+    # Fixed-layout observation record for one simulator step
+    fields = [
+        ("step", np.int64),  # steps since the last reset
+        ("reward", np.float64),
+        ("terminated", np.bool_),
+        ("truncated", np.bool_),
+        ("crash", np.bool_),
+        ("out_of_road", np.bool_),
+        ("arrive_dest", np.bool_),
+        ("setup_time_s", np.float64),
+        ("applied_action", np.float64, (2,)),  # action this step actually used (zeros on reset)
+        ("obs", np.float32, obs_shape),
+        ("ego", EGO_STATE_DTYPE),
+        ("lane", "U64"),  # str() of the ego lane key, empty without an ego vehicle
+        ("num_vehicles", np.int64),  # may exceed max_vehicles (then only the pipe has them all)
+        ("vehicles", np.float64, (max_vehicles, 5)),  # snapshot_state() rows
+    ]
+    if image_shape is not None:
+        fields.append(("image", np.uint8, image_shape))
+    return np.dtype(fields, align=True)
+
+
+def _backoff(spins: int, deadline: Optional[float], alive) -> bool:
+    # One poll of a ring wait: busy-spin at first, then sleep (0.1 ms, 1 ms once the
+    # wait gets long); False once the deadline passes or alive() reports the writer gone
+    if spins <= 1000:
+        return True
+    time.sleep(0.0001 if spins < 10000 else 0.001)
+    if alive is not None and spins % 100 == 0 and not alive():
+        return False
+    return deadline is None or time.monotonic() <= deadline
+
+
+class ShmRing:
+    # Single-producer ring of records in a shared memory block, with per-slot seqlocks
+
+    def __init__(self, shm: shared_memory.SharedMemory, dtype: np.dtype, capacity: int, owner: bool):
+        self.shm = shm
+        self.dtype = dtype
+        self.capacity = capacity
+        self.owner = owner
+        self.header = np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        self.seqs = np.ndarray((capacity,), dtype=np.int64, buffer=shm.buf, offset=_HEADER_WORDS * 8)
+        offset = self._records_offset(capacity)
+        self.records = np.ndarray((capacity,), dtype=dtype, buffer=shm.buf, offset=offset)
+        # 0-d view per slot, so record["field"] views stay writable arrays
+        self._slots = [self.records[i:i + 1].reshape(()) for i in range(capacity)]
+
+    @staticmethod
+    def _records_offset(capacity: int) -> int:
+        return -(-(_HEADER_WORDS + capacity) * 8 // _ALIGN) * _ALIGN
+
+    @classmethod
+    def create(cls, dtype: np.dtype, capacity: int) -> "ShmRing":
+        size = cls._records_offset(capacity) + dtype.itemsize * capacity
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), dtype, capacity, owner=True)
+        ring.header[:] = 0
+        ring.header[_H_CAPACITY] = capacity
+        ring.seqs[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, dtype: np.dtype) -> "ShmRing":
+        shm = shared_memory.SharedMemory(name=name)
+        capacity = int(np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)[_H_CAPACITY])
+        return cls(shm, dtype, capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def count(self) -> int:
+        # Records published so far (record n lives in slot n % capacity)
+        return int(self.header[_H_COUNT])
+
+    @property
+    def consumed(self) -> int:
+        return int(self.header[_H_CONSUMED])
+
+    def mark_consumed(self, count: int):
+        self.header[_H_CONSUMED] = count
+
+    def publish(self, fill) -> int:
+        # Write the next record in place via fill(record_view); returns its index
+        index = self.count
+        slot = index % self.capacity
+        self.seqs[slot] += 1  # odd: write in progress
+        fill(self._slots[slot])
+        self.seqs[slot] += 1
+        self.header[_H_COUNT] = index + 1
+        return index
+
+    def read(self, index: int, out: np.ndarray, timeout: Optional[float] = None, alive=None) -> bool:
+        # Copy record `index` into out; False if it was overwritten or torn meanwhile
+        # Waits like wait_for() while the slot is mid-write; raises RuntimeError if the
+        # writer stops there (alive() turns False or the timeout passes)
+        slot = index % self.capacity
+        deadline = None if timeout is None else time.monotonic() + timeout
+        spins = 0
+        while True:
+            before = int(self.seqs[slot])
+            if before & 1:
+                spins += 1
+                if not _backoff(spins, deadline, alive):
+                    raise RuntimeError("Ring writer stopped in the middle of a record")
+                continue
+            np.copyto(out, self._slots[slot])
+            if int(self.seqs[slot]) == before:
+                # The slot may already hold a newer record if the writer lapped us
+                return self.count - index <= self.capacity
+
+    def wait_for(self, count: int, timeout: float, alive=None) -> bool:
+        # Spin (then back off) until at least `count` records are published
+        deadline = time.monotonic() + timeout
+        spins = 0
+        while self.count < count:
+            spins += 1
+            if not _backoff(spins, deadline, alive):
+                return False
+        return True
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self.header = self.seqs = self.records = self._slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _publish_observation(
+    record, step, obs, reward, terminated, truncated, info, adapter, with_image, applied_action
+):
+    record["step"] = step
+    record["applied_action"] = applied_action
+    record["reward"] = reward
+    record["terminated"] = terminated
+    record["truncated"] = truncated
+    record["crash"] = bool(info.get("crash") or info.get("crash_vehicle") or info.get("crash_object"))
+    record["out_of_road"] = bool(info.get("out_of_road"))
+    record["arrive_dest"] = bool(info.get("arrive_dest"))
+    record["setup_time_s"] = info.get("setup_time_s", 0.0)
+    record["obs"] = obs
+    adapter.get_ego_record(out=record["ego"])
+    lane = adapter.get_lane_index()
+    record["lane"] = "" if lane is None else str(lane)
+    snapshot = adapter.snapshot_state()
+    rows = min(snapshot.shape[0], record["vehicles"].shape[0])
+    record["num_vehicles"] = snapshot.shape[0]
+    record["vehicles"][:rows] = snapshot[:rows]
+    if with_image:
+        image = adapter.get_camera_image()
+        if image is not None:
+            record["image"] = image
+
+
+def _sim_main(
+    conn,
+    adapter_config: Dict[str, Any],
+    mode: str,
+    with_image: bool,
+    capacity: int,
+    max_vehicles: int,
+):
+    # Simulator process: own the adapter, answer actions from the action ring
+    from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
+
+    adapter = MetaDriveAdapter(adapter_config)
+    obs, info = adapter.reset()
+    image = adapter.get_camera_image() if with_image else None
+    shapes = (np.asarray(obs).shape, None if image is None else image.shape)
+    conn.send(shapes)
+    obs_name, action_name = conn.recv()
+    obs_ring = ShmRing.attach(obs_name, observation_dtype(*shapes, max_vehicles))
+    action_ring = ShmRing.attach(action_name, ACTION_DTYPE)
+    action = np.zeros((), dtype=ACTION_DTYPE)
+    parent = mp.parent_process()
+    client_alive = parent.is_alive if parent is not None else None
+    held = np.zeros(2)
+    handled = 0  # action records processed
+    step = 0
+    episode_over = True  # until the client's first reset
+
+    def publish(obs, reward, terminated, truncated, info):
+        obs_ring.publish(lambda r: _publish_observation(
+            r, step, obs, reward, terminated, truncated, info, adapter, with_image, held))
+
+    try:
+        while True:
+            if conn.poll():
+                # Rare calls over the pipe: ("snapshot",), ("restore", array),
+                # ("velocity", index, vx, vy) or ("dt",); state changes answer with
+                # the new ego record, since the last published one is stale
+                request = conn.recv()
+                if request[0] == "dt":
+                    conn.send(adapter.dt)
+                elif request[0] == "snapshot":
+                    conn.send(adapter.snapshot_state())
+                elif request[0] == "restore":
+                    adapter.restore_state(request[1])
+                    conn.send(adapter.get_ego_record().copy())
+                elif request[0] == "velocity":
+                    adapter.set_vehicle_velocity(*request[1:])
+                    conn.send(adapter.get_ego_record().copy())
+
+            if action_ring.count > handled:
+                if mode == "lockstep":
+                    action_ring.read(handled, action, alive=client_alive)
+                    handled += 1
+                else:
+                    # Latest action wins; commands are never overwritten because the
+                    # client waits for their observation before sending more
+                    handled = action_ring.count
+                    action_ring.read(handled - 1, action, alive=client_alive)
+                command = int(action["command"])
+                if command == CMD_CLOSE:
+                    break
+                if command == CMD_RESET:
+                    seed = int(action["seed"])
+                    obs, info = adapter.reset(seed=None if seed < 0 else seed)
+                    step = 0
+                    held[:] = 0.0
+                    episode_over = False
+                    publish(obs, 0.0, False, False, info)
+                    continue
+                held[:] = action["action"]
+                if mode == "lockstep" or episode_over:
+                    # After the episode ends async mode steps on demand, like lockstep
+                    obs, reward, terminated, truncated, info = adapter.step(held)
+                    step += 1
+                    episode_over = terminated or truncated
+                    publish(obs, reward, terminated, truncated, info)
+                    continue
+
+            if mode == "async" and not episode_over and obs_ring.count <= obs_ring.consumed:
+                # Client has taken the latest observation: run the next step now,
+                # overlapping with its planning, holding the most recent action
+                obs, reward, terminated, truncated, info = adapter.step(held)
+                step += 1
+                episode_over = terminated or truncated
+                publish(obs, reward, terminated, truncated, info)
+                continue
+            time.sleep(0.00005)
+    finally:
+        obs_ring.close()
+        action_ring.close()
+        adapter.close()
+        conn.close()
+
+
+class SimProcess:
+    # Client side: drives a MetaDriveAdapter living in another process
+    # Mirrors the adapter's reset/step/get_ego_record/get_camera_image/close API
+
+    def __init__(
+        self,
+        adapter_config: Dict[str, Any],
+        mode: str = "lockstep",
+        with_image: bool = False,
+        capacity: int = 4,
+        timeout_s: float = 120.0,
+        max_vehicles: int = DEFAULT_MAX_VEHICLES,
+    ):
+        if mode not in ("lockstep", "async"):
+            raise ValueError(f"Unknown transport mode '{mode}' (expected 'lockstep' or 'async')")
+        self.mode = mode
+        self.timeout_s = timeout_s
+        ctx = mp.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=_sim_main,
+            args=(child_conn, adapter_config, mode, with_image, capacity, max_vehicles),
+            daemon=True,
+        )
+        self.proc.start()
+        child_conn.close()
+
+        if not self._conn.poll(timeout_s):
+            self.proc.terminate()
+            raise RuntimeError("Simulator process did not start")
+        obs_shape, image_shape = self._conn.recv()
+        self.obs_ring = ShmRing.create(observation_dtype(obs_shape, image_shape, max_vehicles), capacity)
+        self.action_ring = ShmRing.create(ACTION_DTYPE, capacity)
+        self._conn.send((self.obs_ring.name, self.action_ring.name))
+
+        self.record = np.zeros((), dtype=self.obs_ring.dtype)  # latest observation, copied out
+        self._action = np.zeros((), dtype=ACTION_DTYPE)
+        self._read = 0  # observation records consumed
+        self.dropped = 0  # async: observations skipped because the client fell behind
+        self._dt: Optional[float] = None
+        self._closed = False
+
+    def _send(self, command: int, action=None, seed: Optional[int] = None):
+        def fill(record):
+            record["command"] = command
+            record["seed"] = -1 if seed is None else seed
+            record["action"] = (0.0, 0.0) if action is None else action
+
+        self.action_ring.publish(fill)
+
+    def _next_observation(self, newest: bool):
+        # Wait for an unread observation and copy it into self.record
+        if not self.obs_ring.wait_for(self._read + 1, self.timeout_s, self.proc.is_alive):
+            raise RuntimeError(f"Simulator process stopped responding (exit code {self.proc.exitcode})")
+        index = self.obs_ring.count - 1 if newest else self._read
+        while not self.obs_ring.read(index, self.record, self.timeout_s, self.proc.is_alive):
+            index = self.obs_ring.count - 1  # lapped: skip to the newest record
+        self.dropped += index - self._read
+        self._read = index + 1
+        self.obs_ring.mark_consumed(self._read)
+        return self._unpack()
+
+    def _unpack(self):
+        record = self.record
+        info = {
+            "crash": bool(record["crash"]),
+            "out_of_road": bool(record["out_of_road"]),
+            "arrive_dest": bool(record["arrive_dest"]),
+            "setup_time_s": float(record["setup_time_s"]),
+            "sim_step": int(record["step"]),
+            # async: the held action the simulator used, which is what a recording
+            # must store to replay this step
+            "applied_action": record["applied_action"].copy(),
+        }
+        return record["obs"], float(record["reward"]), bool(record["terminated"]), bool(record["truncated"]), info
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        # Skip anything still in flight from the previous episode
+        self._read = self.obs_ring.count
+        self._send(CMD_RESET, seed=seed)
+        while True:
+            obs, _, _, _, info = self._next_observation(newest=False)
+            if info["sim_step"] == 0:
+                return obs, info
+
+    @timed("sim_step")
+    def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        # lockstep: result of applying `action`; async: the newest observation, from a
+        # step that used an earlier action (action latency of one step)
+        self._send(CMD_STEP, action)
+        return self._next_observation(newest=self.mode == "async")
+
+    def get_ego_record(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is not None:
+            out[()] = self.record["ego"]
+            return out
+        return self.record["ego"]
+
+    def get_lane_index(self) -> Optional[str]:
+        # The lane key as published (its str(), which is how run logs key lanes)
+        lane = str(self.record["lane"])
+        return lane or None
+
+    def get_camera_image(self) -> Optional[np.ndarray]:
+        return self.record["image"] if "image" in self.record.dtype.names else None
+
+    def _call(self, *request):
+        self._conn.send(request)
+        if not self._conn.poll(self.timeout_s):
+            raise RuntimeError("Simulator process did not answer")
+        return self._conn.recv()
+
+    @property
+    def dt(self) -> float:
+        if self._dt is None:
+            self._dt = self._call("dt")
+        return self._dt
+
+    def snapshot_state(self) -> np.ndarray:
+        # Snapshot published with the current observation (same sim step as the ego
+        # record); only scenes with more than max_vehicles vehicles ask over the pipe
+        record = self.record
+        count = int(record["num_vehicles"])
+        if count > record["vehicles"].shape[0]:
+            return self._call("snapshot")
+        return record["vehicles"][:count].copy()
+
+    def restore_state(self, snapshot: np.ndarray):
+        snapshot = np.asarray(snapshot, dtype=np.float64)
+        self.record["ego"] = self._call("restore", snapshot)
+        rows = min(snapshot.shape[0], self.record["vehicles"].shape[0])
+        self.record["num_vehicles"] = snapshot.shape[0]
+        self.record["vehicles"][:rows] = snapshot[:rows]
+
+    def set_vehicle_velocity(self, index: int, vx: float, vy: float):
+        self.record["ego"] = self._call("velocity", int(index), float(vx), float(vy))
+        if index < self.record["vehicles"].shape[0]:
+            self.record["vehicles"][index, 3:5] = (vx, vy)
+
+    def render(self):
+        pass  # The simulator process renders its own window when use_render is set
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._send(CMD_CLOSE)
+            self.proc.join(timeout=10.0)
+        finally:
+            if self.proc.is_alive():
+                self.proc.terminate()
+            self.obs_ring.close()
+            self.action_ring.close()
+            self._conn.close()
+
+    def __enter__(self) -> "SimProcess":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1 @@
+# RL adversary: scenario red-teaming environments and training
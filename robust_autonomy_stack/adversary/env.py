@@ -0,0 +1,183 @@
+# Adversary environment - gymnasium env where the agent perturbs traffic around our stack
+# Each step the adversary pushes (accelerates) the traffic vehicle nearest the ego,
+# then the ego policy drives one tick. The adversary is rewarded when the ego fails
+# (crash / out of road) and for closing time-to-collision, minus a push effort cost.
+# Env instances live one per SubprocVecEnv worker. Each owns a warm MetaDriveAdapter,
+# so episode resets only re-seed the running engine instead of tearing it down, and
+# each worker draws its scenario seeds from its own slice of the seed range.
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from robust_autonomy_stack.config.schema import AdversaryConfig, ScenarioConfig
+from robust_autonomy_stack.evaluation.episode import (
+    FORWARD_ACTION,
+    adapter_config_from_scenario,
+    episode_outcome,
+)
+from robust_autonomy_stack.evaluation.metrics import FAILURE_OUTCOMES, time_to_collision
+
+
+# Observation per nearby agent: ego-frame dx, dy, dvx, dvy and a presence flag
+AGENT_FEATURES = 5
+MIN_TTC_S = 0.1  # caps the 1 / TTC shaping reward
+
+
+def baseline_ego_policy(adapter) -> np.ndarray:
+    # The stack's current driving action (module-level so SubprocVecEnv can pickle it)
+    return FORWARD_ACTION
+
+
+def scenario_seed(base_seed: int, worker_index: int, num_workers: int, episode: int, num_seeds: int) -> int:
+    # Seed of a worker's episode: workers interleave over [base_seed, base_seed + num_seeds)
+    # so no two workers run the same scenario until the range wraps
+    return base_seed + (worker_index + episode * num_workers) % num_seeds
+
+
+class AdversaryEnv(gym.Env):
+    # One ego-vs-adversary episode stream on a warm MetaDrive engine
+
+    metadata = {"render_modes": []}
+
+    def __init__(
+        self,
+        config: AdversaryConfig,
+        scenario: ScenarioConfig,
+        worker_index: int = 0,
+        num_workers: int = 1,
+        ego_policy: Callable[[Any], np.ndarray] = baseline_ego_policy,
+    ):
+        self.config = config
+        self.scenario = scenario
+        self.worker_index = worker_index
+        self.num_workers = num_workers
+        self.ego_policy = ego_policy
+        self.base_seed = scenario.seed if scenario.seed is not None else 0
+
+        k = config.num_nearby_agents
+        self.observation_space = gym.spaces.Box(
+            -np.inf, np.inf, shape=(2 + AGENT_FEATURES * k,), dtype=np.float32
+        )
+        # Push on the nearest vehicle: longitudinal, lateral acceleration in the ego frame
+        self.action_space = gym.spaces.Box(-1.0, 1.0, shape=(2,), dtype=np.float32)
+
+        self.adapter = None  # built on the first reset, inside the worker process
+        self.episodes = 0
+        self.steps = 0
+        self.episode_steps = 0
+        self.seed_in_use: Optional[int] = None
+        self._obs = np.zeros(self.observation_space.shape, dtype=np.float32)
+        self._snapshot: Optional[np.ndarray] = None
+        self._nearest: Optional[int] = None
+
+    def _make_adapter(self):
+        from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
+
+        adapter_config = adapter_config_from_scenario(self.scenario, seed=self.base_seed)
+        return MetaDriveAdapter(adapter_config, warm=True)
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        # Scenario seeds come from this worker's seed stream; passing seed reseeds
+        # np_random and restarts the stream (options={"scenario_seed": s} runs one scenario)
+        super().reset(seed=seed)
+        if seed is not None:
+            self.episodes = 0
+        if self.adapter is None:
+            self.adapter = self._make_adapter()
+        if options and "scenario_seed" in options:
+            self.seed_in_use = int(options["scenario_seed"])
+        else:
+            self.seed_in_use = scenario_seed(
+                self.base_seed, self.worker_index, self.num_workers, self.episodes, self.config.num_seeds
+            )
+        self.episodes += 1
+        self.episode_steps = 0
+        _, info = self.adapter.reset(seed=self.seed_in_use)
+        self._snapshot = self.adapter.snapshot_state()
+        reset_info = {"scenario_seed": self.seed_in_use, "setup_time_s": info.get("setup_time_s", 0.0)}
+        return self._observe(), reset_info
+
+    def _observe(self) -> np.ndarray:
+        # Ego velocity plus the K nearest vehicles, all in the ego frame; remembers the
+        # nearest vehicle's snapshot row as the push target
+        snapshot, obs = self._snapshot, self._obs
+        obs.fill(0.0)
+        ego = snapshot[0]
+        c, s = np.cos(ego[2]), np.sin(ego[2])
+        obs[0] = ego[3] * c + ego[4] * s
+        obs[1] = -ego[3] * s + ego[4] * c
+        self._nearest = None
+        if snapshot.shape[0] < 2:
+            return obs.copy()
+        rel = snapshot[1:, [0, 1, 3, 4]] - ego[[0, 1, 3, 4]]
+        order = np.argsort(rel[:, 0] ** 2 + rel[:, 1] ** 2)[: self.config.num_nearby_agents]
+        self._nearest = int(order[0]) + 1
+        rel = rel[order]
+        agents = obs[2:].reshape(-1, AGENT_FEATURES)
+        agents[: len(order), 0] = rel[:, 0] * c + rel[:, 1] * s
+        agents[: len(order), 1] = -rel[:, 0] * s + rel[:, 1] * c
+        agents[: len(order), 2] = rel[:, 2] * c + rel[:, 3] * s
+        agents[: len(order), 3] = -rel[:, 2] * s + rel[:, 3] * c
+        agents[: len(order), 4] = 1.0
+        return obs.copy()
+
+    def _push(self, action: np.ndarray):
+        # Change the nearest vehicle's velocity by action * max_push_accel * dt (ego frame)
+        if self._nearest is None:
+            return
+        snapshot = self._snapshot
+        heading = snapshot[0, 2]
+        c, s = np.cos(heading), np.sin(heading)
+        dv = np.clip(action, -1.0, 1.0) * self.config.max_push_accel * self.adapter.dt
+        row = snapshot[self._nearest]
+        row[3] += dv[0] * c - dv[1] * s
+        row[4] += dv[0] * s + dv[1] * c
+        self.adapter.set_vehicle_velocity(self._nearest, row[3], row[4])
+
+    def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        action = np.asarray(action, dtype=np.float64)
+        self._push(action)
+        _, _, terminated, truncated, info = self.adapter.step(self.ego_policy(self.adapter))
+        self.steps += 1
+        self.episode_steps += 1
+        self._snapshot = self.adapter.snapshot_state()
+
+        config = self.config
+        reward = -config.effort_cost * float(action @ action)
+        ttc = time_to_collision(self._snapshot)
+        if np.isfinite(ttc):
+            reward += config.ttc_reward_scale / max(ttc, MIN_TTC_S)
+        outcome = episode_outcome(info, terminated, truncated)
+        if outcome in FAILURE_OUTCOMES:
+            reward += config.failure_reward
+            terminated = True
+        if self.episode_steps >= config.max_episode_steps and not terminated:
+            truncated = True
+
+        step_info = {"ego_outcome": outcome, "scenario_seed": self.seed_in_use, "ttc": ttc}
+        return self._observe(), reward, bool(terminated), bool(truncated), step_info
+
+    def close(self):
+        if self.adapter is not None:
+            self.adapter.close()
+            self.adapter = None
+
+
+def make_adversary_env(
+    config: AdversaryConfig,
+    scenario_path: Path,
+    worker_index: int,
+    num_workers: int,
+    ego_policy: Callable[[Any], np.ndarray] = baseline_ego_policy,
+) -> Callable[[], AdversaryEnv]:
+    # Env factory for a VecEnv worker (the scenario is loaded inside the worker)
+    def make() -> AdversaryEnv:
+        scenario = ScenarioConfig.from_yaml(scenario_path)
+        return AdversaryEnv(config, scenario, worker_index, num_workers, ego_policy)
+
+    return make
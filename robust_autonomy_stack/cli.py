@@ -2,15 +2,28 @@
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
 
 def run_scenario(args):
     # Execute a single scenario from YAML config
+    import json
     import numpy as np
     from pathlib import Path
     from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
-    from robust_autonomy_stack.config.schema import ScenarioConfig
+    from robust_autonomy_stack.config.schema import ScenarioConfig, SensorConfig, StackConfig
+    from robust_autonomy_stack.evaluation.episode import adapter_config_from_scenario, episode_outcome
+    from robust_autonomy_stack.evaluation.logger import RunLogger
+    from robust_autonomy_stack.evaluation.metrics import EpisodeMetrics, time_to_collision
+    from robust_autonomy_stack.planning.trajectory_sampler import TrajectorySampler
+    from robust_autonomy_stack.safety.features import FeatureExtractor, logged_signal_names
+    from robust_autonomy_stack.utils.profiling import PROFILER
+    from robust_autonomy_stack.utils.scheduler import TickScheduler
+    from robust_autonomy_stack.utils.replay import Recorder
+    
+    if args.profile or args.trace:
+        PROFILER.enable(trace=bool(args.trace))
     
     print(f"Loading scenario: {args.scenario}")
     
@@ -22,69 +35,225 @@ def run_scenario(args):
         print(f"Error: Scenario file must be YAML (.yaml or .yml)")
         sys.exit(1)
     
-    # Create adapter
-    adapter_config = {
-        "use_render": not args.no_render,  # Render by default unless --no-render specified
-        "manual_control": False,
-        "map_name": scenario.map_type,
-        "start_seed": scenario.seed if scenario.seed is not None else 0,
-        "num_scenarios": 1,
-        "traffic_density": scenario.traffic_density,
-    }
+    # Create adapter (render by default unless --no-render specified)
+    adapter_config = adapter_config_from_scenario(scenario, use_render=not args.no_render)
+    seed = adapter_config["start_seed"]
     
     print(f"Creating environment with map '{scenario.map_type}'...")
-    adapter = MetaDriveAdapter(adapter_config)
+    if args.sim_process:
+        from robust_autonomy_stack.adapters.shm_transport import SimProcess
+        
+        # Simulator in its own process, exchanging steps through shared memory
+        adapter = SimProcess(adapter_config, mode=args.sim_process)
+    else:
+        adapter = MetaDriveAdapter(adapter_config)
     
     # Reset
-    obs, info = adapter.reset()
+    obs, info = adapter.reset(seed=seed)
     print(f"Environment ready. Observation shape: {obs.shape}")
     
+    run_dir = Path(args.output) / f"{scenario.name}_{time.strftime('%Y%m%d_%H%M%S')}"
+    # Raw health signals are logged so training can rebuild the windowed features
+    logged_signals = logged_signal_names()
+    logger = RunLogger(run_dir, feature_names=logged_signals, fmt=args.log_format, dt=adapter.dt)
+    recorder = Recorder(scenario, seed, transport=args.sim_process or "in_process")
+    stack_config = StackConfig()
+    features = FeatureExtractor(stack_config, adapter.dt)
+    sampler = TrajectorySampler(stack_config)
+    metrics = EpisodeMetrics(dt=adapter.dt)
+    signal_row = np.full(len(logged_signals), np.nan, dtype=np.float32)
+    
+    # --realtime paces ticks at the camera rate and counts deadline misses; a planning
+    # overrun cuts the sampled candidate count for the following ticks
+    scheduler = TickScheduler.from_sensor(
+        SensorConfig(), realtime=args.realtime, full_candidates=sampler.num_candidates
+    )
+    
     # Run simple forward controller for now
     print("\nRunning scenario...")
-    for step in range(100):
-        action = np.array([0.0, 0.5])  # Drive forward
-        obs, reward, terminated, truncated, info = adapter.step(action)
-        
-        if (step + 1) % 20 == 0:
-            ego = adapter.get_ego_state()
-            print(f"Step {step+1}: pos=({ego['position']['x']:.1f}, {ego['position']['y']:.1f}), "
-                  f"speed={ego['speed']:.1f} m/s, reward={reward:.3f}")
-        
-        if terminated or truncated:
-            print(f"\nEpisode ended at step {step + 1}")
-            break
+    ego = adapter.get_ego_record()
+    terminated = truncated = False
+    try:
+        for step in range(100):
+            scheduler.begin_tick()
+            with scheduler.stage("planning"):
+                # Candidates are sampled (at the scheduler's current count) but not yet
+                # scored: the forward controller below still drives
+                sampler.sample(
+                    float(ego["x"]), float(ego["y"]), float(ego["heading"]), float(ego["speed"]),
+                    max_candidates=scheduler.max_candidates,
+                )
+            with scheduler.stage("control"):
+                action = np.array([0.0, 0.5])  # Drive forward
+            obs, reward, terminated, truncated, info = adapter.step(action)
+            ego = adapter.get_ego_record()
+            with scheduler.stage("safety"):
+                ttc = time_to_collision(adapter.snapshot_state())
+                signals = {
+                    "min_ttc": ttc,
+                    "speed": float(ego["speed"]),
+                    "steering": float(ego["steering"]),
+                }
+                deadline = scheduler.deadline_features()
+                features.update(signals, deadline)
+                for i, name in enumerate(logged_signals):
+                    signal_row[i] = signals.get(name, deadline.get(name, np.nan))
+            with scheduler.stage("logging"):
+                logger.log_tick(
+                    step, ego, action, reward, info, features=signal_row, lane=adapter.get_lane_index()
+                )
+                recorder.record(info.get("applied_action", action), adapter)
+                metrics.update_tick(ego, ttc)
+            scheduler.end_tick()
+            
+            if (step + 1) % 20 == 0:
+                print(f"Step {step+1}: pos=({ego['x']:.1f}, {ego['y']:.1f}), "
+                      f"speed={ego['speed']:.1f} m/s, reward={reward:.3f}")
+            
+            if terminated or truncated:
+                print(f"\nEpisode ended at step {step + 1}")
+                break
+    finally:
+        # Release the engine and the writer thread before saving, so a failed save
+        # cannot leak them
+        try:
+            logger.close()
+        finally:
+            adapter.close()
+        recorder.save(run_dir)
+    
+    # Per-episode metrics (same summary the benchmark collects per episode)
+    with open(run_dir / "metrics.json", "w") as f:
+        json.dump({"outcome": episode_outcome(info, terminated, truncated), **metrics.to_dict()}, f, indent=2)
     
-    adapter.close()
-    print(f"\nScenario complete. Output saved to: {args.output}")
-    # TODO: Save metrics and replay data
+    print(f"\nScenario complete. Output saved to: {run_dir}")
+    if args.sim_process and adapter.dropped:
+        # Skipped observations also skip their applied actions
+        print(f"Warning: {adapter.dropped} observations were skipped; the recording will not replay exactly")
+    print(scheduler.format_summary())
+    if PROFILER.enabled:
+        print("\nPer-stage latency:")
+        print(PROFILER.format_summary())
+        if args.trace:
+            PROFILER.export_chrome_trace(Path(args.trace))
+            print(f"Trace written to: {args.trace}")
 
 
 def run_benchmark(args):
     # Run full benchmark suite with multiple scenarios
+    from robust_autonomy_stack.config.schema import BenchmarkConfig
+    from robust_autonomy_stack.evaluation.benchmark import run_suite
+    
     print(f"Running benchmark suite: {args.suite}")
-    # TODO: Implement benchmark suite
-    pass
+    suite_path = Path(args.suite)
+    suite = BenchmarkConfig.from_yaml(suite_path)
+    if args.workers is not None:
+        suite.num_workers = args.workers
+    
+    results = run_suite(suite, suite_path.parent, Path(args.output) / suite.name)
+    if not any(r.status == "ok" for r in results):
+        sys.exit(1)
 
 
 def train_risk_model(args):
     # Train the ML model that predicts failure risk
+    import json
+    from robust_autonomy_stack.evaluation.report import find_run_dirs
+    from robust_autonomy_stack.safety import training
+    
     print(f"Training risk model with data: {args.data}")
-    # TODO: Implement risk model training
-    pass
+    data_dir = Path(args.data)
+    output_dir = Path(args.output)
+    if not training.find_shards(data_dir):
+        # A directory of run logs: convert it to feature shards first
+        run_dirs = find_run_dirs(data_dir)
+        if not run_dirs:
+            print(f"Error: no Parquet shards or run logs in {data_dir}")
+            sys.exit(1)
+        data_dir = output_dir / "shards"
+        shards = training.write_feature_shards(run_dirs, data_dir, num_workers=args.workers)
+        print(f"Wrote {len(shards)} feature shards from {len(run_dirs)} runs to {data_dir}")
+    
+    model = training.train_risk_model(
+        data_dir,
+        output_dir,
+        horizon_s=args.horizon,
+        num_rounds=args.rounds,
+        external_memory=not args.in_memory,
+        num_workers=args.workers,
+    )
+    with open(output_dir / training.SUMMARY_FILE) as f:
+        summary = json.load(f)
+    print(f"Labels: {summary['rows']} ticks, {summary['positives']} positive, "
+          f"{summary['shards']} shards ({summary['labels_s']:.1f}s)")
+    print(f"Risk model ({model.num_features} features, {model.horizon_s:g}s horizon) saved to: "
+          f"{output_dir / training.MODEL_FILE}")
 
 
 def train_adversary(args):
     # Train the RL agent that generates adversarial scenarios
+    from robust_autonomy_stack.adversary.training import MODEL_FILE, train_adversary as train
+    from robust_autonomy_stack.config.schema import AdversaryConfig
+    
     print(f"Training adversary with config: {args.config}")
-    # TODO: Implement adversary training
-    pass
+    config_path = Path(args.config)
+    config = AdversaryConfig.from_yaml(config_path)
+    train(config, config_path.parent, Path(args.output), num_envs=args.num_envs, total_timesteps=args.timesteps)
+    print(f"Adversary saved to: {Path(args.output) / MODEL_FILE}")
 
 
 def replay_run(args):
     # Replay a previous run using saved seed and config
+    from robust_autonomy_stack.utils.replay import Replayer, RunRecording, find_recording
+    
     print(f"Replaying run: {args.run_id}")
-    # TODO: Implement replay
-    pass
+    try:
+        path = find_recording(args.run_id, Path(args.runs_dir))
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    recording = RunRecording.load(path)
+    print(f"Scenario '{recording.scenario.name}', seed {recording.seed}, "
+          f"{recording.num_steps} steps, {len(recording.checkpoint_steps)} checkpoints "
+          f"({recording.transport} transport)")
+    
+    replayer = Replayer(recording, render=args.render)
+    try:
+        if args.seek is not None:
+            step = replayer.seek(args.seek, exact=not args.from_checkpoint)
+            ego = replayer.adapter.get_ego_record()
+            print(f"At step {step}: pos=({ego['x']:.2f}, {ego['y']:.2f}), speed={ego['speed']:.2f} m/s")
+            return
+        
+        start = time.perf_counter()
+        result = replayer.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        replayer.close()
+    
+    print(f"Replayed {result.steps} steps in {elapsed:.2f}s ({result.steps / max(elapsed, 1e-9):.0f} steps/s)")
+    if result.exact:
+        print(f"Replay matches recording ({result.checkpoints_checked} checkpoints, "
+              f"max position error {result.max_position_error:.2e} m)")
+    else:
+        print(f"Replay diverged at step {result.divergence_step} "
+              f"(max position error {result.max_position_error:.3f} m)")
+        sys.exit(1)
+
+
+def build_report(args):
+    # Build (or incrementally refresh) the HTML report for a directory of runs
+    from robust_autonomy_stack.evaluation.report import generate_report
+    
+    runs_dir = Path(args.runs_dir)
+    output_dir = Path(args.output) if args.output else runs_dir / "report"
+    path = generate_report(
+        runs_dir,
+        output_dir,
+        save_plots=not args.no_plots,
+        num_workers=args.workers,
+    )
+    print(f"Report written to: {path}")
 
 
 def main():
@@ -101,31 +270,65 @@ def main():
     run_parser.add_argument("--scenario", required=True, help="Path to scenario YAML file")
     run_parser.add_argument("--output", default="runs", help="Output directory for results")
     run_parser.add_argument("--no-render", action="store_true", help="Disable rendering window")
+    run_parser.add_argument("--log-format", choices=["npz", "parquet"], default="npz",
+                            help="Run log chunk format (parquet needs pyarrow)")
+    run_parser.add_argument("--sim-process", choices=["lockstep", "async"], default=None,
+                            help="Run the simulator in a separate process (async overlaps sim and planning)")
+    run_parser.add_argument("--realtime", action="store_true",
+                            help="Run ticks at wall-clock rate (SensorConfig.fps) and report deadline misses")
+    run_parser.add_argument("--profile", action="store_true", help="Print per-stage latency percentiles")
+    run_parser.add_argument("--trace", default=None, help="Write a Chrome trace-event JSON of every tick")
     run_parser.set_defaults(func=run_scenario)
     
     # Benchmark command
     bench_parser = subparsers.add_parser("benchmark", help="Run benchmark suite")
     bench_parser.add_argument("--suite", required=True, help="Path to benchmark suite config")
     bench_parser.add_argument("--output", default="runs/benchmarks", help="Output directory")
+    bench_parser.add_argument("--workers", type=int, default=None, help="Worker processes (overrides suite config)")
     bench_parser.set_defaults(func=run_benchmark)
     
     # Train risk model command
     train_risk_parser = subparsers.add_parser("train-risk", help="Train failure risk model")
-    train_risk_parser.add_argument("--data", required=True, help="Path to feature data (parquet/csv)")
+    train_risk_parser.add_argument("--data", required=True,
+                                   help="Directory of Parquet feature shards (or of run logs to convert)")
     train_risk_parser.add_argument("--output", default="models/risk", help="Model output directory")
+    train_risk_parser.add_argument("--horizon", type=float, default=None,
+                                   help="Failure look-ahead in seconds (default: StackConfig.risk_horizon_s)")
+    train_risk_parser.add_argument("--rounds", type=int, default=200, help="Boosting rounds")
+    train_risk_parser.add_argument("--workers", type=int, default=None,
+                                   help="Processes for shard conversion and labelling (default: CPU count)")
+    train_risk_parser.add_argument("--in-memory", action="store_true",
+                                   help="Keep the quantized training matrix in RAM instead of external memory")
     train_risk_parser.set_defaults(func=train_risk_model)
     
     # Train adversary command
     train_adv_parser = subparsers.add_parser("train-adversary", help="Train RL adversary")
     train_adv_parser.add_argument("--config", required=True, help="Path to adversary config")
     train_adv_parser.add_argument("--output", default="models/adversary", help="Model output directory")
+    train_adv_parser.add_argument("--num-envs", type=int, default=None,
+                                  help="Parallel env workers (default: config num_envs, else CPU count)")
+    train_adv_parser.add_argument("--timesteps", type=int, default=None,
+                                  help="Override total_timesteps from the config")
     train_adv_parser.set_defaults(func=train_adversary)
     
     # Replay command
     replay_parser = subparsers.add_parser("replay", help="Replay a previous run")
-    replay_parser.add_argument("--run-id", required=True, help="Run ID to replay")
+    replay_parser.add_argument("--run-id", required=True, help="Run ID (directory under --runs-dir) or run path")
+    replay_parser.add_argument("--runs-dir", default="runs", help="Directory containing runs")
+    replay_parser.add_argument("--seek", type=int, default=None, help="Jump to this step and report the ego state")
+    replay_parser.add_argument("--from-checkpoint", action="store_true",
+                               help="Seek from the nearest checkpoint (approximate) instead of re-simulating")
+    replay_parser.add_argument("--render", action="store_true", help="Render while replaying")
     replay_parser.set_defaults(func=replay_run)
     
+    # Report command
+    report_parser = subparsers.add_parser("report", help="Build HTML report for saved runs")
+    report_parser.add_argument("--runs-dir", default="runs", help="Directory containing runs")
+    report_parser.add_argument("--output", default=None, help="Report directory (default: <runs-dir>/report)")
+    report_parser.add_argument("--workers", type=int, default=None, help="Processes for rendering figures")
+    report_parser.add_argument("--no-plots", action="store_true", help="Tables only (skip debug plots)")
+    report_parser.set_defaults(func=build_report)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -1,17 +1,17 @@
 # Configuration schemas and loading utilities
+# Names resolve on first access, so importing the package does not load pydantic
 
-from .schema import (
-    SimulatorConfig,
-    SensorConfig,
-    ScenarioConfig,
-    StackConfig,
-    OutputConfig,
-)
+from robust_autonomy_stack.utils.lazy import lazy_exports
 
 __all__ = [
     "SimulatorConfig",
     "SensorConfig",
+    "BEVConfig",
     "ScenarioConfig",
+    "BenchmarkConfig",
+    "AdversaryConfig",
     "StackConfig",
     "OutputConfig",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {name: "schema" for name in __all__})
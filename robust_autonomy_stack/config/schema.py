@@ -3,9 +3,12 @@
 
 from typing import Optional, List, Dict, Any
 from pathlib import Path
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 import yaml
 
+# libyaml's C loader when PyYAML was built with it (several times faster than pure Python)
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class SimulatorConfig(BaseModel):
     # MetaDrive simulator configuration
@@ -24,12 +27,23 @@ class SensorConfig(BaseModel):
     height: int = Field(default=600, description="Image height in pixels")
     fov: float = Field(default=90.0, description="Field of view in degrees")
     fps: int = Field(default=20, description="Frames per second")
+    frame_history_s: float = Field(default=1.0, gt=0.0, description="Camera frame history kept in the ring buffer (s)")
     mount_x: float = Field(default=1.5, description="X offset from vehicle center (forward)")
     mount_y: float = Field(default=0.0, description="Y offset from vehicle center (lateral)")
     mount_z: float = Field(default=2.4, description="Z offset from vehicle center (up)")
     pitch: float = Field(default=-15.0, description="Camera pitch in degrees")
 
 
+class BEVConfig(BaseModel):
+    # Bird's-eye view grid in the vehicle frame (x forward, y left)
+    
+    x_min: float = Field(default=0.0, description="Nearest BEV distance ahead of vehicle center (m)")
+    x_max: float = Field(default=40.0, description="Farthest BEV distance ahead of vehicle center (m)")
+    y_extent: float = Field(default=20.0, gt=0.0, description="BEV half-width to each side (m)")
+    resolution: float = Field(default=0.2, gt=0.0, description="BEV cell size (m)")
+    downsample: int = Field(default=1, ge=1, description="Reduced-resolution factor applied to the cell size")
+
+
 class ScenarioConfig(BaseModel):
     # Defines a test scenario: map, traffic, scripted events, noise
     
@@ -58,7 +72,49 @@ class ScenarioConfig(BaseModel):
     def from_yaml(cls, path: Path) -> "ScenarioConfig":
         # Load and validate scenario from YAML file
         with open(path, 'r') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=SafeLoader)
+        return cls(**data)
+
+
+class BenchmarkConfig(BaseModel):
+    # Benchmark suite: a set of scenario YAMLs run across seeds on a pool of workers
+    
+    name: str = Field(default="benchmark", description="Suite name")
+    scenarios: List[str] = Field(description="Scenario YAML paths or glob patterns (relative to suite file)")
+    seeds: List[int] = Field(default_factory=list, description="Seeds to run each scenario with (empty = scenario seed)")
+    num_workers: Optional[int] = Field(default=None, ge=1, description="Worker processes (default: CPU count)")
+    max_steps: int = Field(default=1000, ge=1, description="Step limit per episode")
+    max_retries: int = Field(default=1, ge=0, description="Times to retry an episode whose worker crashed")
+    
+    @classmethod
+    def from_yaml(cls, path: Path) -> "BenchmarkConfig":
+        # Load and validate benchmark suite from YAML file
+        with open(path, 'r') as f:
+            data = yaml.load(f, Loader=SafeLoader)
+        return cls(**data)
+
+
+class AdversaryConfig(BaseModel):
+    # RL adversary training: the adversary pushes the traffic vehicle nearest the ego
+    
+    scenario: str = Field(description="Scenario YAML the adversary trains on (relative to config file)")
+    num_envs: Optional[int] = Field(default=None, ge=1, description="Parallel env workers (default: CPU count)")
+    num_seeds: int = Field(default=1000, ge=1, description="Scenario seeds cycled through, from the scenario seed")
+    total_timesteps: int = Field(default=1_000_000, ge=1, description="Environment steps to train for")
+    max_episode_steps: int = Field(default=1000, ge=1, description="Step limit per episode")
+    num_nearby_agents: int = Field(default=4, ge=1, description="Nearest traffic vehicles in the observation")
+    max_push_accel: float = Field(default=3.0, gt=0.0, description="Max push acceleration on the nearest vehicle (m/s^2)")
+    failure_reward: float = Field(default=10.0, description="Reward when the ego crashes or leaves the road")
+    ttc_reward_scale: float = Field(default=0.1, ge=0.0, description="Per-step reward scale for 1 / time-to-collision")
+    effort_cost: float = Field(default=0.01, ge=0.0, description="Per-step cost of squared push magnitude")
+    algorithm: str = Field(default="PPO", description="stable-baselines3 algorithm (PPO, A2C, SAC)")
+    algorithm_kwargs: Dict[str, Any] = Field(default_factory=dict, description="Extra algorithm constructor arguments")
+    
+    @classmethod
+    def from_yaml(cls, path: Path) -> "AdversaryConfig":
+        # Load and validate adversary training config from YAML file
+        with open(path, 'r') as f:
+            data = yaml.load(f, Loader=SafeLoader)
         return cls(**data)
 
 
@@ -71,6 +127,27 @@ class StackConfig(BaseModel):
     comfort_weight: float = Field(default=0.5, description="Comfort cost weight")
     legality_weight: float = Field(default=10.0, description="Legality violation cost weight")
     
+    # Trajectory sampling (candidate grid = lateral_offsets x speed_factors)
+    planning_horizon_s: float = Field(default=3.0, gt=0.0, description="Candidate trajectory horizon (s)")
+    planning_dt: float = Field(default=0.1, gt=0.0, description="Candidate trajectory timestep (s)")
+    lateral_offsets: List[float] = Field(
+        default_factory=lambda: [-3.5, -2.625, -1.75, -0.875, 0.0, 0.875, 1.75, 2.625, 3.5],
+        min_length=1,
+        description="Lateral end offsets of candidates relative to ego (m, +left)",
+    )
+    speed_factors: List[float] = Field(
+        default_factory=lambda: [0.0, 0.25, 0.5, 0.75, 1.0, 1.2],
+        min_length=1,
+        description="Candidate end speeds as fractions of target_speed_mps",
+    )
+    lateral_transition_s: float = Field(default=2.0, gt=0.0, description="Time to reach lateral offset (s)")
+    speed_transition_s: float = Field(default=2.0, gt=0.0, description="Time to reach end speed (s)")
+    
+    # Collision checking (vehicle footprint used for ego and, by default, agents)
+    vehicle_length: float = Field(default=4.5, gt=0.0, description="Vehicle footprint length (m)")
+    vehicle_width: float = Field(default=1.9, gt=0.0, description="Vehicle footprint width (m)")
+    collision_margin: float = Field(default=0.3, ge=0.0, description="Safety margin added around footprints (m)")
+    
     # Speed limits
     max_speed_mps: float = Field(default=13.89, description="Max speed (m/s) ~50 km/h")
     target_speed_mps: float = Field(default=11.11, description="Target cruise speed (m/s) ~40 km/h")
@@ -89,6 +166,17 @@ class StackConfig(BaseModel):
     pid_kp: float = Field(default=1.0, description="PID proportional gain")
     pid_ki: float = Field(default=0.1, description="PID integral gain")
     pid_kd: float = Field(default=0.05, description="PID derivative gain")
+    
+    @model_validator(mode="after")
+    def check_planning_steps(self) -> "StackConfig":
+        # Candidates have round(horizon / dt) samples; a horizon shorter than one step
+        # would give empty trajectories
+        if self.planning_horizon_s < self.planning_dt:
+            raise ValueError(
+                f"planning_horizon_s ({self.planning_horizon_s}) must be at least "
+                f"planning_dt ({self.planning_dt})"
+            )
+        return self
 
 
 class OutputConfig(BaseModel):
@@ -1,3 +1,188 @@
 # Bird's-eye view projection - converts camera image to top-down grid
+# The camera intrinsics and mount are fixed per SensorConfig, so the ground-plane
+# homography is constant for a run. Remap tables (BEV cell -> source pixel) are
+# built once per (SensorConfig, BEVConfig) and cached; each frame is then a single
+# cv2.remap, or a NumPy gather with the same tables.
 
-# TODO: Implement BEV projection (Phase 2)
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import BEVConfig, SensorConfig
+from robust_autonomy_stack.utils.lazy import lazy_import
+from robust_autonomy_stack.utils.profiling import timed
+
+cv2 = lazy_import("cv2")
+
+# cv2 interpolation flags (fixed by OpenCV; module constants so defaults need no cv2)
+INTER_NEAREST = 0
+INTER_LINEAR = 1
+
+
+@dataclass
+class RemapTables:
+    # Precomputed per-cell source pixel lookup (all arrays read-only)
+
+    map_x: np.ndarray  # (H_bev, W_bev) float32 source column, -1 where invalid
+    map_y: np.ndarray  # (H_bev, W_bev) float32 source row, -1 where invalid
+    nearest_map: np.ndarray  # cv2 fixed-point map for INTER_NEAREST
+    linear_map1: np.ndarray  # cv2 fixed-point maps + interpolation table for INTER_LINEAR
+    linear_map2: np.ndarray
+    flat_index: np.ndarray  # (H_bev * W_bev,) nearest source pixel for the NumPy gather
+    valid: np.ndarray  # (H_bev, W_bev) bool, cell visible in the image
+    cell_size: float
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.map_x.shape
+
+
+def camera_intrinsics(sensor: SensorConfig) -> Tuple[float, float, float, float]:
+    # Pinhole (fx, fy, cx, cy) from horizontal FOV, square pixels
+    fx = (sensor.width / 2.0) / np.tan(np.radians(sensor.fov) / 2.0)
+    return fx, fx, (sensor.width - 1) / 2.0, (sensor.height - 1) / 2.0
+
+
+def ground_to_pixel(
+    sensor: SensorConfig, x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Project ground points (z=0, vehicle frame) to pixel (u, v); also returns a
+    # mask of points in front of the camera and inside the image
+    fx, fy, cx, cy = camera_intrinsics(sensor)
+    dx = x - sensor.mount_x
+    dy = y - sensor.mount_y
+    dz = -sensor.mount_z
+    pitch = np.radians(sensor.pitch)  # negative = looking down
+    forward = dx * np.cos(pitch) + dz * np.sin(pitch)
+    up = -dx * np.sin(pitch) + dz * np.cos(pitch)
+    right = -dy
+
+    in_front = forward > 1e-3
+    safe_forward = np.where(in_front, forward, 1.0)
+    u = cx + fx * right / safe_forward
+    v = cy - fy * up / safe_forward
+    valid = in_front & (u >= 0) & (u <= sensor.width - 1) & (v >= 0) & (v <= sensor.height - 1)
+    return u, v, valid
+
+
+def bev_cell_centers(bev: BEVConfig) -> Tuple[np.ndarray, np.ndarray, float]:
+    # Vehicle-frame (x, y) of each BEV cell: row 0 is farthest ahead, column 0 is leftmost
+    cell = bev.resolution * bev.downsample
+    rows = int(round((bev.x_max - bev.x_min) / cell))
+    cols = int(round(2.0 * bev.y_extent / cell))
+    xs = bev.x_max - (np.arange(rows) + 0.5) * cell
+    ys = bev.y_extent - (np.arange(cols) + 0.5) * cell
+    grid_x, grid_y = np.meshgrid(xs, ys, indexing="ij")
+    return grid_x, grid_y, cell
+
+
+def _config_key(config) -> Tuple:
+    return tuple(sorted(config.model_dump().items()))
+
+
+@lru_cache(maxsize=8)
+def _build_tables(sensor_key: Tuple, bev_key: Tuple) -> RemapTables:
+    sensor = SensorConfig(**dict(sensor_key))
+    bev = BEVConfig(**dict(bev_key))
+    grid_x, grid_y, cell = bev_cell_centers(bev)
+    u, v, valid = ground_to_pixel(sensor, grid_x, grid_y)
+
+    map_x = np.where(valid, u, -1.0).astype(np.float32)
+    map_y = np.where(valid, v, -1.0).astype(np.float32)
+    # Fixed-point maps remap noticeably faster than float ones
+    nearest_map, _ = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2, nninterpolation=True)
+    linear_map1, linear_map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    # Invalid cells gather pixel 0 and are zeroed through the mask afterwards
+    flat_index = np.where(
+        valid, np.rint(v).astype(np.int64) * sensor.width + np.rint(u).astype(np.int64), 0
+    ).ravel()
+
+    tables = RemapTables(
+        map_x=map_x,
+        map_y=map_y,
+        nearest_map=nearest_map,
+        linear_map1=linear_map1,
+        linear_map2=linear_map2,
+        flat_index=flat_index,
+        valid=valid,
+        cell_size=cell,
+    )
+    for array in (map_x, map_y, nearest_map, linear_map1, linear_map2, flat_index, valid):
+        array.flags.writeable = False
+    return tables
+
+
+def build_remap_tables(sensor: SensorConfig, bev: BEVConfig) -> RemapTables:
+    # Remap tables for a sensor/grid pair (cached: equal configs share one set)
+    return _build_tables(_config_key(sensor), _config_key(bev))
+
+
+class BEVProjector:
+    # Projects camera frames (or per-pixel label maps) onto the BEV grid
+
+    def __init__(
+        self,
+        sensor: SensorConfig,
+        bev: Optional[BEVConfig] = None,
+        backend: str = "cv2",
+    ):
+        if backend not in ("cv2", "numpy"):
+            raise ValueError(f"Unknown BEV backend '{backend}' (expected 'cv2' or 'numpy')")
+        self.sensor = sensor
+        self.bev = bev if bev is not None else BEVConfig()
+        self.backend = backend
+        self.tables = build_remap_tables(sensor, self.bev)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.tables.shape
+
+    @timed("cv")
+    def project(
+        self,
+        image: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        interpolation: int = INTER_NEAREST,
+    ) -> np.ndarray:
+        # image (H, W) or (H, W, C) matching the sensor size; cells outside the view are 0
+        # Use INTER_NEAREST (default) for label maps, INTER_LINEAR for RGB if preferred;
+        # the NumPy backend always samples the nearest pixel
+        # out may be any (H_bev, W_bev[, C]) array of the image dtype; a non-contiguous
+        # one is filled through a temporary
+        if image.shape[:2] != (self.sensor.height, self.sensor.width):
+            raise ValueError(
+                f"Image shape {image.shape[:2]} does not match sensor "
+                f"({self.sensor.height}, {self.sensor.width})"
+            )
+        tables = self.tables
+        shape = tables.shape + image.shape[2:]
+        if out is not None:
+            if out.shape != shape or out.dtype != image.dtype:
+                raise ValueError(f"out must be a {shape} {image.dtype} array, got {out.shape} {out.dtype}")
+            if not out.flags.c_contiguous:
+                out[...] = self.project(image, interpolation=interpolation)
+                return out
+
+        if self.backend == "cv2":
+            if interpolation == INTER_NEAREST:
+                map1, map2 = tables.nearest_map, None
+            else:
+                map1, map2 = tables.linear_map1, tables.linear_map2
+            return cv2.remap(
+                image,
+                map1,
+                map2,
+                interpolation,
+                dst=out,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=0,
+            )
+
+        flat = image.reshape(self.sensor.height * self.sensor.width, *image.shape[2:])
+        if out is None:
+            out = np.empty(shape, dtype=image.dtype)
+        np.take(flat, tables.flat_index, axis=0, out=out.reshape(-1, *image.shape[2:]))
+        out[~tables.valid] = 0
+        return out
@@ -0,0 +1,316 @@
+# Parallel benchmark runner - fans scenario x seed episodes out across worker processes
+# Each worker owns one long-lived warm MetaDriveAdapter (MetaDrive allows one engine per process)
+
+import glob
+import json
+import multiprocessing as mp
+import multiprocessing.connection
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from robust_autonomy_stack.config.schema import BenchmarkConfig, ScenarioConfig
+from robust_autonomy_stack.evaluation.episode import (
+    EpisodeResult,
+    adapter_config_from_scenario,
+    run_episode,
+)
+from robust_autonomy_stack.evaluation.metrics import SuiteMetrics
+from robust_autonomy_stack.scenarios.yaml_loader import load_scenarios
+
+
+@dataclass
+class EpisodeTask:
+    # One unit of work sent to a worker
+
+    index: int
+    scenario: Dict[str, Any]  # ScenarioConfig.model_dump() - plain dict pickles cheaply
+    seed: int
+    max_steps: int
+    attempts: int = 0
+
+
+def expand_suite(
+    suite: BenchmarkConfig, suite_dir: Path, scenario_cache_dir: Optional[Path] = None
+) -> List[EpisodeTask]:
+    # Resolve scenario globs and cross them with seeds into a flat task list
+    # scenario_cache_dir opts in to the cached ScenarioCorpus index (see load_scenarios)
+    paths: List[Path] = []
+    for pattern in suite.scenarios:
+        full = pattern if os.path.isabs(pattern) else str(suite_dir / pattern)
+        matches = sorted(glob.glob(full))
+        if not matches:
+            raise FileNotFoundError(f"No scenario files match '{pattern}'")
+        paths.extend(Path(m) for m in matches)
+
+    tasks = []
+    for scenario in load_scenarios(paths, cache_dir=scenario_cache_dir):
+        seeds = suite.seeds or [scenario.seed if scenario.seed is not None else 0]
+        for seed in seeds:
+            tasks.append(EpisodeTask(
+                index=len(tasks),
+                scenario=scenario.model_dump(),
+                seed=seed,
+                max_steps=suite.max_steps,
+            ))
+    return tasks
+
+
+def _task_result(task: EpisodeTask, worker_id: Optional[int]) -> EpisodeResult:
+    return EpisodeResult(
+        index=task.index,
+        scenario=task.scenario["name"],
+        map_type=task.scenario["map_type"],
+        seed=task.seed,
+        worker_id=worker_id,
+        attempts=task.attempts,
+    )
+
+
+def _worker_main(worker_id: int, conn, use_render: bool):
+    # Worker loop: keep one warm adapter alive and run tasks until a None sentinel arrives
+    from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
+
+    adapter = None
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+
+            result = _task_result(task, worker_id)
+            try:
+                scenario = ScenarioConfig(**task.scenario)
+                if adapter is None:
+                    config = adapter_config_from_scenario(scenario, task.seed, use_render)
+                    adapter = MetaDriveAdapter(config, warm=True)
+                else:
+                    adapter.reconfigure(
+                        map_name=scenario.map_type,
+                        traffic_density=scenario.traffic_density,
+                    )
+                run_episode(adapter, result, task.max_steps)
+            except Exception as e:
+                result.status = "error"
+                result.outcome = "none"
+                result.error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+            conn.send(result)
+    finally:
+        if adapter is not None:
+            adapter.close()
+        conn.close()
+
+
+class BenchmarkRunner:
+    # Runs episode tasks on a pool of worker processes and streams results back
+    # Each worker has its own pipe and gets one task at a time, so the parent always
+    # knows which episode a crashed worker was running and a dying worker can't
+    # wedge a lock shared with the others
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        use_render: bool = False,
+        max_retries: int = 1,
+        poll_interval_s: float = 0.5,
+    ):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.use_render = use_render
+        self.max_retries = max_retries
+        self.poll_interval_s = poll_interval_s
+        # spawn: workers must not inherit any Panda3D/engine state from the parent
+        self._ctx = mp.get_context("spawn")
+        self._workers: Dict[int, Any] = {}
+        self._conns: Dict[int, Any] = {}
+        self._inflight: Dict[int, Optional[EpisodeTask]] = {}
+        self._worker_map: Dict[int, str] = {}
+        self._next_worker_id = 0
+
+    def _spawn_worker(self) -> int:
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, self.use_render),
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+        self._workers[worker_id] = proc
+        self._conns[worker_id] = parent_conn
+        self._inflight[worker_id] = None
+        return worker_id
+
+    def _dispatch(self, worker_id: int, pending: List[EpisodeTask]):
+        if not pending:
+            self._inflight[worker_id] = None
+            return
+        task = pending.pop(self._pick_task(worker_id, pending))
+        self._worker_map[worker_id] = task.scenario["map_type"]
+        task.attempts += 1
+        self._inflight[worker_id] = task
+        self._conns[worker_id].send(task)
+
+    def _pick_task(self, worker_id: int, pending: List[EpisodeTask]) -> int:
+        # Prefer the next task on the map this worker's engine already has loaded
+        current_map = self._worker_map.get(worker_id)
+        if current_map is not None:
+            for i in range(len(pending) - 1, -1, -1):
+                if pending[i].scenario["map_type"] == current_map:
+                    return i
+        return len(pending) - 1
+
+    def _retire(self, worker_id: int):
+        self._workers.pop(worker_id)
+        self._conns.pop(worker_id).close()
+        self._inflight.pop(worker_id)
+        self._worker_map.pop(worker_id, None)
+
+    def run(self, tasks: List[EpisodeTask]) -> Iterator[EpisodeResult]:
+        # Yield one EpisodeResult per task, in completion order
+        # pending is used as a stack, so reverse to start with the first task
+        pending = list(reversed(tasks))
+        remaining = len(tasks)
+
+        try:
+            for _ in range(min(self.num_workers, len(pending))):
+                self._dispatch(self._spawn_worker(), pending)
+
+            while remaining > 0:
+                by_handle = {conn: wid for wid, conn in self._conns.items()}
+                by_handle.update({proc.sentinel: wid for wid, proc in self._workers.items()})
+                ready = mp.connection.wait(list(by_handle), timeout=self.poll_interval_s)
+
+                for handle in ready:
+                    worker_id = by_handle[handle]
+                    if worker_id not in self._workers or handle is not self._conns[worker_id]:
+                        continue
+                    try:
+                        result = self._conns[worker_id].recv()
+                    except (EOFError, OSError):
+                        # Pipe closed mid-episode: the worker died, reaped below
+                        continue
+                    self._dispatch(worker_id, pending)
+                    remaining -= 1
+                    yield result
+
+                for crashed in self._reap_crashed(pending):
+                    remaining -= 1
+                    yield crashed
+        finally:
+            self._shutdown()
+
+    def _reap_crashed(self, pending: List[EpisodeTask]) -> List[EpisodeResult]:
+        # Replace dead workers; retry or fail the episode each one was running
+        # Returns results that are final (late results and episodes out of retries)
+        final = []
+        for worker_id, proc in list(self._workers.items()):
+            if proc.is_alive():
+                continue
+            task = self._inflight.get(worker_id)
+            exitcode = proc.exitcode
+            finished = self._drain(worker_id)
+            self._retire(worker_id)
+            if finished is not None:
+                # Worker sent its result before exiting
+                final.append(finished)
+                task = None
+            if task is None:
+                if pending:
+                    self._dispatch(self._spawn_worker(), pending)
+                continue
+
+            if task.attempts <= self.max_retries:
+                pending.append(task)
+            else:
+                result = _task_result(task, worker_id)
+                result.status = "crashed"
+                result.outcome = "none"
+                result.error = f"Worker {worker_id} exited with code {exitcode}"
+                final.append(result)
+
+            if pending:
+                self._dispatch(self._spawn_worker(), pending)
+        return final
+
+    def _drain(self, worker_id: int) -> Optional[EpisodeResult]:
+        # Read a result still buffered in a dead worker's pipe, if any
+        conn = self._conns[worker_id]
+        try:
+            if conn.poll():
+                return conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def _shutdown(self):
+        for conn in self._conns.values():
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        deadline = time.monotonic() + 10.0
+        for proc in self._workers.values():
+            proc.join(timeout=max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns.values():
+            conn.close()
+        self._workers.clear()
+        self._conns.clear()
+        self._inflight.clear()
+        self._worker_map.clear()
+
+
+def run_suite(
+    suite: BenchmarkConfig,
+    suite_dir: Path,
+    output_dir: Path,
+    use_render: bool = False,
+    scenario_cache_dir: Optional[Path] = None,
+) -> List[EpisodeResult]:
+    # Run a whole suite, streaming results to <output_dir>/results.jsonl as they finish
+    # Metrics are merged as episodes arrive and written to <output_dir>/metrics.json
+    tasks = expand_suite(suite, suite_dir, scenario_cache_dir)
+    runner = BenchmarkRunner(
+        num_workers=suite.num_workers,
+        use_render=use_render,
+        max_retries=suite.max_retries,
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = output_dir / "results.jsonl"
+
+    print(f"Running {len(tasks)} episodes on {min(runner.num_workers, len(tasks))} workers")
+    start = time.perf_counter()
+    results = []
+    metrics = SuiteMetrics()
+    with open(results_path, "w") as f:
+        for result in runner.run(tasks):
+            results.append(result)
+            metrics.add_episode(result)
+            f.write(json.dumps(result.to_dict()) + "\n")
+            f.flush()
+            print(f"[{len(results)}/{len(tasks)}] {result.scenario} seed={result.seed}: "
+                  f"{result.status}/{result.outcome} steps={result.steps} "
+                  f"({result.wall_time_s:.1f}s, setup {result.setup_time_s:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    ok = sum(r.status == "ok" for r in results)
+    successes = sum(r.success for r in results)
+    print(f"\nSuite '{suite.name}' finished in {elapsed:.1f}s: "
+          f"{ok}/{len(results)} completed, {successes} reached destination")
+    if ok:
+        setup = sum(r.setup_time_s for r in results if r.status == "ok") / ok
+        print(f"Mean per-episode setup time: {setup:.2f}s")
+    summary = metrics.summary()
+    if summary["success_rate"] is not None:
+        print(f"Success rate: {summary['success_rate']:.1%}, failure rate: {summary['failure_rate']:.1%}")
+    with open(output_dir / "metrics.json", "w") as f:
+        json.dump({"summary": summary, "aggregate": metrics.to_dict()}, f, indent=2)
+    print(f"Results written to: {results_path}")
+    results.sort(key=lambda r: r.index)
+    return results
@@ -0,0 +1,103 @@
+# Single-episode execution - shared by the run, benchmark and worker code paths
+
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import ScenarioConfig
+from robust_autonomy_stack.evaluation.metrics import EpisodeMetrics, time_to_collision
+
+
+# Baseline action used until the full planning/control stack is wired in
+FORWARD_ACTION = np.array([0.0, 0.5])
+
+
+def adapter_config_from_scenario(
+    scenario: ScenarioConfig, seed: Optional[int] = None, use_render: bool = False
+) -> Dict[str, Any]:
+    # Build MetaDriveAdapter config dict for a scenario (seed overrides scenario.seed)
+    if seed is None:
+        seed = scenario.seed if scenario.seed is not None else 0
+    return {
+        "use_render": use_render,
+        "manual_control": False,
+        "map_name": scenario.map_type,
+        "start_seed": seed,
+        "num_scenarios": 1,
+        "traffic_density": scenario.traffic_density,
+    }
+
+
+@dataclass
+class EpisodeResult:
+    # Outcome of one scenario x seed episode
+
+    index: int
+    scenario: str
+    map_type: str
+    seed: int
+    status: str = "ok"  # ok, error, crashed
+    outcome: str = "max_steps"  # arrive_dest, crash, out_of_road, terminated, truncated, max_steps, none
+    steps: int = 0
+    total_reward: float = 0.0
+    wall_time_s: float = 0.0
+    setup_time_s: float = 0.0  # engine build/reconfigure + reset, reported by the adapter
+    worker_id: Optional[int] = None
+    attempts: int = 1
+    error: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        return self.status == "ok" and self.outcome == "arrive_dest"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["success"] = self.success
+        return data
+
+
+def episode_outcome(info: Dict[str, Any], terminated: bool, truncated: bool) -> str:
+    # Classify why an episode ended from the MetaDrive info dict
+    if info.get("arrive_dest"):
+        return "arrive_dest"
+    if info.get("crash") or info.get("crash_vehicle") or info.get("crash_object"):
+        return "crash"
+    if info.get("out_of_road"):
+        return "out_of_road"
+    if terminated:
+        return "terminated"
+    if truncated:
+        return "truncated"
+    return "max_steps"
+
+
+def run_episode(
+    adapter,
+    result: EpisodeResult,
+    max_steps: int,
+    policy: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> EpisodeResult:
+    # Reset the adapter and drive one episode, filling in result in place
+    # Tick-level metrics are summarised in result.extra["metrics"] (EpisodeMetrics.to_dict())
+    start = time.perf_counter()
+    obs, info = adapter.reset(seed=result.seed)
+    result.setup_time_s = float(info.get("setup_time_s", 0.0))
+    metrics = EpisodeMetrics(dt=adapter.dt)
+    terminated = truncated = False
+
+    for step in range(max_steps):
+        action = policy(obs) if policy is not None else FORWARD_ACTION
+        obs, reward, terminated, truncated, info = adapter.step(action)
+        result.steps = step + 1
+        result.total_reward += float(reward)
+        metrics.update_tick(adapter.get_ego_record(), time_to_collision(adapter.snapshot_state()))
+        if terminated or truncated:
+            break
+
+    result.outcome = episode_outcome(info, terminated, truncated)
+    result.extra["metrics"] = metrics.to_dict()
+    result.wall_time_s = time.perf_counter() - start
+    return result
@@ -1,3 +1,279 @@
 # Run logging utilities - saves features, metrics, videos during execution
+# Per-tick data goes into preallocated column buffers (one NumPy array per column).
+# Full chunks are handed to a background writer thread that flushes them to .npz
+# or Parquet, so the control loop never touches the disk. Memory is bounded by a
+# fixed pool of chunk buffers; if the writer falls behind, log_tick() waits for a
+# free buffer and the stall is counted. The ego lane is logged as an int32 id into a
+# string table stored in the metadata (-1 when unknown).
 
-# TODO: Implement logger (Phase 7)
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from robust_autonomy_stack.adapters.ego_state import EGO_STATE_DTYPE
+
+
+# Columns every run log has, in order
+BASE_COLUMNS = {
+    "step": np.int32,
+    "time_s": np.float64,
+    "action_steer": np.float32,
+    "action_throttle": np.float32,
+    "reward": np.float32,
+    "crash": np.bool_,
+    "out_of_road": np.bool_,
+    "arrive_dest": np.bool_,
+}
+
+# Ego state columns: every EGO_STATE_DTYPE field except the validity flag
+EGO_FIELDS = tuple(name for name in EGO_STATE_DTYPE.names if name != "valid")
+EGO_COLUMNS = {f"ego_{name}": EGO_STATE_DTYPE.fields[name][0] for name in EGO_FIELDS}
+# Ego lane: index into the "lanes" table of the log metadata
+EGO_COLUMNS["ego_lane_id"] = np.int32
+
+META_FILE = "log_meta.json"
+
+
+def _ego_values(ego) -> tuple:
+    # Column values from an EGO_STATE_DTYPE record, or from the legacy nested dict
+    if isinstance(ego, np.ndarray):
+        if not ego["valid"]:
+            return (np.nan,) * (len(EGO_FIELDS) - 1) + (False,)
+        return ego[()].item()[:len(EGO_FIELDS)]
+    if not ego:
+        return (np.nan,) * (len(EGO_FIELDS) - 1) + (False,)
+    position, velocity = ego["position"], ego["velocity"]
+    return (
+        position["x"], position["y"], position["z"],
+        velocity["x"], velocity["y"],
+        ego["speed"], ego["heading"], ego["steering"], ego["on_lane"],
+    )
+
+
+def lane_names(run_dir: Path) -> List[str]:
+    # String table for a run log's ego_lane_id column
+    with open(Path(run_dir) / META_FILE) as f:
+        return json.load(f).get("lanes", [])
+
+
+class RunLogger:
+    # Columnar, chunked per-tick logger with a background writer thread
+
+    def __init__(
+        self,
+        run_dir: Path,
+        feature_names: Sequence[str] = (),
+        chunk_rows: int = 1024,
+        max_pending_chunks: int = 4,
+        fmt: str = "npz",
+        dt: Optional[float] = None,
+    ):
+        # fmt: "npz" (always available) or "parquet" (needs pyarrow)
+        # dt: simulated seconds per tick, recorded in the metadata for feature extraction
+        if fmt not in ("npz", "parquet"):
+            raise ValueError(f"Unknown log format '{fmt}' (expected 'npz' or 'parquet')")
+        if fmt == "parquet":
+            import pyarrow  # noqa: F401 - fail now rather than on the writer thread
+
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.feature_names = list(feature_names)
+        self.dt = dt
+
+        self.columns: Dict[str, np.dtype] = {}
+        self.columns.update(BASE_COLUMNS)
+        self.columns.update(EGO_COLUMNS)
+        for name in self.feature_names:
+            self.columns[f"feat_{name}"] = np.float32
+
+        # Fixed pool of chunk buffers: one being filled, the rest free or queued to write
+        self._free: "queue.Queue[Dict[str, np.ndarray]]" = queue.Queue()
+        for _ in range(max_pending_chunks + 1):
+            self._free.put(self._new_chunk())
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._chunk = self._free.get()
+        self._row = 0
+        self._num_chunks = 0
+        self._start = time.monotonic()
+        self._closed = False
+        self._lane_ids: Dict[str, int] = {}
+
+        # Stats
+        self.rows_logged = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self.stalls = 0
+        self.stall_time_s = 0.0
+        self.write_error: Optional[BaseException] = None
+
+        self._writer = threading.Thread(target=self._write_loop, name="run-logger", daemon=True)
+        self._writer.start()
+
+    def _new_chunk(self) -> Dict[str, np.ndarray]:
+        return {name: np.zeros(self.chunk_rows, dtype=dtype) for name, dtype in self.columns.items()}
+
+    def log_tick(
+        self,
+        step: int,
+        ego_state,
+        action: Sequence[float],
+        reward: float,
+        info: Optional[Dict[str, Any]] = None,
+        features: Optional[Sequence[float]] = None,
+        lane: Optional[Any] = None,
+    ):
+        # Append one row; ego_state is an EGO_STATE_DTYPE record (or the legacy dict,
+        # whose lane_index is used when lane is not given), features are ordered like
+        # feature_names (NaN when omitted), lane is any hashable lane key
+        if self._closed:
+            raise RuntimeError("RunLogger is closed")
+        chunk, row = self._chunk, self._row
+        info = info or {}
+        chunk["step"][row] = step
+        chunk["time_s"][row] = time.monotonic() - self._start
+        chunk["action_steer"][row] = action[0]
+        chunk["action_throttle"][row] = action[1]
+        chunk["reward"][row] = reward
+        chunk["crash"][row] = bool(info.get("crash") or info.get("crash_vehicle") or info.get("crash_object"))
+        chunk["out_of_road"][row] = bool(info.get("out_of_road"))
+        chunk["arrive_dest"][row] = bool(info.get("arrive_dest"))
+        for name, value in zip(EGO_COLUMNS, _ego_values(ego_state)):
+            chunk[name][row] = value
+        if lane is None and isinstance(ego_state, dict):
+            lane = ego_state.get("lane_index")
+        chunk["ego_lane_id"][row] = -1 if lane is None else self._lane_id(lane)
+        # Chunk buffers are reused, so every feature column is written on every row
+        if features is not None:
+            for name, value in zip(self.feature_names, features):
+                chunk[f"feat_{name}"][row] = value
+        else:
+            for name in self.feature_names:
+                chunk[f"feat_{name}"][row] = np.nan
+
+        self._row += 1
+        self.rows_logged += 1
+        if self._row == self.chunk_rows:
+            self._hand_off()
+
+    def _lane_id(self, lane: Any) -> int:
+        key = str(lane)
+        lane_id = self._lane_ids.get(key)
+        if lane_id is None:
+            lane_id = self._lane_ids[key] = len(self._lane_ids)
+        return lane_id
+
+    def _hand_off(self):
+        # Queue the filled chunk for writing and switch to a free buffer
+        if self._row == 0:
+            return
+        self._pending.put((self._num_chunks, self._chunk, self._row))
+        self._num_chunks += 1
+        try:
+            self._chunk = self._free.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter()
+            self.stalls += 1
+            self._chunk = self._free.get()
+            self.stall_time_s += time.perf_counter() - start
+        self._row = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            index, chunk, rows = item
+            try:
+                self.bytes_written += self._write_chunk(index, chunk, rows)
+                self.chunks_written += 1
+            except BaseException as e:
+                # Keep draining so the producer never deadlocks; surfaced on close()
+                self.write_error = e
+            finally:
+                self._free.put(chunk)
+
+    def _write_chunk(self, index: int, chunk: Dict[str, np.ndarray], rows: int) -> int:
+        path = self.run_dir / f"chunk_{index:05d}.{self.fmt}"
+        if self.fmt == "npz":
+            with open(path, "wb") as f:
+                np.savez(f, **{name: values[:rows] for name, values in chunk.items()})
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table({name: values[:rows] for name, values in chunk.items()})
+            pq.write_table(table, path)
+        return path.stat().st_size
+
+    def flush(self):
+        # Hand off the partially filled chunk (it is written in the background)
+        self._hand_off()
+
+    def close(self):
+        # Write remaining rows, stop the writer and record the log metadata
+        if self._closed:
+            return
+        self._closed = True
+        self._hand_off()
+        self._pending.put(None)
+        self._writer.join()
+
+        meta = {
+            "format": self.fmt,
+            "rows": self.rows_logged,
+            "chunks": self._num_chunks,
+            "columns": {name: np.dtype(dtype).str for name, dtype in self.columns.items()},
+            "feature_names": self.feature_names,
+            "lanes": list(self._lane_ids),
+            "dt": self.dt,
+            "stalls": self.stalls,
+            "stall_time_s": self.stall_time_s,
+        }
+        with open(self.run_dir / META_FILE, "w") as f:
+            json.dump(meta, f, indent=2)
+        if self.write_error is not None:
+            raise RuntimeError(f"Run log writer failed: {self.write_error}") from self.write_error
+
+    def __enter__(self) -> "RunLogger":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_log_chunks(
+    run_dir: Path, columns: Optional[Sequence[str]] = None
+) -> Iterator[Dict[str, np.ndarray]]:
+    # Yield each chunk of a run log as {column: array}, optionally only some columns
+    run_dir = Path(run_dir)
+    with open(run_dir / META_FILE) as f:
+        meta = json.load(f)
+    names: List[str] = list(columns) if columns is not None else list(meta["columns"])
+    for index in range(meta["chunks"]):
+        path = run_dir / f"chunk_{index:05d}.{meta['format']}"
+        if meta["format"] == "npz":
+            with np.load(path) as data:
+                yield {name: data[name] for name in names}
+        else:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path, columns=names)
+            yield {name: table.column(name).to_numpy() for name in names}
+
+
+def load_run_log(run_dir: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    # Whole run log as {column: array} (concatenated chunks)
+    chunks = list(iter_log_chunks(run_dir, columns))
+    if not chunks:
+        with open(Path(run_dir) / META_FILE) as f:
+            meta = json.load(f)
+        names = list(columns) if columns is not None else list(meta["columns"])
+        return {name: np.empty(0, dtype=np.dtype(meta["columns"][name])) for name in names}
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
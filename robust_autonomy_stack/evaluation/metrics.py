@@ -1,3 +1,448 @@
 # Metrics computation and aggregation - calculates success rate, comfort, safety metrics
+# Everything is an online accumulator: updated per tick or per episode, constant memory,
+# and mergeable, so workers summarise their own episodes and the suite summary only
+# merges per-episode summaries (O(episodes), never re-reading tick logs).
+# All accumulators round-trip through plain dicts (to_dict/from_dict) for JSON/pipes.
 
-# TODO: Implement metrics (Phase 7)
+import bisect
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+# Outcomes that count as a safety failure
+FAILURE_OUTCOMES = ("crash", "out_of_road")
+
+
+class RunningStats:
+    # Count/mean/variance (Welford) plus min/max; merge uses Chan et al.'s pairwise update
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def update_batch(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        batch = RunningStats()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        # Sample variance (0 with fewer than two values)
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.count else None, "max": self.max if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data["count"], data["mean"], data["m2"]
+        if stats.count:
+            stats.min, stats.max = data["min"], data["max"]
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        if self.count == 0:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+
+
+class QuantileSketch:
+    # Log-bucketed quantile sketch (DDSketch-style) with bounded relative error
+    # Values map to bucket ceil(log_gamma |x|); any quantile is answered within
+    # relative_accuracy of the true value, and merging is adding bucket counts.
+    # Negative values and values below min_value get their own stores.
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def _indices(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def update(self, value: float):
+        # Scalar fast path for per-tick updates
+        if not math.isfinite(value):
+            return
+        self.count += 1
+        if abs(value) < self.min_value:
+            self.zero_count += 1
+        elif value > 0:
+            self.positive[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.negative[math.ceil(math.log(-value) / self._log_gamma)] += 1
+
+    def update_batch(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        small = np.abs(values) < self.min_value
+        self.zero_count += int(small.sum())
+        for store, part in ((self.positive, values[~small & (values > 0)]),
+                            (self.negative, -values[~small & (values < 0)])):
+            if part.size:
+                keys, counts = np.unique(self._indices(part), return_counts=True)
+                store.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _bucket_value(self, index: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        return 2.0 * self._gamma ** index / (self._gamma + 1.0)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+
+    def quantiles(self, qs: Sequence[float] = (0.05, 0.5, 0.95)) -> Dict[str, Optional[float]]:
+        return {f"p{round(q * 100):g}": self.quantile(q) for q in qs}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["min_value"])
+        sketch.positive.update({int(k): v for k, v in data["positive"].items()})
+        sketch.negative.update({int(k): v for k, v in data["negative"].items()})
+        sketch.zero_count = data["zero_count"]
+        sketch.count = sketch.zero_count + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+
+class Histogram:
+    # Fixed-edge histogram; values outside the edges go to the under/overflow counts
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self._edge_list = self.edges.tolist()
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update_batch(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        bins = len(self.counts)
+        index = np.searchsorted(self.edges, values, side="right") - 1
+        # The last bin is closed on the right, like np.histogram
+        index[values == self.edges[-1]] = bins - 1
+        self.underflow += int((index < 0).sum())
+        self.overflow += int((index >= bins).sum())
+        inside = (index >= 0) & (index < bins)
+        self.counts += np.bincount(index[inside], minlength=bins)
+
+    def update(self, value: float):
+        bins = len(self.counts)
+        index = bisect.bisect_right(self._edge_list, value) - 1
+        if value == self._edge_list[-1]:
+            index = bins - 1
+        if index < 0:
+            self.underflow += 1
+        elif index >= bins:
+            self.overflow += 1
+        else:
+            self.counts[index] += 1
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist(),
+                "underflow": self.underflow, "overflow": self.overflow}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        hist = cls(data["edges"])
+        hist.counts[:] = data["counts"]
+        hist.underflow, hist.overflow = data["underflow"], data["overflow"]
+        return hist
+
+
+# Distribution edges shared by every episode so histograms always merge
+SPEED_EDGES = np.linspace(0.0, 40.0, 41)  # m/s
+JERK_EDGES = np.linspace(-10.0, 10.0, 41)  # m/s^3
+TTC_EDGES = np.array([0.0, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 10.0])  # s
+
+# Only agents within this lateral distance of the ego's heading line count for TTC
+TTC_CORRIDOR_M = 2.0
+
+
+def time_to_collision(snapshot: np.ndarray, corridor: float = TTC_CORRIDOR_M) -> float:
+    # TTC to the nearest closing agent ahead, from MetaDriveAdapter.snapshot_state() rows
+    # [x, y, heading, vx, vy] with the ego first; inf when nothing is closing
+    if snapshot.shape[0] < 2:
+        return math.inf
+    ego, others = snapshot[0], snapshot[1:]
+    c, s = math.cos(ego[2]), math.sin(ego[2])
+    dx = others[:, 0] - ego[0]
+    dy = others[:, 1] - ego[1]
+    ahead = dx * c + dy * s
+    lateral = -dx * s + dy * c
+    closing = (ego[3] - others[:, 3]) * c + (ego[4] - others[:, 4]) * s
+    mask = (ahead > 0) & (np.abs(lateral) < corridor) & (closing > 1e-3)
+    if not mask.any():
+        return math.inf
+    return float((ahead[mask] / closing[mask]).min())
+
+
+class EpisodeMetrics:
+    # Per-episode accumulator fed once per tick
+
+    def __init__(self, dt: float = 0.1):
+        self.dt = dt
+        self.steps = 0
+        self.distance_m = 0.0
+        self.speed = RunningStats()
+        self.jerk = RunningStats()
+        self.jerk_sketch = QuantileSketch()
+        self.ttc_sketch = QuantileSketch()
+        self.min_ttc = math.inf
+        self.off_lane_steps = 0
+        self.speed_hist = Histogram(SPEED_EDGES)
+        self.jerk_hist = Histogram(JERK_EDGES)
+        self.ttc_hist = Histogram(TTC_EDGES)
+        self._prev_speed: Optional[float] = None
+        self._prev_accel: Optional[float] = None
+
+    def update_tick(self, ego, ttc: Optional[float] = None):
+        # ego: EGO_STATE_DTYPE record for the tick; ttc: time_to_collision() or None
+        if not ego["valid"]:
+            return
+        speed = float(ego["speed"])
+        self.steps += 1
+        self.distance_m += speed * self.dt
+        self.speed.update(speed)
+        self.speed_hist.update(speed)
+        if not ego["on_lane"]:
+            self.off_lane_steps += 1
+        if self._prev_speed is not None:
+            accel = (speed - self._prev_speed) / self.dt
+            if self._prev_accel is not None:
+                jerk = (accel - self._prev_accel) / self.dt
+                self.jerk.update(jerk)
+                self.jerk_sketch.update(jerk)
+                self.jerk_hist.update(jerk)
+            self._prev_accel = accel
+        self._prev_speed = speed
+        if ttc is not None and math.isfinite(ttc):
+            self.min_ttc = min(self.min_ttc, ttc)
+            self.ttc_sketch.update(ttc)
+            self.ttc_hist.update(ttc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dt": self.dt,
+            "steps": self.steps,
+            "distance_m": self.distance_m,
+            "off_lane_steps": self.off_lane_steps,
+            "min_ttc_s": self.min_ttc if math.isfinite(self.min_ttc) else None,
+            "speed": self.speed.to_dict(),
+            "jerk": self.jerk.to_dict(),
+            "jerk_sketch": self.jerk_sketch.to_dict(),
+            "ttc_sketch": self.ttc_sketch.to_dict(),
+            "speed_hist": self.speed_hist.to_dict(),
+            "jerk_hist": self.jerk_hist.to_dict(),
+            "ttc_hist": self.ttc_hist.to_dict(),
+        }
+
+
+class SuiteMetrics:
+    # Suite-level aggregate of episode results; merge() combines shards/workers
+
+    def __init__(self):
+        self.episodes = 0
+        self.outcomes: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.reward = RunningStats()
+        self.steps = RunningStats()
+        self.wall_time_s = RunningStats()
+        self.setup_time_s = RunningStats()
+        self.distance_m = RunningStats()
+        self.min_ttc_s = RunningStats()
+        self.speed = RunningStats()
+        self.jerk = RunningStats()
+        self.jerk_sketch = QuantileSketch()
+        self.ttc_sketch = QuantileSketch()
+        self.speed_hist = Histogram(SPEED_EDGES)
+        self.jerk_hist = Histogram(JERK_EDGES)
+        self.ttc_hist = Histogram(TTC_EDGES)
+        self.off_lane_steps = 0
+        self.ticks = 0
+
+    def add_episode(self, result):
+        # result: EpisodeResult (tick-level metrics in result.extra["metrics"], if any)
+        self.episodes += 1
+        self.statuses[result.status] += 1
+        if result.status != "ok":
+            return
+        self.outcomes[result.outcome] += 1
+        self.reward.update(result.total_reward)
+        self.steps.update(result.steps)
+        self.wall_time_s.update(result.wall_time_s)
+        self.setup_time_s.update(result.setup_time_s)
+
+        metrics = result.extra.get("metrics")
+        if not metrics:
+            return
+        self.ticks += metrics["steps"]
+        self.distance_m.update(metrics["distance_m"])
+        self.off_lane_steps += metrics["off_lane_steps"]
+        if metrics["min_ttc_s"] is not None:
+            self.min_ttc_s.update(metrics["min_ttc_s"])
+        self.speed.merge(RunningStats.from_dict(metrics["speed"]))
+        self.jerk.merge(RunningStats.from_dict(metrics["jerk"]))
+        self.jerk_sketch.merge(QuantileSketch.from_dict(metrics["jerk_sketch"]))
+        self.ttc_sketch.merge(QuantileSketch.from_dict(metrics["ttc_sketch"]))
+        self.speed_hist.merge(Histogram.from_dict(metrics["speed_hist"]))
+        self.jerk_hist.merge(Histogram.from_dict(metrics["jerk_hist"]))
+        self.ttc_hist.merge(Histogram.from_dict(metrics["ttc_hist"]))
+
+    def add_episodes(self, results: Iterable):
+        for result in results:
+            self.add_episode(result)
+        return self
+
+    _STATS = ("reward", "steps", "wall_time_s", "setup_time_s", "distance_m", "min_ttc_s", "speed", "jerk")
+    _SKETCHES = ("jerk_sketch", "ttc_sketch")
+    _HISTS = ("speed_hist", "jerk_hist", "ttc_hist")
+
+    def merge(self, other: "SuiteMetrics") -> "SuiteMetrics":
+        self.episodes += other.episodes
+        self.outcomes.update(other.outcomes)
+        self.statuses.update(other.statuses)
+        self.off_lane_steps += other.off_lane_steps
+        self.ticks += other.ticks
+        for name in self._STATS + self._SKETCHES + self._HISTS:
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "episodes": self.episodes,
+            "outcomes": dict(self.outcomes),
+            "statuses": dict(self.statuses),
+            "off_lane_steps": self.off_lane_steps,
+            "ticks": self.ticks,
+        }
+        for name in self._STATS + self._SKETCHES + self._HISTS:
+            data[name] = getattr(self, name).to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SuiteMetrics":
+        metrics = cls()
+        metrics.episodes = data["episodes"]
+        metrics.outcomes.update(data["outcomes"])
+        metrics.statuses.update(data["statuses"])
+        metrics.off_lane_steps = data["off_lane_steps"]
+        metrics.ticks = data["ticks"]
+        for name in cls._STATS:
+            setattr(metrics, name, RunningStats.from_dict(data[name]))
+        for name in cls._SKETCHES:
+            setattr(metrics, name, QuantileSketch.from_dict(data[name]))
+        for name in cls._HISTS:
+            setattr(metrics, name, Histogram.from_dict(data[name]))
+        return metrics
+
+    def summary(self) -> Dict[str, Any]:
+        # Headline numbers: success/failure rates, comfort and safety distributions
+        completed = self.statuses.get("ok", 0)
+        failures = sum(self.outcomes.get(o, 0) for o in FAILURE_OUTCOMES)
+        return {
+            "episodes": self.episodes,
+            "completed": completed,
+            "success_rate": self.outcomes.get("arrive_dest", 0) / completed if completed else None,
+            "failure_rate": failures / completed if completed else None,
+            "outcomes": dict(self.outcomes),
+            "reward": self.reward.summary(),
+            "steps": self.steps.summary(),
+            "distance_m": self.distance_m.summary(),
+            "speed_mps": self.speed.summary(),
+            "jerk_mps3": {**self.jerk.summary(), **self.jerk_sketch.quantiles()},
+            "ttc_s": self.ttc_sketch.quantiles((0.01, 0.05, 0.5)),
+            "min_ttc_s": self.min_ttc_s.summary(),
+            "off_lane_fraction": self.off_lane_steps / self.ticks if self.ticks else None,
+            "setup_time_s": self.setup_time_s.summary(),
+        }
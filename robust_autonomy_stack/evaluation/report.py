@@ -1,3 +1,239 @@
 # Report generation - creates HTML/Markdown reports with plots and failure analysis
+# Rendering is incremental: each run's log is identified by a content hash, and its
+# table row and figures are cached under <report_dir>/cache/<hash>/. Rebuilding a
+# report only renders runs that are new or whose log changed (in a process pool);
+# everything else is reused and the HTML page itself is just re-assembled.
 
-# TODO: Implement report generator (Phase 7)
+import hashlib
+import html
+import json
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from robust_autonomy_stack.evaluation.logger import META_FILE, load_run_log
+
+
+CACHE_DIR = "cache"
+ROW_FILE = "row.json"
+# Bump when the rendered row or figures change, so stale cache entries are ignored
+RENDER_VERSION = 1
+
+# Columns the report reads (everything else in the log is skipped)
+REPORT_COLUMNS = (
+    "step", "reward", "crash", "out_of_road", "arrive_dest",
+    "action_steer", "action_throttle", "ego_x", "ego_y", "ego_speed",
+)
+
+
+def find_run_dirs(runs_dir: Path) -> List[Path]:
+    # Every directory under runs_dir that holds a run log, sorted by path
+    return sorted(path.parent for path in Path(runs_dir).rglob(META_FILE))
+
+
+def run_log_hash(run_dir: Path) -> str:
+    # Content hash of a run log: metadata plus every chunk file
+    run_dir = Path(run_dir)
+    digest = hashlib.sha256(f"v{RENDER_VERSION}".encode())
+    with open(run_dir / META_FILE, "rb") as f:
+        meta_bytes = f.read()
+    digest.update(meta_bytes)
+    meta = json.loads(meta_bytes)
+    for index in range(meta["chunks"]):
+        with open(run_dir / f"chunk_{index:05d}.{meta['format']}", "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:20]
+
+
+def summarize_run(log: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    # Table row for one run log
+    steps = len(log["step"])
+    if steps == 0:
+        return {"steps": 0, "outcome": "empty"}
+    if log["arrive_dest"].any():
+        outcome = "arrive_dest"
+    elif log["crash"].any():
+        outcome = "crash"
+    elif log["out_of_road"].any():
+        outcome = "out_of_road"
+    else:
+        outcome = "max_steps"
+    speed = log["ego_speed"].astype(np.float64)
+    path = np.hypot(np.diff(log["ego_x"]), np.diff(log["ego_y"]))
+    return {
+        "steps": steps,
+        "outcome": outcome,
+        "total_reward": float(log["reward"].sum()),
+        "distance_m": float(np.nansum(path)),
+        "mean_speed_mps": float(np.nanmean(speed)),
+        "max_speed_mps": float(np.nanmax(speed)),
+        "first_crash_step": int(log["step"][log["crash"]][0]) if log["crash"].any() else None,
+    }
+
+
+def _render_figures(log: Dict[str, np.ndarray], out_dir: Path) -> List[str]:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figures = []
+    fig, ax = plt.subplots(figsize=(5, 5))
+    ax.plot(log["ego_x"], log["ego_y"], lw=1.5)
+    crash = log["crash"]
+    if crash.any():
+        ax.scatter(log["ego_x"][crash], log["ego_y"][crash], color="red", s=12, label="crash")
+        ax.legend()
+    ax.set_xlabel("x (m)")
+    ax.set_ylabel("y (m)")
+    ax.set_title("Ego trajectory")
+    ax.set_aspect("equal", adjustable="datalim")
+    fig.tight_layout()
+    fig.savefig(out_dir / "trajectory.png", dpi=80)
+    plt.close(fig)
+    figures.append("trajectory.png")
+
+    fig, (ax_speed, ax_action) = plt.subplots(2, 1, figsize=(7, 5), sharex=True)
+    ax_speed.plot(log["step"], log["ego_speed"])
+    ax_speed.set_ylabel("speed (m/s)")
+    ax_action.plot(log["step"], log["action_steer"], label="steer")
+    ax_action.plot(log["step"], log["action_throttle"], label="throttle")
+    ax_action.set_ylabel("action")
+    ax_action.set_xlabel("step")
+    ax_action.legend()
+    fig.tight_layout()
+    fig.savefig(out_dir / "timeseries.png", dpi=80)
+    plt.close(fig)
+    figures.append("timeseries.png")
+    return figures
+
+
+def render_run(run_dir: Path, entry_dir: Path, save_plots: bool = True) -> Dict[str, Any]:
+    # Render one run into its cache entry and return the row (also saved as row.json)
+    # Runs in a pool worker; the entry directory is written atomically via a temp dir
+    run_dir, entry_dir = Path(run_dir), Path(entry_dir)
+    tmp_dir = entry_dir.with_name(f"{entry_dir.name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    log = load_run_log(run_dir, REPORT_COLUMNS)
+    row = summarize_run(log)
+    row["figures"] = _render_figures(log, tmp_dir) if save_plots and row["steps"] else []
+    with open(tmp_dir / ROW_FILE, "w") as f:
+        json.dump(row, f, indent=2)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    tmp_dir.rename(entry_dir)
+    return row
+
+
+def _load_cached_row(entry_dir: Path, save_plots: bool) -> Optional[Dict[str, Any]]:
+    try:
+        with open(entry_dir / ROW_FILE) as f:
+            row = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if save_plots and row["steps"] and not row["figures"]:
+        return None  # Cached without plots; render again now that they are wanted
+    return row
+
+
+def _write_html(path: Path, title: str, runs: List[Dict[str, Any]], suite: Optional[Dict[str, Any]]):
+    columns = ("steps", "outcome", "total_reward", "distance_m", "mean_speed_mps", "max_speed_mps")
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+        ".fail{background:#fdd}img{margin:4px}</style></head><body>",
+        f"<h1>{html.escape(title)}</h1>",
+    ]
+    if suite:
+        parts.append("<h2>Suite summary</h2><pre>" + html.escape(json.dumps(suite, indent=2)) + "</pre>")
+
+    parts.append("<h2>Runs</h2><table><tr><th>run</th>")
+    parts.extend(f"<th>{name}</th>" for name in columns)
+    parts.append("</tr>")
+    for run in runs:
+        row = run["row"]
+        css = " class='fail'" if row["outcome"] in ("crash", "out_of_road") else ""
+        parts.append(f"<tr{css}><td><a href='#{html.escape(run['name'])}'>{html.escape(run['name'])}</a></td>")
+        for name in columns:
+            value = row.get(name)
+            text = f"{value:.2f}" if isinstance(value, float) else ("" if value is None else str(value))
+            parts.append(f"<td>{html.escape(text)}</td>")
+        parts.append("</tr>")
+    parts.append("</table>")
+
+    for run in runs:
+        if not run["row"]["figures"]:
+            continue
+        parts.append(f"<h3 id='{html.escape(run['name'])}'>{html.escape(run['name'])}</h3>")
+        for figure in run["row"]["figures"]:
+            src = f"{CACHE_DIR}/{run['hash']}/{figure}"
+            parts.append(f"<img src='{html.escape(src)}' alt='{html.escape(figure)}'>")
+    parts.append("</body></html>")
+    path.write_text("\n".join(parts))
+
+
+def generate_report(
+    runs_dir: Path,
+    output_dir: Path,
+    save_plots: bool = True,
+    num_workers: Optional[int] = None,
+    prune: bool = True,
+) -> Path:
+    # Build <output_dir>/index.html for every run under runs_dir, rendering only
+    # new/changed runs. save_plots mirrors OutputConfig.save_debug_plots.
+    runs_dir, output_dir = Path(runs_dir), Path(output_dir)
+    cache_dir = output_dir / CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    runs = []
+    stale = {}
+    for run_dir in find_run_dirs(runs_dir):
+        digest = run_log_hash(run_dir)
+        run = {"name": str(run_dir.relative_to(runs_dir)), "hash": digest, "row": None}
+        run["row"] = _load_cached_row(cache_dir / digest, save_plots)
+        if run["row"] is None:
+            stale[digest] = run_dir
+        runs.append(run)
+
+    if stale:
+        workers = min(num_workers or os.cpu_count() or 1, len(stale))
+        if workers == 1:
+            rendered = {d: render_run(r, cache_dir / d, save_plots) for d, r in stale.items()}
+        else:
+            with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+                futures = {d: pool.submit(render_run, r, cache_dir / d, save_plots) for d, r in stale.items()}
+                rendered = {d: future.result() for d, future in futures.items()}
+        for run in runs:
+            if run["row"] is None:
+                run["row"] = rendered[run["hash"]]
+
+    if prune:
+        # Drop cache entries (and leftover temp dirs) no current run refers to
+        live = {run["hash"] for run in runs}
+        for entry in cache_dir.iterdir():
+            if entry.name not in live:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    suite = None
+    metrics_path = runs_dir / "metrics.json"
+    if metrics_path.is_file():
+        with open(metrics_path) as f:
+            suite = json.load(f).get("summary")
+
+    index_path = output_dir / "index.html"
+    _write_html(index_path, f"Run report: {runs_dir}", runs, suite)
+    print(f"Report: {len(runs)} runs, {len(stale)} rendered, {len(runs) - len(stale)} cached "
+          f"({time.perf_counter() - start:.1f}s)")
+    return index_path
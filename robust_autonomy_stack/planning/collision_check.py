@@ -1,3 +1,177 @@
 # Collision checking utilities - check trajectories against predicted agent paths
+# Two stages over the whole candidate batch:
+#   1. Broad phase (vectorized): whole-trajectory AABB overlap per (candidate, agent),
+#      then per-timestep bounding-circle distance for the pairs that survive
+#   2. Narrow phase: exact oriented-box (separating axis) test on surviving
+#      (candidate, agent, timestep) triples only
 
-# TODO: Implement collision checking (Phase 4)
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.planning.trajectory_sampler import STATE_X, STATE_Y, STATE_YAW
+from robust_autonomy_stack.utils.profiling import timed
+
+
+@dataclass
+class CollisionStats:
+    # Pair counters; one (candidate, agent, timestep) triple is one "pair" test
+
+    checks: int = 0  # check() calls
+    pairs_total: int = 0
+    culled_aabb: int = 0  # removed by the trajectory AABB test
+    culled_circle: int = 0  # removed by the per-timestep bounding circles
+    tested: int = 0  # exact oriented-box tests run
+    colliding: int = 0
+
+    @property
+    def culled(self) -> int:
+        return self.culled_aabb + self.culled_circle
+
+    @property
+    def cull_ratio(self) -> float:
+        return self.culled / self.pairs_total if self.pairs_total else 0.0
+
+    def add(self, other: "CollisionStats"):
+        self.checks += other.checks
+        self.pairs_total += other.pairs_total
+        self.culled_aabb += other.culled_aabb
+        self.culled_circle += other.culled_circle
+        self.tested += other.tested
+        self.colliding += other.colliding
+
+
+@dataclass
+class CollisionResult:
+    # Per-candidate collision outcome for one batch
+
+    collides: np.ndarray  # (N,) bool
+    first_collision_step: np.ndarray  # (N,) int, T where no collision
+    min_distance: np.ndarray  # (N,) closest center distance to any agent (inf if culled by AABB)
+    stats: CollisionStats = field(default_factory=CollisionStats)
+
+
+def headings_from_paths(positions: np.ndarray) -> np.ndarray:
+    # (M, T, 2) positions -> (M, T) yaw along each path (0 where an agent is stationary;
+    # pass real headings to check() when they are known)
+    delta = np.diff(positions, axis=1, prepend=positions[:, :1])
+    delta[:, 0] = delta[:, 1] if positions.shape[1] > 1 else 0.0
+    return np.arctan2(delta[..., 1], delta[..., 0])
+
+
+def oriented_boxes_overlap(
+    center_a: np.ndarray,
+    yaw_a: np.ndarray,
+    half_a: np.ndarray,
+    center_b: np.ndarray,
+    yaw_b: np.ndarray,
+    half_b: np.ndarray,
+) -> np.ndarray:
+    # Separating axis test for K box pairs: centers (K, 2), yaws (K,), half extents (K, 2)
+    axes_a = np.stack([np.cos(yaw_a), np.sin(yaw_a)], axis=-1)
+    axes_a = np.stack([axes_a, np.stack([-axes_a[:, 1], axes_a[:, 0]], axis=-1)], axis=1)
+    axes_b = np.stack([np.cos(yaw_b), np.sin(yaw_b)], axis=-1)
+    axes_b = np.stack([axes_b, np.stack([-axes_b[:, 1], axes_b[:, 0]], axis=-1)], axis=1)
+    axes = np.concatenate([axes_a, axes_b], axis=1)  # (K, 4, 2)
+
+    d = center_b - center_a
+    dist = np.abs(np.einsum("kj,kaj->ka", d, axes))
+    # Projection radius of each box onto each axis: sum_i half_i * |box_axis_i . axis|
+    radius_a = np.einsum("ki,kai->ka", half_a, np.abs(np.einsum("kij,kaj->kai", axes_a, axes)))
+    radius_b = np.einsum("ki,kai->ka", half_b, np.abs(np.einsum("kij,kaj->kai", axes_b, axes)))
+    return np.all(dist <= radius_a + radius_b, axis=1)
+
+
+class CollisionChecker:
+    # Checks a candidate batch (N, T, STATE_DIM) against predicted agent paths (M, T, 2)
+
+    def __init__(self, config: StackConfig):
+        self.ego_half = 0.5 * np.array([config.vehicle_length, config.vehicle_width])
+        self.ego_half += config.collision_margin
+        self.default_agent_half = 0.5 * np.array([config.vehicle_length, config.vehicle_width])
+        self.stats = CollisionStats()
+
+    def reset_stats(self):
+        self.stats = CollisionStats()
+
+    @timed("planning.collision")
+    def check(
+        self,
+        candidates: np.ndarray,
+        agent_positions: np.ndarray,
+        agent_yaws: Optional[np.ndarray] = None,
+        agent_sizes: Optional[np.ndarray] = None,
+    ) -> CollisionResult:
+        # agent_yaws (M, T) defaults to the path direction; agent_sizes (M, 2) is (length, width)
+        n, t = candidates.shape[:2]
+        m = agent_positions.shape[0]
+        collides = np.zeros(n, dtype=bool)
+        first_step = np.full(n, t, dtype=int)
+        min_distance = np.full(n, np.inf)
+        stats = CollisionStats(checks=1, pairs_total=n * m * t)
+
+        if n == 0 or m == 0:
+            self.stats.add(stats)
+            return CollisionResult(collides, first_step, min_distance, stats)
+        if agent_positions.shape[1] != t:
+            raise ValueError(
+                f"Agent predictions have {agent_positions.shape[1]} steps, candidates have {t}"
+            )
+
+        ego_xy = candidates[..., [STATE_X, STATE_Y]]
+        agent_half = (
+            0.5 * np.asarray(agent_sizes, dtype=float)
+            if agent_sizes is not None
+            else np.broadcast_to(self.default_agent_half, (m, 2))
+        )
+        ego_radius = float(np.hypot(*self.ego_half))
+        agent_radius = np.hypot(agent_half[:, 0], agent_half[:, 1])  # (M,)
+
+        # Stage 1a: swept AABBs of whole trajectories, (N, M) pair mask
+        ego_lo = ego_xy.min(axis=1) - ego_radius
+        ego_hi = ego_xy.max(axis=1) + ego_radius
+        agent_lo = agent_positions.min(axis=1) - agent_radius[:, None]
+        agent_hi = agent_positions.max(axis=1) + agent_radius[:, None]
+        overlap = np.all(
+            (ego_lo[:, None, :] <= agent_hi[None, :, :]) & (agent_lo[None, :, :] <= ego_hi[:, None, :]),
+            axis=-1,
+        )
+        cand_idx, agent_idx = np.nonzero(overlap)
+        stats.culled_aabb = (n * m - cand_idx.shape[0]) * t
+        if cand_idx.shape[0] == 0:
+            self.stats.add(stats)
+            return CollisionResult(collides, first_step, min_distance, stats)
+
+        # Stage 1b: per-timestep bounding circles on surviving pairs, (P, T)
+        diff = agent_positions[agent_idx] - ego_xy[cand_idx]
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        np.minimum.at(min_distance, cand_idx, dist.min(axis=1))
+        near = dist <= ego_radius + agent_radius[agent_idx][:, None]
+        pair_idx, step_idx = np.nonzero(near)
+        stats.culled_circle = near.size - pair_idx.shape[0]
+        stats.tested = pair_idx.shape[0]
+        if stats.tested == 0:
+            self.stats.add(stats)
+            return CollisionResult(collides, first_step, min_distance, stats)
+
+        # Stage 2: exact oriented boxes on surviving (candidate, agent, step) triples
+        c_idx = cand_idx[pair_idx]
+        a_idx = agent_idx[pair_idx]
+        if agent_yaws is None:
+            agent_yaws = headings_from_paths(agent_positions)
+        hit = oriented_boxes_overlap(
+            ego_xy[c_idx, step_idx],
+            candidates[c_idx, step_idx, STATE_YAW],
+            np.broadcast_to(self.ego_half, (c_idx.shape[0], 2)),
+            agent_positions[a_idx, step_idx],
+            agent_yaws[a_idx, step_idx],
+            agent_half[a_idx],
+        )
+        stats.colliding = int(hit.sum())
+        collides[c_idx[hit]] = True
+        np.minimum.at(first_step, c_idx[hit], step_idx[hit])
+
+        self.stats.add(stats)
+        return CollisionResult(collides, first_step, min_distance, stats)
@@ -1,3 +1,185 @@
 # Trajectory sampling for local planning - generates candidate paths
+# Candidates are a lateral-offset x end-speed grid, produced as one (N, T, STATE_DIM)
+# array. The ego-frame templates are precomputed once per StackConfig; each tick only
+# applies the ego speed and the ego-to-world transform with broadcast array ops.
 
-# TODO: Implement trajectory sampler (Phase 4)
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.utils.profiling import timed
+
+
+# Per-timestep state layout of a candidate trajectory
+STATE_X, STATE_Y, STATE_YAW, STATE_V, STATE_A = range(5)
+STATE_DIM = 5
+
+
+@dataclass
+class TrajectoryTemplates:
+    # Ego-frame quantities that don't depend on the ego state (all arrays read-only)
+
+    times: np.ndarray  # (T,) sample times, dt .. horizon
+    offsets: np.ndarray  # (N,) lateral end offset of each candidate
+    end_speeds: np.ndarray  # (N,) end speed of each candidate
+    lateral: np.ndarray  # (N, T) lateral displacement
+    lateral_rate: np.ndarray  # (N, T) lateral velocity
+    speed_blend: np.ndarray  # (T,) fraction of the speed change applied at t
+    speed_blend_rate: np.ndarray  # (T,) d(speed_blend)/dt
+    speed_blend_integral: np.ndarray  # (T,) integral of speed_blend from 0 to t
+
+    @property
+    def num_candidates(self) -> int:
+        return self.offsets.shape[0]
+
+    @property
+    def num_steps(self) -> int:
+        return self.times.shape[0]
+
+
+@dataclass
+class CandidateBatch:
+    # One tick's candidates; states is a view into the sampler's reusable buffer,
+    # so copy it if it has to outlive the next sample() call
+
+    states: np.ndarray  # (N, T, STATE_DIM) world frame
+    offsets: np.ndarray  # (N,) lateral end offset (ego frame)
+    end_speeds: np.ndarray  # (N,)
+    template_index: np.ndarray  # (N,) row in the full template set
+    times: np.ndarray  # (T,)
+
+    def __len__(self) -> int:
+        return self.states.shape[0]
+
+
+def _smoothstep(tau: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Quintic 0 -> 1 blend with zero velocity/acceleration at both ends, and its derivative
+    tau = np.clip(tau, 0.0, 1.0)
+    value = tau ** 3 * (10.0 - 15.0 * tau + 6.0 * tau ** 2)
+    rate = 30.0 * tau ** 2 * (1.0 - tau) ** 2
+    return value, rate
+
+
+@lru_cache(maxsize=8)
+def _build_templates(
+    horizon_s: float,
+    dt: float,
+    lateral_offsets: Tuple[float, ...],
+    end_speeds: Tuple[float, ...],
+    lateral_transition_s: float,
+    speed_transition_s: float,
+) -> TrajectoryTemplates:
+    num_steps = int(round(horizon_s / dt))
+    times = dt * np.arange(1, num_steps + 1)
+
+    # Full grid, offset-major: candidate i = (offset i // S, speed i % S)
+    offsets = np.repeat(np.asarray(lateral_offsets, dtype=float), len(end_speeds))
+    speeds = np.tile(np.asarray(end_speeds, dtype=float), len(lateral_offsets))
+
+    lat_blend, lat_rate = _smoothstep(times / lateral_transition_s)
+    spd_blend, spd_rate = _smoothstep(times / speed_transition_s)
+    # Trapezoid integral of the speed blend, starting from 0 at t=0
+    spd_integral = np.cumsum(0.5 * dt * (spd_blend + np.concatenate(([0.0], spd_blend[:-1]))))
+
+    templates = TrajectoryTemplates(
+        times=times,
+        offsets=offsets,
+        end_speeds=speeds,
+        lateral=offsets[:, None] * lat_blend[None, :],
+        lateral_rate=offsets[:, None] * (lat_rate / lateral_transition_s)[None, :],
+        speed_blend=spd_blend,
+        speed_blend_rate=spd_rate / speed_transition_s,
+        speed_blend_integral=spd_integral,
+    )
+    for array in vars(templates).values():
+        array.flags.writeable = False
+    return templates
+
+
+def build_templates(config: StackConfig) -> TrajectoryTemplates:
+    # Template set for a StackConfig (cached: equal planning params share one set)
+    end_speeds = tuple(
+        min(f * config.target_speed_mps, config.max_speed_mps) for f in config.speed_factors
+    )
+    return _build_templates(
+        config.planning_horizon_s,
+        config.planning_dt,
+        tuple(config.lateral_offsets),
+        end_speeds,
+        config.lateral_transition_s,
+        config.speed_transition_s,
+    )
+
+
+class TrajectorySampler:
+    # Generates the candidate batch for the current ego state every tick
+
+    def __init__(self, config: StackConfig):
+        self.config = config
+        self.templates = build_templates(config)
+        n, t = self.templates.num_candidates, self.templates.num_steps
+        self._buffer = np.empty((n, t, STATE_DIM))
+        self._scratch = np.empty((n, t))
+
+    @property
+    def num_candidates(self) -> int:
+        return self.templates.num_candidates
+
+    def select(self, max_candidates: Optional[int]) -> np.ndarray:
+        # Template rows to use when the candidate count is capped (evenly spread
+        # over the grid so the reduced set still covers all offsets and speeds)
+        n = self.templates.num_candidates
+        if max_candidates is None or max_candidates >= n:
+            return np.arange(n)
+        return np.unique(np.linspace(0, n - 1, max(1, max_candidates)).round().astype(int))
+
+    @timed("planning.sample")
+    def sample(
+        self,
+        x: float,
+        y: float,
+        yaw: float,
+        speed: float,
+        max_candidates: Optional[int] = None,
+    ) -> CandidateBatch:
+        # Transform the templates to the ego pose/speed: returns (N, T, STATE_DIM) world states
+        tpl = self.templates
+        index = self.select(max_candidates)
+        n = index.shape[0]
+        full = n == tpl.num_candidates
+
+        out = self._buffer[:n]
+        longitudinal = self._scratch[:n]
+        lateral = tpl.lateral if full else tpl.lateral[index]
+        lateral_rate = tpl.lateral_rate if full else tpl.lateral_rate[index]
+        end_speeds = tpl.end_speeds if full else tpl.end_speeds[index]
+
+        # Longitudinal profile: speed blends from the ego speed to each end speed
+        delta_v = (end_speeds - speed)[:, None]
+        np.multiply(delta_v, tpl.speed_blend, out=out[..., STATE_V])
+        out[..., STATE_V] += speed
+        np.multiply(delta_v, tpl.speed_blend_rate, out=out[..., STATE_A])
+        np.multiply(delta_v, tpl.speed_blend_integral, out=longitudinal)
+        longitudinal += speed * tpl.times
+
+        # Ego-frame heading from the path tangent, then rotate/translate into the world
+        np.arctan2(lateral_rate, np.maximum(out[..., STATE_V], 1e-3), out=out[..., STATE_YAW])
+        out[..., STATE_YAW] += yaw
+        c, s = np.cos(yaw), np.sin(yaw)
+        np.multiply(longitudinal, c, out=out[..., STATE_X])
+        out[..., STATE_X] -= s * lateral
+        out[..., STATE_X] += x
+        np.multiply(longitudinal, s, out=out[..., STATE_Y])
+        out[..., STATE_Y] += c * lateral
+        out[..., STATE_Y] += y
+
+        return CandidateBatch(
+            states=out,
+            offsets=tpl.offsets if full else tpl.offsets[index],
+            end_speeds=end_speeds,
+            template_index=index,
+            times=tpl.times,
+        )
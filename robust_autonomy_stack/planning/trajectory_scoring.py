@@ -1,3 +1,155 @@
 # Trajectory cost and risk scoring - evaluates candidates by collision, progress, comfort
+# Scores the whole candidate batch in one call: every term is an array op over
+# (N, T), and the weighted sum uses the StackConfig planning weights.
 
-# TODO: Implement trajectory scoring (Phase 4)
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.planning.collision_check import CollisionResult
+from robust_autonomy_stack.planning.trajectory_sampler import (
+    CandidateBatch,
+    STATE_A,
+    STATE_V,
+    STATE_YAW,
+)
+from robust_autonomy_stack.utils.profiling import timed
+
+
+# Normalization scales so each raw term is O(1) for a typical trajectory
+ACCEL_SCALE = 3.0  # m/s^2
+JERK_SCALE = 5.0  # m/s^3
+LATERAL_ACCEL_SCALE = 2.0  # m/s^2
+
+
+@dataclass
+class ScoreResult:
+    # Weighted cost per candidate (lower is better) plus the unweighted terms
+
+    costs: np.ndarray  # (N,)
+    terms: Dict[str, np.ndarray]  # name -> (N,), NaN where a term was skipped
+    best_index: int  # -1 for an empty batch
+    num_skipped: int = 0
+
+    @property
+    def best_cost(self) -> float:
+        return float(self.costs[self.best_index]) if self.best_index >= 0 else float("inf")
+
+    def margin(self) -> float:
+        # Cost gap between the best and second-best finite candidates
+        finite = np.sort(self.costs[np.isfinite(self.costs)])
+        return float(finite[1] - finite[0]) if finite.shape[0] > 1 else float("inf")
+
+
+class TrajectoryScorer:
+    # Batched cost evaluation for a CandidateBatch and its CollisionResult
+
+    def __init__(self, config: StackConfig):
+        self.config = config
+        self.weights = {
+            "collision": config.collision_weight,
+            "progress": config.progress_weight,
+            "comfort": config.comfort_weight,
+            "legality": config.legality_weight,
+        }
+
+    def collision_cost(self, collision: CollisionResult, num_steps: int) -> np.ndarray:
+        # 1 for a collision at the horizon, up to 2 for one at the first step
+        urgency = 1.0 - collision.first_collision_step / num_steps
+        return collision.collides * (1.0 + urgency)
+
+    def progress_cost(self, states: np.ndarray, dt: float) -> np.ndarray:
+        # Shortfall of distance travelled relative to driving at target speed
+        reference = self.config.target_speed_mps * dt * states.shape[1]
+        travelled = states[..., STATE_V].sum(axis=1) * dt
+        return np.clip(1.0 - travelled / reference, 0.0, None)
+
+    def comfort_cost(self, states: np.ndarray, dt: float) -> np.ndarray:
+        # Mean squared longitudinal accel, jerk and lateral accel (normalized); the
+        # jerk and lateral terms need two steps, so single-step candidates only pay accel
+        accel = states[..., STATE_A]
+        if accel.shape[1] < 2:
+            return np.mean((accel / ACCEL_SCALE) ** 2, axis=1)
+        jerk = np.diff(accel, axis=1) / dt
+        yaw_rate = np.diff(np.unwrap(states[..., STATE_YAW], axis=1), axis=1) / dt
+        lateral_accel = states[:, 1:, STATE_V] * yaw_rate
+        return (
+            np.mean((accel / ACCEL_SCALE) ** 2, axis=1)
+            + np.mean((jerk / JERK_SCALE) ** 2, axis=1)
+            + np.mean((lateral_accel / LATERAL_ACCEL_SCALE) ** 2, axis=1)
+        )
+
+    def legality_cost(
+        self,
+        states: np.ndarray,
+        offsets: np.ndarray,
+        drivable_offsets: Optional[Tuple[float, float]],
+    ) -> np.ndarray:
+        # Mean relative overspeed plus metres of lateral offset outside the drivable band
+        overspeed = np.clip(states[..., STATE_V] / self.config.max_speed_mps - 1.0, 0.0, None)
+        cost = overspeed.mean(axis=1)
+        if drivable_offsets is not None:
+            low, high = drivable_offsets
+            cost = cost + np.clip(low - offsets, 0.0, None) + np.clip(offsets - high, 0.0, None)
+        return cost
+
+    @timed("planning.score")
+    def score(
+        self,
+        batch: CandidateBatch,
+        collision: CollisionResult,
+        drivable_offsets: Optional[Tuple[float, float]] = None,
+        skip_colliding: bool = False,
+    ) -> ScoreResult:
+        # drivable_offsets: (min, max) legal lateral end offset in the ego frame, e.g.
+        # from the lane model; None disables the lane departure term
+        # skip_colliding: don't evaluate the other terms for colliding candidates and
+        # rank them last (unless every candidate collides, then all are scored fully)
+        states = batch.states
+        n, t = states.shape[:2]
+        if n == 0:
+            # The candidate count can be cut down to nothing: no choice to make
+            empty = np.empty(0)
+            names = ("collision", "progress", "comfort", "legality")
+            return ScoreResult(costs=empty, terms={name: empty for name in names}, best_index=-1)
+        # Sample spacing (times run dt, 2 dt, ... horizon)
+        dt = float(batch.times[1] - batch.times[0]) if t > 1 else float(batch.times[0])
+
+        terms = {"collision": self.collision_cost(collision, t)}
+        keep = None
+        if skip_colliding and 0 < int(collision.collides.sum()) < n:
+            keep = np.flatnonzero(~collision.collides)
+            states = states[keep]
+            offsets = batch.offsets[keep]
+        else:
+            offsets = batch.offsets
+
+        partial = {
+            "progress": self.progress_cost(states, dt),
+            "comfort": self.comfort_cost(states, dt),
+            "legality": self.legality_cost(states, offsets, drivable_offsets),
+        }
+        if keep is None:
+            terms.update(partial)
+        else:
+            for name, values in partial.items():
+                full = np.full(n, np.nan)
+                full[keep] = values
+                terms[name] = full
+
+        if keep is None:
+            costs = sum(self.weights[name] * values for name, values in terms.items())
+        else:
+            costs = np.full(n, np.inf)
+            costs[keep] = self.weights["collision"] * terms["collision"][keep] + sum(
+                self.weights[name] * values for name, values in partial.items()
+            )
+
+        return ScoreResult(
+            costs=costs,
+            terms=terms,
+            best_index=int(np.argmin(costs)),
+            num_skipped=0 if keep is None else n - keep.shape[0],
+        )
@@ -1,3 +1,128 @@
 # Constant velocity prediction - simple baseline that extrapolates current velocity
+# All agents are predicted in one broadcast from the tracker's [x, y, vx, vy] state
+# array, straight into (N, T, 2) positions on the planner's time grid
+# (planning_dt * 1..T), which is the layout CollisionChecker.check() consumes.
+# Output buffers are reused across calls and only grow with the agent count.
 
-# TODO: Implement constant velocity predictor (Phase 3)
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.tracking.kalman import KalmanFilterBank
+from robust_autonomy_stack.utils.profiling import timed
+
+
+@dataclass
+class Prediction:
+    # Future agent states; arrays are views into the predictor's buffers and are
+    # overwritten by its next predict() call
+
+    times: np.ndarray  # (T,) seconds ahead, same grid as CandidateBatch.times
+    positions: np.ndarray  # (N, T, 2)
+    yaws: np.ndarray  # (N, T) heading along the velocity (constant over T)
+    covariances: Optional[np.ndarray] = None  # (N, T, 2, 2) position covariance
+    ids: Optional[np.ndarray] = None  # (N,) track ids, if predicted from a tracker
+
+    @property
+    def num_agents(self) -> int:
+        return self.positions.shape[0]
+
+
+class ConstantVelocityPredictor:
+    # Straight-line, constant-speed extrapolation for every agent at once
+
+    def __init__(
+        self,
+        config: StackConfig,
+        process_noise: float = 1.0,
+        min_heading_speed: float = 0.5,
+        capacity: int = 64,
+    ):
+        # process_noise: white acceleration spectral density (m^2/s^3) for covariance growth
+        # min_heading_speed: below this the velocity direction is noise, so the agent's
+        # last known heading (or 0) is used instead
+        num_steps = int(round(config.planning_horizon_s / config.planning_dt))
+        self.times = config.planning_dt * np.arange(1, num_steps + 1)
+        self.process_noise = process_noise
+        self.min_heading_speed = min_heading_speed
+
+        # Broadcast-ready time terms for the position covariance
+        t = self.times[None, :, None, None]
+        self._t = t
+        self._t2 = t * t
+        self._noise_shape = (self.times ** 3 / 3.0)[None, :, None, None] * np.eye(2)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        t = self.times.shape[0]
+        self._positions = np.empty((capacity, t, 2))
+        self._yaws = np.empty((capacity, t))
+        self._covariances = np.empty((capacity, t, 2, 2))
+
+    @property
+    def num_steps(self) -> int:
+        return self.times.shape[0]
+
+    @timed("prediction.constant_velocity")
+    def predict(
+        self,
+        states: np.ndarray,
+        covariances: Optional[np.ndarray] = None,
+        headings: Optional[np.ndarray] = None,
+        ids: Optional[np.ndarray] = None,
+        process_noise: Optional[float] = None,
+    ) -> Prediction:
+        # states (N, 4) [x, y, vx, vy]; covariances (N, 4, 4) adds per-step position
+        # covariance P_pp + t (P_pv + P_vp) + t^2 P_vv + q t^3 / 3 I
+        states = np.asarray(states, dtype=float)
+        n = states.shape[0]
+        if n > self._positions.shape[0]:
+            capacity = self._positions.shape[0]
+            while capacity < n:
+                capacity *= 2
+            self._allocate(capacity)
+
+        positions = self._positions[:n]
+        np.multiply(states[:, None, 2:], self.times[None, :, None], out=positions)
+        positions += states[:, None, :2]
+
+        yaw = np.arctan2(states[:, 3], states[:, 2])
+        slow = np.hypot(states[:, 2], states[:, 3]) < self.min_heading_speed
+        if slow.any():
+            yaw[slow] = 0.0 if headings is None else np.asarray(headings, dtype=float)[slow]
+        yaws = self._yaws[:n]
+        yaws[:] = yaw[:, None]
+
+        cov = None
+        if covariances is not None:
+            P = np.asarray(covariances, dtype=float)[:, None]  # (N, 1, 4, 4)
+            cross = P[..., :2, 2:]
+            cov = self._covariances[:n]
+            np.multiply(self._t, cross + cross.swapaxes(-1, -2), out=cov)
+            cov += P[..., :2, :2]
+            cov += self._t2 * P[..., 2:, 2:]
+            q = self.process_noise if process_noise is None else process_noise
+            cov += q * self._noise_shape
+
+        return Prediction(self.times, positions, yaws, cov, ids)
+
+    def predict_tracks(
+        self,
+        bank: KalmanFilterBank,
+        with_covariance: bool = True,
+        slots: Optional[np.ndarray] = None,
+    ) -> Prediction:
+        # Predict straight from a KalmanFilterBank (all active tracks, or the given rows)
+        # using the bank's own process noise for covariance growth
+        if slots is None:
+            states, covariances, ids = bank.states, bank.covariances, bank.ids
+        else:
+            states, covariances, ids = bank.states[slots], bank.covariances[slots], bank.ids[slots]
+        return self.predict(
+            states,
+            covariances if with_covariance else None,
+            ids=ids,
+            process_noise=bank.process_noise,
+        )
@@ -1,3 +1,256 @@
 # Lane-following intent prediction - predicts agents will stay in lane
+# LaneIndex is built once per map: every lane centerline is resampled at a fixed
+# spacing into one (P, 2) point array with per-point lane id, arc length and heading,
+# indexed by a KD-tree. Nearest-lane, projection to arc length and sample-ahead are
+# then batched array queries instead of walks over MetaDrive's road network.
+# Indexes are cached on disk per (map_type, seed), so a map is only walked once.
+
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.prediction.constant_velocity import ConstantVelocityPredictor, Prediction
+from robust_autonomy_stack.utils.lazy import lazy_import
+from robust_autonomy_stack.utils.profiling import timed
+
+spatial = lazy_import("scipy.spatial")
+
+
+# Bump when the cached layout changes so old cache files are rebuilt
+INDEX_VERSION = 1
+LANE_CACHE_DIR = Path.home() / ".cache" / "robust_autonomy_stack" / "lane_index"
+
+# Lane end -> lane start distance (m) and heading difference (rad) counted as connected
+CONNECT_DISTANCE_M = 0.5
+CONNECT_HEADING_RAD = math.radians(30.0)
+
+
+class LaneIndex:
+    # Resampled lane centerlines with a KD-tree and arc-length tables
+
+    def __init__(self, lane_keys: Sequence[str], centerlines: Sequence[np.ndarray], spacing: float):
+        # centerlines: one (K_i, 2) array per lane, sampled every `spacing` metres from
+        # the lane start (the last sample sits at the lane end, possibly closer)
+        self.spacing = spacing
+        self.lane_keys = [str(key) for key in lane_keys]
+        counts = np.array([len(c) for c in centerlines], dtype=np.int64)
+        if np.any(counts < 2):
+            raise ValueError("Every lane centerline needs at least 2 points")
+        self.lane_start = np.concatenate(([0], np.cumsum(counts)[:-1]))  # (L,) first point row
+        self.lane_count = counts  # (L,) points per lane
+        self.points = np.concatenate(centerlines).astype(np.float64)  # (P, 2)
+        self.point_lane = np.repeat(np.arange(len(counts)), counts)  # (P,)
+
+        seg = np.diff(self.points, axis=0)
+        seg_len = np.hypot(seg[:, 0], seg[:, 1])
+        seg_heading = np.arctan2(seg[:, 1], seg[:, 0])
+        last = self.lane_start + counts - 1
+        # Arc length restarts at 0 on every lane
+        cum = np.concatenate(([0.0], np.cumsum(seg_len)))
+        self.point_s = cum - np.repeat(cum[self.lane_start], counts)
+        self.lane_length = self.point_s[last]
+        # Heading of the segment leaving each point (the last point reuses its incoming one)
+        self.point_heading = np.append(seg_heading, 0.0)
+        self.point_heading[last] = seg_heading[last - 1]
+        # Arc length on one increasing axis across all lanes, for batched searchsorted
+        self._lane_base = np.concatenate(([0.0], np.cumsum(self.lane_length + 1.0)[:-1]))
+        self._global_s = self.point_s + self._lane_base[self.point_lane]
+        self.successor = self._connect()
+        self.tree = spatial.cKDTree(self.points)
+
+    @property
+    def num_lanes(self) -> int:
+        return len(self.lane_keys)
+
+    def _connect(self) -> np.ndarray:
+        # (L,) successor lane of each lane (-1 if none): a lane starting where this one
+        # ends, with a similar heading (the straightest one if there are several)
+        starts = self.points[self.lane_start]
+        ends = self.points[self.lane_start + self.lane_count - 1]
+        end_heading = self.point_heading[self.lane_start + self.lane_count - 1]
+        start_heading = self.point_heading[self.lane_start]
+        successor = np.full(self.num_lanes, -1, dtype=np.int64)
+        tree = spatial.cKDTree(starts)
+        for lane, nearby in enumerate(tree.query_ball_point(ends, CONNECT_DISTANCE_M)):
+            turn = np.abs(np.angle(np.exp(1j * (start_heading[nearby] - end_heading[lane]))))
+            ok = [(t, other) for t, other in zip(turn, nearby) if other != lane and t < CONNECT_HEADING_RAD]
+            if ok:
+                successor[lane] = min(ok)[1]
+        return successor
+
+    def project(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Project (N, 2) points onto their nearest lane
+        # Returns lane (N,), arc length s (N,), signed lateral offset (N, +left), heading (N,)
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        _, nearest = self.tree.query(points)
+        lane = self.point_lane[nearest]
+        first = self.lane_start[lane]
+        last = first + self.lane_count[lane] - 1
+        # Candidate segments: the one leaving the nearest sample and the one entering it
+        seg_a = np.stack([np.minimum(nearest, last - 1), np.maximum(nearest - 1, first)], axis=1)
+        p0 = self.points[seg_a]  # (N, 2, 2)
+        p1 = self.points[seg_a + 1]
+        d = p1 - p0
+        rel = points[:, None, :] - p0
+        length_sq = np.maximum((d * d).sum(-1), 1e-12)
+        u = np.clip((rel * d).sum(-1) / length_sq, 0.0, 1.0)
+        foot = p0 + u[..., None] * d
+        dist_sq = ((points[:, None, :] - foot) ** 2).sum(-1)
+        best = np.argmin(dist_sq, axis=1)
+        rows = np.arange(points.shape[0])
+        seg = seg_a[rows, best]
+        u = u[rows, best]
+        d = d[rows, best]
+        s = self.point_s[seg] + u * np.hypot(d[:, 0], d[:, 1])
+        heading = self.point_heading[seg]
+        rel = points - foot[rows, best]
+        lateral = -np.sin(heading) * rel[:, 0] + np.cos(heading) * rel[:, 1]
+        return lane, s, lateral, heading
+
+    def nearest_lane(self, points: np.ndarray, max_distance: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        # (lane (N,), distance to its nearest centerline sample (N,)); lane -1 beyond max_distance
+        dist, nearest = self.tree.query(np.asarray(points, dtype=float).reshape(-1, 2),
+                                        distance_upper_bound=max_distance)
+        lane = np.full(dist.shape[0], -1, dtype=np.int64)
+        found = np.isfinite(dist)
+        lane[found] = self.point_lane[nearest[found]]
+        return lane, dist
+
+    def sample_ahead(
+        self, lane: np.ndarray, s: np.ndarray, distances: np.ndarray, max_hops: int = 4
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Centerline points `distances` ahead of arc length s on each lane, following
+        # successor lanes and extrapolating straight past a dead end
+        # lane, s: (N,); distances: (T,) or (N, T). Returns positions (N, T, 2), headings (N, T)
+        lane = np.asarray(lane, dtype=np.int64)
+        distances = np.asarray(distances, dtype=float)
+        target = np.broadcast_to(s[:, None] + distances, (lane.shape[0], distances.shape[-1])).copy()
+        lanes = np.broadcast_to(lane[:, None], target.shape).copy()
+
+        # Carry arc length over into successor lanes
+        for _ in range(max_hops):
+            over = target > self.lane_length[lanes]
+            nxt = np.where(over, self.successor[lanes], -1)
+            hop = nxt >= 0
+            if not hop.any():
+                break
+            target[hop] -= self.lane_length[lanes[hop]]
+            lanes[hop] = nxt[hop]
+
+        length = self.lane_length[lanes]
+        beyond = np.maximum(target - length, 0.0)  # past a dead end: extrapolate
+        target = np.clip(target, 0.0, length)
+        first = self.lane_start[lanes]
+        row = np.searchsorted(self._global_s, self._lane_base[lanes] + target, side="right") - 1
+        row = np.clip(row, first, first + self.lane_count[lanes] - 2)
+        seg_len = np.maximum(self.point_s[row + 1] - self.point_s[row], 1e-12)
+        u = ((target - self.point_s[row]) / seg_len)[..., None]
+        positions = (1.0 - u) * self.points[row] + u * self.points[row + 1]
+        heading = self.point_heading[row]
+        positions[..., 0] += beyond * np.cos(heading)
+        positions[..., 1] += beyond * np.sin(heading)
+        return positions, heading
+
+    def save(self, path: Path):
+        centerline_ends = self.lane_start + self.lane_count
+        np.savez(
+            path,
+            version=INDEX_VERSION,
+            spacing=self.spacing,
+            lane_keys=np.array(self.lane_keys),
+            points=self.points,
+            lane_start=self.lane_start,
+            lane_end=centerline_ends,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "LaneIndex":
+        with np.load(path) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                raise ValueError(f"Lane index {path} has version {int(data['version'])}")
+            points = data["points"]
+            centerlines = [points[a:b] for a, b in zip(data["lane_start"], data["lane_end"])]
+            return cls(data["lane_keys"].tolist(), centerlines, float(data["spacing"]))
+
+
+def lane_index_cache_path(map_type: str, seed: int, spacing: float, cache_dir: Optional[Path] = None) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir is not None else LANE_CACHE_DIR
+    return cache_dir / f"{map_type}_seed{seed}_{spacing:g}m_v{INDEX_VERSION}.npz"
+
+
+def load_lane_index(
+    adapter,
+    map_type: str,
+    seed: int,
+    spacing: float = 1.0,
+    cache_dir: Optional[Path] = None,
+) -> LaneIndex:
+    # Lane index for the adapter's current map: from the disk cache when present,
+    # otherwise built from MetaDrive's road network and cached
+    path = lane_index_cache_path(map_type, seed, spacing, cache_dir)
+    if path.is_file():
+        try:
+            return LaneIndex.load(path)
+        except (ValueError, KeyError, OSError):
+            pass  # Stale or unreadable: rebuild below
+    keys, centerlines = adapter.get_lane_centerlines(spacing)
+    index = LaneIndex(keys, centerlines, spacing)
+    # Unique temp file + rename: parallel workers loading the same map never write
+    # into each other's file or read a half-written one
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp.npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            index.save(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return index
+
+
+class LaneIntentPredictor:
+    # Rolls each agent forward along its lane centerline at its current speed
+    # Agents farther than max_lane_offset from any lane (or moving against it) fall
+    # back to constant velocity. Output matches ConstantVelocityPredictor.
+
+    def __init__(
+        self,
+        config: StackConfig,
+        lane_index: LaneIndex,
+        max_lane_offset: float = 2.5,
+        max_heading_error: float = math.radians(60.0),
+    ):
+        self.lane_index = lane_index
+        self.max_lane_offset = max_lane_offset
+        self.max_heading_error = max_heading_error
+        self.fallback = ConstantVelocityPredictor(config)
+        self.times = self.fallback.times
+
+    @timed("prediction.lane_intent")
+    def predict(self, states: np.ndarray, ids: Optional[np.ndarray] = None) -> Prediction:
+        # states (N, 4) [x, y, vx, vy] -> Prediction on the planner's time grid
+        states = np.asarray(states, dtype=float)
+        prediction = self.fallback.predict(states, ids=ids)
+        if states.shape[0] == 0:
+            return prediction
+
+        lane, s, lateral, lane_heading = self.lane_index.project(states[:, :2])
+        speed = np.hypot(states[:, 2], states[:, 3])
+        motion_heading = np.arctan2(states[:, 3], states[:, 2])
+        heading_error = np.abs(np.angle(np.exp(1j * (motion_heading - lane_heading))))
+        follow = (np.abs(lateral) <= self.max_lane_offset) & (
+            (heading_error <= self.max_heading_error) | (speed < self.fallback.min_heading_speed)
+        )
+        if follow.any():
+            distances = speed[follow, None] * self.times[None, :]
+            positions, headings = self.lane_index.sample_ahead(lane[follow], s[follow], distances)
+            prediction.positions[follow] = positions
+            prediction.yaws[follow] = headings
+        return prediction
 
-# TODO: Implement lane intent predictor (Phase 3)
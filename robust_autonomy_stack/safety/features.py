@@ -1,4 +1,232 @@
 # Feature extraction for risk model
 # Computes health signals from the stack to feed into ML risk predictor
+# Each raw signal (tracking residual, prediction error, planner cost margin, ...) gets a
+# fixed-size ring buffer covering the last StackConfig.risk_horizon_s. Running sum,
+# monotonic-deque min/max and an EWMA are updated in O(1) per tick, and the windowed
+# statistics are written straight into the float32 vector RiskModel.predict() takes.
+# Training data is built by replaying logged signals through the same extractor.
 
-# TODO: Implement feature extraction (Phase 5)
+import json
+import math
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.evaluation.logger import META_FILE, load_run_log
+from robust_autonomy_stack.evaluation.metrics import TTC_EDGES
+from robust_autonomy_stack.utils.scheduler import DEADLINE_FEATURE_NAMES
+
+
+# Raw per-tick health signals (missing ones are NaN and skipped by the windows)
+SIGNAL_NAMES = (
+    "tracking_residual",  # mean innovation norm of matched tracks (m)
+    "prediction_error",  # displacement error of last tick's one-step prediction (m)
+    "cost_margin",  # second-best minus best candidate cost
+    "min_ttc",  # time to collision, capped at TTC_CAP_S
+    "speed",  # ego speed (m/s)
+    "steering",  # ego steering
+)
+
+# Windowed statistics per signal
+WINDOW_STATS = ("mean", "min", "max", "ewma", "last")
+
+TTC_CAP_S = float(TTC_EDGES[-1])
+
+# Run log column each signal is read from in bulk mode (others: feat_<signal>)
+SIGNAL_COLUMNS = {"speed": "ego_speed", "steering": "ego_steering"}
+
+
+def feature_names(signals: Sequence[str] = SIGNAL_NAMES, include_deadline: bool = True) -> List[str]:
+    # Order of the risk model's feature vector: <signal>_<stat>..., then scheduler features
+    names = [f"{signal}_{stat}" for signal in signals for stat in WINDOW_STATS]
+    if include_deadline:
+        names.extend(DEADLINE_FEATURE_NAMES)
+    return names
+
+
+FEATURE_NAMES = tuple(feature_names())
+
+
+class RingWindow:
+    # Sliding window over the last `size` ticks with O(1) sum, min, max and EWMA
+
+    __slots__ = ("size", "alpha", "values", "head", "ticks", "total", "valid", "min_q", "max_q", "ewma")
+
+    def __init__(self, size: int, alpha: float):
+        self.size = size
+        self.alpha = alpha
+        self.values = [math.nan] * size
+        self.reset()
+
+    def reset(self):
+        for i in range(self.size):
+            self.values[i] = math.nan
+        self.head = 0
+        self.ticks = 0
+        self.total = 0.0
+        self.valid = 0
+        # (tick, value) with values increasing (min_q) / decreasing (max_q) front to back
+        self.min_q = deque()
+        self.max_q = deque()
+        self.ewma = math.nan
+
+    def push(self, value: float):
+        old = self.values[self.head]
+        if old == old:  # not NaN
+            self.total -= old
+            self.valid -= 1
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        tick = self.ticks
+        self.ticks += 1
+        # Re-sum once per lap so the running sum cannot drift
+        if self.head == 0:
+            self.total = 0.0
+            self.valid = 0
+            for v in self.values:
+                if v == v:
+                    self.total += v
+                    self.valid += 1
+        elif value == value:
+            self.total += value
+            self.valid += 1
+
+        expired = tick - self.size
+        min_q, max_q = self.min_q, self.max_q
+        if min_q and min_q[0][0] <= expired:
+            min_q.popleft()
+        if max_q and max_q[0][0] <= expired:
+            max_q.popleft()
+        if value != value:
+            return
+        while min_q and min_q[-1][1] >= value:
+            min_q.pop()
+        min_q.append((tick, value))
+        while max_q and max_q[-1][1] <= value:
+            max_q.pop()
+        max_q.append((tick, value))
+        ewma = self.ewma
+        self.ewma = value if ewma != ewma else ewma + self.alpha * (value - ewma)
+
+    def write(self, out: np.ndarray, offset: int):
+        # mean, min, max, ewma, last into out[offset:offset + 5] (NaN when empty)
+        if self.valid:
+            out[offset] = self.total / self.valid
+            out[offset + 1] = self.min_q[0][1]
+            out[offset + 2] = self.max_q[0][1]
+        else:
+            out[offset] = out[offset + 1] = out[offset + 2] = math.nan
+        out[offset + 3] = self.ewma
+        out[offset + 4] = self.values[self.head - 1]
+
+
+class FeatureExtractor:
+    # Incremental windowed features over the last risk_horizon_s of stack signals
+
+    def __init__(
+        self,
+        config: StackConfig,
+        dt: float,
+        signals: Sequence[str] = SIGNAL_NAMES,
+        include_deadline: bool = True,
+    ):
+        # dt: seconds per tick; the window holds ceil(risk_horizon_s / dt) ticks and the
+        # EWMA has a time constant of half the horizon
+        self.signals = tuple(signals)
+        self.include_deadline = include_deadline
+        self.feature_names = feature_names(self.signals, include_deadline)
+        self.window_ticks = max(1, math.ceil(config.risk_horizon_s / dt - 1e-9))
+        alpha = 1.0 - math.exp(-dt / (0.5 * config.risk_horizon_s))
+        self.windows = [RingWindow(self.window_ticks, alpha) for _ in self.signals]
+        self.vector = np.full(len(self.feature_names), np.nan, dtype=np.float32)
+        self._deadline_offset = len(self.signals) * len(WINDOW_STATS)
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_names)
+
+    def reset(self):
+        # Start a new episode
+        for window in self.windows:
+            window.reset()
+        self.vector.fill(np.nan)
+
+    def update(
+        self,
+        signals: Mapping[str, float],
+        deadline: Optional[Mapping[str, float]] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # Push one tick of signals (missing keys count as NaN) and write the features
+        # into `out` (default: self.vector, reused every tick)
+        # deadline: TickScheduler.deadline_features()
+        out = self.vector if out is None else out
+        offset = 0
+        stride = len(WINDOW_STATS)
+        for name, window in zip(self.signals, self.windows):
+            value = float(signals.get(name, math.nan))
+            if name == "min_ttc" and value > TTC_CAP_S:
+                value = TTC_CAP_S
+            window.push(value)
+            window.write(out, offset)
+            offset += stride
+        if self.include_deadline:
+            for i, name in enumerate(DEADLINE_FEATURE_NAMES):
+                out[self._deadline_offset + i] = math.nan if deadline is None else deadline.get(name, math.nan)
+        return out
+
+    def extract(self, columns: Mapping[str, np.ndarray], rows: Optional[int] = None) -> np.ndarray:
+        # Bulk mode: (N, F) float32 features for N consecutive ticks of one episode
+        # columns: {signal or deadline feature name: (N,) values}; missing names are NaN
+        # Runs every row through update(), the same code the online path uses
+        if rows is None:
+            rows = len(next(iter(columns.values()))) if columns else 0
+        matrix = np.empty((rows, self.num_features), dtype=np.float32)
+        nan = np.full(rows, np.nan)
+        signal_cols = [np.asarray(columns.get(name, nan), dtype=np.float64).tolist() for name in self.signals]
+        deadline_cols = [np.asarray(columns.get(name, nan), dtype=np.float64).tolist()
+                         for name in DEADLINE_FEATURE_NAMES]
+        self.reset()
+        signals: Dict[str, float] = {}
+        deadline: Dict[str, float] = {}
+        for row in range(rows):
+            for name, col in zip(self.signals, signal_cols):
+                signals[name] = col[row]
+            for name, col in zip(DEADLINE_FEATURE_NAMES, deadline_cols):
+                deadline[name] = col[row]
+            self.update(signals, deadline, out=matrix[row])
+        return matrix
+
+
+def logged_signal_names(signals: Sequence[str] = SIGNAL_NAMES) -> List[str]:
+    # RunLogger feature_names for the raw signals bulk mode needs (speed and steering
+    # come from the ego columns every log already has)
+    names = [name for name in signals if name not in SIGNAL_COLUMNS]
+    names.extend(DEADLINE_FEATURE_NAMES)
+    return names
+
+
+def extract_run_features(
+    run_dir: Path,
+    config: Optional[StackConfig] = None,
+    dt: Optional[float] = None,
+    signals: Sequence[str] = SIGNAL_NAMES,
+) -> np.ndarray:
+    # (N, F) features for every logged tick of a run (dt defaults to the log's "dt")
+    run_dir = Path(run_dir)
+    config = config or StackConfig()
+    with open(run_dir / META_FILE) as f:
+        meta = json.load(f)
+    if dt is None:
+        if meta.get("dt") is None:
+            raise ValueError(f"Run log {run_dir} does not record dt; pass it explicitly")
+        dt = meta["dt"]
+    wanted = {name: SIGNAL_COLUMNS.get(name, f"feat_{name}") for name in signals}
+    wanted.update({name: f"feat_{name}" for name in DEADLINE_FEATURE_NAMES})
+    present = {name: column for name, column in wanted.items() if column in meta["columns"]}
+    log = load_run_log(run_dir, list(present.values()))
+    columns = {name: log[column] for name, column in present.items()}
+    return FeatureExtractor(config, dt, signals).extract(columns, rows=meta["rows"])
@@ -1,4 +1,222 @@
 # ML-based failure risk prediction model
 # Predicts probability of failure within next H seconds based on stack features
+# Per tick, a preallocated float32 feature vector is scored by CompiledTrees: the
+# booster's trees flattened into node arrays and walked level by level for all trees at
+# once, with no DataFrame, DMatrix or per-call config parsing. (A single-row
+# inplace_predict is dominated by that fixed overhead.) Offline scoring of many ticks or
+# episodes goes through predict_batch() and the booster's multithreaded inplace_predict.
+# Every call is timed into a fixed-size latency histogram.
 
-# TODO: Implement risk model (Phase 5)
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from robust_autonomy_stack.utils.profiling import PROFILER, LatencyHistogram
+
+
+META_SUFFIX = ".meta.json"
+
+# Objectives CompiledTrees reproduces (margin -> probability via the sigmoid)
+_LOGISTIC_OBJECTIVES = ("binary:logistic", "reg:logistic")
+
+
+class CompiledTrees:
+    # Flattened tree ensemble for low-latency scoring of a binary:logistic XGBoost model
+    # Leaves point back at themselves, so every row just takes max_depth steps
+
+    def __init__(self, booster):
+        model = json.loads(booster.save_raw("json"))["learner"]
+        objective = model["objective"]["name"]
+        params = model["learner_model_param"]
+        gbm = model["gradient_booster"]
+        if objective not in _LOGISTIC_OBJECTIVES or gbm["name"] != "gbtree":
+            raise ValueError(f"Cannot compile a {gbm['name']} model with objective {objective}")
+        if int(params.get("num_class", 0)) > 1 or int(params.get("num_target", 1)) > 1:
+            raise ValueError("Cannot compile a multi-output model")
+        if any(tree.get("categories_nodes") for tree in gbm["model"]["trees"]):
+            raise ValueError("Cannot compile categorical splits")
+
+        lefts, rights, features, thresholds, default_left, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for tree in gbm["model"]["trees"]:
+            left = np.asarray(tree["left_children"], dtype=np.int64)
+            right = np.asarray(tree["right_children"], dtype=np.int64)
+            nodes = np.arange(left.shape[0])
+            leaf = left < 0
+            lefts.append(np.where(leaf, nodes, left) + offset)
+            rights.append(np.where(leaf, nodes, right) + offset)
+            features.append(np.where(leaf, 0, tree["split_indices"]))
+            # Leaves keep their value in split_conditions
+            thresholds.append(tree["split_conditions"])
+            default_left.append(tree["default_left"])
+            roots.append(offset)
+            offset += left.shape[0]
+            depth = max(depth, _tree_depth(left, right))
+
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds).astype(np.float32)
+        self.default_left = np.concatenate(default_left).astype(bool)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.depth = depth
+
+        # Base margin exactly as XGBoost applies it (base_score clipped away from 0 and 1),
+        # recovered from one margin prediction rather than re-derived from base_score
+        probe = np.full((1, int(params["num_feature"])), np.nan, dtype=np.float32)
+        self.base_margin = 0.0
+        booster_margin = booster.inplace_predict(probe, predict_type="margin", validate_features=False)
+        self.base_margin = float(booster_margin[0]) - self.margin(probe[0])
+
+    def margin(self, features: np.ndarray) -> float:
+        # Raw margin for one (F,) float32 feature vector
+        node = self.roots
+        for _ in range(self.depth):
+            values = features[self.feature[node]]
+            # x < threshold goes left; missing values follow the node's default
+            go_left = (values < self.threshold[node]) | (np.isnan(values) & self.default_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return float(self.threshold[node].sum(dtype=np.float64)) + self.base_margin
+
+    def predict(self, features: np.ndarray) -> float:
+        return 1.0 / (1.0 + math.exp(-self.margin(features)))
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    # Number of splits on the longest root-to-leaf path
+    depth = 0
+    level = np.array([0])
+    while True:
+        level = level[left[level] >= 0]
+        if level.shape[0] == 0:
+            return depth
+        level = np.concatenate((left[level], right[level]))
+        depth += 1
+
+
+class RiskModel:
+    # Failure-risk classifier wrapper with a low-overhead per-tick path
+
+    def __init__(
+        self,
+        model: Any,
+        feature_names: Sequence[str],
+        horizon_s: Optional[float] = None,
+        batch_size: int = 65536,
+        compile_trees: bool = True,
+    ):
+        # model: xgboost.Booster, xgboost.XGBClassifier, or any estimator with
+        # predict_proba (used with plain arrays, never DataFrames)
+        self.feature_names = list(feature_names)
+        self.horizon_s = horizon_s
+        self.batch_size = batch_size
+        self.booster = None
+        self.estimator = None
+        self.compiled: Optional[CompiledTrees] = None
+
+        try:
+            import xgboost as xgb
+        except ImportError:
+            xgb = None
+        if xgb is not None and isinstance(model, xgb.XGBModel):
+            model = model.get_booster()
+        if xgb is not None and isinstance(model, xgb.Booster):
+            self.booster = model
+            # A single row is far too small to be worth a thread pool
+            self.booster.set_param({"nthread": 1})
+            if compile_trees:
+                try:
+                    self.compiled = CompiledTrees(model)
+                except ValueError:
+                    pass  # Unsupported objective or split type: use inplace_predict
+        elif hasattr(model, "predict_proba"):
+            self.estimator = model
+        else:
+            raise TypeError(f"Unsupported risk model type {type(model).__name__}")
+
+        self._row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        self.latency = LatencyHistogram()  # predict() calls
+        self.batch_latency = LatencyHistogram()  # predict_batch() calls
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_names)
+
+    def predict(self, features: np.ndarray) -> float:
+        # Risk for one (F,) feature vector (float32 preferred; ordered like feature_names)
+        start = time.perf_counter_ns()
+        row = self._row
+        row[0] = features
+        if self.compiled is not None:
+            risk = self.compiled.predict(row[0])
+        elif self.booster is not None:
+            risk = float(self.booster.inplace_predict(row, validate_features=False)[0])
+        else:
+            risk = float(self.estimator.predict_proba(row)[0, 1])
+        elapsed = time.perf_counter_ns() - start
+        self.latency.record(elapsed)
+        PROFILER.record("safety.risk_model", elapsed)
+        return risk
+
+    def predict_batch(self, features: np.ndarray, num_threads: int = 0) -> np.ndarray:
+        # Risk for an (N, F) matrix (many ticks or episodes), in chunks of batch_size
+        # num_threads=0 lets XGBoost use every core
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        if features.ndim != 2 or features.shape[1] != self.num_features:
+            raise ValueError(f"Expected (N, {self.num_features}) features, got {features.shape}")
+        start = time.perf_counter_ns()
+        out = np.empty(features.shape[0], dtype=np.float32)
+        if self.booster is not None:
+            self.booster.set_param({"nthread": num_threads})
+            try:
+                for lo in range(0, features.shape[0], self.batch_size):
+                    chunk = features[lo:lo + self.batch_size]
+                    out[lo:lo + chunk.shape[0]] = self.booster.inplace_predict(
+                        chunk, validate_features=False
+                    )
+            finally:
+                self.booster.set_param({"nthread": 1})
+        else:
+            for lo in range(0, features.shape[0], self.batch_size):
+                chunk = features[lo:lo + self.batch_size]
+                out[lo:lo + chunk.shape[0]] = self.estimator.predict_proba(chunk)[:, 1]
+        self.batch_latency.record(time.perf_counter_ns() - start)
+        return out
+
+    def latency_stats(self) -> Dict[str, float]:
+        # Per-call latency of the per-tick path in microseconds
+        hist = self.latency
+        return {
+            "calls": hist.count,
+            "mean_us": hist.mean_ns / 1e3,
+            "p50_us": hist.percentile_ns(0.50) / 1e3,
+            "p99_us": hist.percentile_ns(0.99) / 1e3,
+            "max_us": hist.max_ns / 1e3,
+        }
+
+    def save(self, path: Path):
+        # XGBoost model file (format from the suffix, e.g. .json/.ubj) plus a metadata sidecar
+        if self.booster is None:
+            raise TypeError("Only XGBoost risk models can be saved")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.booster.save_model(path)
+        meta = {"feature_names": self.feature_names, "horizon_s": self.horizon_s}
+        with open(path.with_name(path.name + META_SUFFIX), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "RiskModel":
+        import xgboost as xgb
+
+        path = Path(path)
+        with open(path.with_name(path.name + META_SUFFIX)) as f:
+            meta = json.load(f)
+        booster = xgb.Booster()
+        booster.load_model(path)
+        return cls(booster, meta["feature_names"], meta.get("horizon_s"), **kwargs)
@@ -0,0 +1,310 @@
+# Risk model training - out-of-core pipeline from Parquet feature shards to an XGBoost model
+# A shard is a Parquet file of consecutive ticks from whole episodes: episode_id,
+# step, sim_time_s, the FEATURE_NAMES columns and the crash/out_of_road flags.
+# Labels ("failure within H seconds") only need the small id/time/flag columns, so
+# they are built per shard with a vectorized look-ahead, in parallel, and cached as
+# .npy files keyed on the shard's path, size and mtime. Training then streams one row group at a time (feature columns only)
+# through an xgboost.DataIter into an external-memory (or quantile) DMatrix, so the
+# full feature table is never held in RAM.
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.evaluation.logger import META_FILE, load_run_log
+from robust_autonomy_stack.safety.features import FEATURE_NAMES, extract_run_features
+from robust_autonomy_stack.safety.risk_model import RiskModel
+
+
+FAILURE_COLUMNS = ("crash", "out_of_road")
+LABEL_COLUMNS = ("episode_id", "sim_time_s") + FAILURE_COLUMNS
+MODEL_FILE = "risk_model.ubj"
+SUMMARY_FILE = "training_summary.json"
+
+DEFAULT_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": ["logloss", "aucpr"],
+    "tree_method": "hist",
+    "max_depth": 6,
+    "eta": 0.1,
+    "subsample": 0.8,
+    "max_bin": 256,
+}
+
+
+# Shards from run logs
+
+def _write_shard(run_dirs: Sequence[Path], first_episode: int, path: Path, row_group_rows: int) -> int:
+    # One shard from consecutive run logs (one episode each); returns rows written
+    tables = []
+    for episode, run_dir in enumerate(run_dirs, start=first_episode):
+        with open(Path(run_dir) / META_FILE) as f:
+            dt = json.load(f).get("dt")
+        if dt is None:
+            raise ValueError(f"Run log {run_dir} does not record dt")
+        features = extract_run_features(run_dir, dt=dt)
+        log = load_run_log(run_dir, ["step", *FAILURE_COLUMNS])
+        columns = {
+            "episode_id": np.full(features.shape[0], episode, dtype=np.int64),
+            "step": log["step"],
+            "sim_time_s": log["step"].astype(np.float64) * dt,
+        }
+        columns.update({name: features[:, i] for i, name in enumerate(FEATURE_NAMES)})
+        columns.update({name: log[name] for name in FAILURE_COLUMNS})
+        tables.append(pa.table(columns))
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(pa.concat_tables(tables), tmp, row_group_size=row_group_rows)
+    tmp.replace(path)
+    return sum(table.num_rows for table in tables)
+
+
+def write_feature_shards(
+    run_dirs: Sequence[Path],
+    output_dir: Path,
+    episodes_per_shard: int = 256,
+    row_group_rows: int = 65536,
+    num_workers: Optional[int] = None,
+) -> List[Path]:
+    # Convert run logs into Parquet feature shards (features via extract_run_features)
+    # Shards left in output_dir by an earlier, larger conversion are removed, so the
+    # directory holds exactly this set
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    run_dirs = list(run_dirs)
+    groups = [run_dirs[i:i + episodes_per_shard] for i in range(0, len(run_dirs), episodes_per_shard)]
+    paths = [output_dir / f"shard_{i:05d}.parquet" for i in range(len(groups))]
+    for stale in set(output_dir.glob("shard_*.parquet")) - set(paths):
+        stale.unlink()
+    jobs = [
+        (group, i * episodes_per_shard, path, row_group_rows)
+        for i, (group, path) in enumerate(zip(groups, paths))
+    ]
+    workers = min(num_workers or os.cpu_count() or 1, len(jobs)) if jobs else 1
+    if workers == 1:
+        for job in jobs:
+            _write_shard(*job)
+    else:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+            for future in [pool.submit(_write_shard, *job) for job in jobs]:
+                future.result()
+    return paths
+
+
+# Labels
+
+def failure_labels(
+    episode_id: np.ndarray, sim_time_s: np.ndarray, failure: np.ndarray, horizon_s: float
+) -> np.ndarray:
+    # 1 where the same episode fails within (t, t + horizon_s], else 0; rows in any order
+    order = np.lexsort((sim_time_s, episode_id))
+    episode, t, failed = episode_id[order], sim_time_s[order], failure[order].astype(bool)
+    n = order.shape[0]
+    labels = np.zeros(n, dtype=np.uint8)
+    if n == 0:
+        return labels
+    # Index of the next failing row strictly after each row (n if none)
+    candidates = np.where(failed, np.arange(n), n)
+    next_fail = np.append(np.minimum.accumulate(candidates[::-1])[::-1][1:], n)
+    has_next = next_fail < n
+    j = np.minimum(next_fail, n - 1)
+    hit = has_next & (episode[j] == episode) & (t[j] - t <= horizon_s)
+    labels[order] = hit
+    return labels
+
+
+def label_cache_path(shard: Path, horizon_s: float, cache_dir: Path) -> Path:
+    # Keyed on the shard's resolved path, size and mtime: a rewritten shard, or a
+    # same-named shard from another data dir, never picks up these labels
+    shard = Path(shard)
+    st = shard.stat()
+    key = hashlib.sha1(f"{shard.resolve()}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{shard.stem}_{key}_h{horizon_s:g}s.npy"
+
+
+def build_shard_labels(shard: Path, horizon_s: float, cache_dir: Path) -> Tuple[int, int]:
+    # Labels for one shard (reading only LABEL_COLUMNS), cached next to the other shards'
+    # Returns (rows, positives)
+    path = label_cache_path(shard, horizon_s, cache_dir)
+    if path.is_file():
+        labels = np.load(path, mmap_mode="r")
+        if labels.shape[0] == pq.ParquetFile(shard).metadata.num_rows:
+            return int(labels.shape[0]), int(labels.sum())
+    table = pq.read_table(shard, columns=list(LABEL_COLUMNS))
+    failure = np.zeros(table.num_rows, dtype=bool)
+    for name in FAILURE_COLUMNS:
+        failure |= table.column(name).to_numpy(zero_copy_only=False).astype(bool)
+    labels = failure_labels(
+        table.column("episode_id").to_numpy(),
+        table.column("sim_time_s").to_numpy(),
+        failure,
+        horizon_s,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, labels)
+    tmp.replace(path)
+    return int(labels.shape[0]), int(labels.sum())
+
+
+def build_labels(
+    shards: Sequence[Path], horizon_s: float, cache_dir: Path, num_workers: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    # build_shard_labels for every shard, one process per shard at a time
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    workers = min(num_workers or os.cpu_count() or 1, len(shards)) if shards else 1
+    if workers == 1:
+        return [build_shard_labels(shard, horizon_s, cache_dir) for shard in shards]
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(build_shard_labels, shard, horizon_s, cache_dir) for shard in shards]
+        return [future.result() for future in futures]
+
+
+# Streaming
+
+class ShardIterator(xgb.DataIter):
+    # Feeds XGBoost one Parquet row group at a time (feature columns only) with its labels
+
+    def __init__(
+        self,
+        shards: Sequence[Path],
+        label_paths: Sequence[Path],
+        feature_names: Sequence[str],
+        cache_prefix: Optional[str] = None,
+    ):
+        super().__init__(cache_prefix=cache_prefix)
+        self.feature_names = list(feature_names)
+        self._parts = []  # (shard, row group, first row, label file)
+        for shard, label_path in zip(shards, label_paths):
+            metadata = pq.ParquetFile(shard).metadata
+            num_labels = np.load(label_path, mmap_mode="r").shape[0]
+            if num_labels != metadata.num_rows:
+                raise ValueError(f"{label_path} has {num_labels} labels for {metadata.num_rows} rows of {shard}")
+            offset = 0
+            for group in range(metadata.num_row_groups):
+                self._parts.append((shard, group, offset, label_path))
+                offset += metadata.row_group(group).num_rows
+        self._index = 0
+
+    def next(self, input_data) -> bool:
+        if self._index >= len(self._parts):
+            return False
+        shard, group, offset, label_path = self._parts[self._index]
+        table = pq.ParquetFile(shard).read_row_group(group, columns=self.feature_names)
+        features = np.empty((table.num_rows, len(self.feature_names)), dtype=np.float32)
+        for i, name in enumerate(self.feature_names):
+            features[:, i] = table.column(name).to_numpy(zero_copy_only=False)
+        labels = np.load(label_path, mmap_mode="r")[offset:offset + table.num_rows]
+        input_data(data=features, label=np.asarray(labels, dtype=np.float32),
+                   feature_names=self.feature_names)
+        self._index += 1
+        return True
+
+    def reset(self):
+        self._index = 0
+
+
+def _make_dmatrix(iterator: ShardIterator, external_memory: bool, max_bin: int, ref=None):
+    if external_memory and hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(iterator, max_bin=max_bin, ref=ref)
+    if external_memory:
+        return xgb.DMatrix(iterator)  # XGBoost < 3.0 external memory
+    return xgb.QuantileDMatrix(iterator, max_bin=max_bin, ref=ref)
+
+
+def find_shards(data_dir: Path) -> List[Path]:
+    return sorted(Path(data_dir).glob("*.parquet"))
+
+
+def train_risk_model(
+    data_dir: Path,
+    output_dir: Path,
+    config: Optional[StackConfig] = None,
+    horizon_s: Optional[float] = None,
+    num_rounds: int = 200,
+    params: Optional[Dict[str, Any]] = None,
+    val_fraction: float = 0.1,
+    external_memory: bool = True,
+    num_workers: Optional[int] = None,
+) -> RiskModel:
+    # Train on every shard in data_dir and save <output_dir>/risk_model.ubj (+ metadata)
+    # horizon_s defaults to StackConfig.risk_horizon_s; whole shards are held out for
+    # validation so no episode lands on both sides
+    config = config or StackConfig()
+    horizon_s = config.risk_horizon_s if horizon_s is None else horizon_s
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shards = find_shards(data_dir)
+    if not shards:
+        raise FileNotFoundError(f"No Parquet shards in {data_dir}")
+    missing = set(FEATURE_NAMES) - set(pq.read_schema(shards[0]).names)
+    if missing:
+        raise ValueError(f"Shard {shards[0]} lacks feature columns: {sorted(missing)}")
+
+    start = time.perf_counter()
+    cache_dir = output_dir / "cache"
+    counts = build_labels(shards, horizon_s, cache_dir, num_workers)
+    label_paths = [label_cache_path(shard, horizon_s, cache_dir) for shard in shards]
+    labels_s = time.perf_counter() - start
+
+    num_val = int(round(len(shards) * val_fraction)) if len(shards) > 1 else 0
+    if val_fraction > 0 and len(shards) > 1:
+        num_val = max(1, num_val)
+    train_idx = range(len(shards) - num_val)
+    val_idx = range(len(shards) - num_val, len(shards))
+    rows = sum(counts[i][0] for i in train_idx)
+    positives = sum(counts[i][1] for i in train_idx)
+
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    params.setdefault("scale_pos_weight", (rows - positives) / max(positives, 1))
+    max_bin = params["max_bin"]
+
+    def iterator(indices, name):
+        return ShardIterator(
+            [shards[i] for i in indices],
+            [label_paths[i] for i in indices],
+            FEATURE_NAMES,
+            cache_prefix=str(cache_dir / name) if external_memory else None,
+        )
+
+    dtrain = _make_dmatrix(iterator(train_idx, "train"), external_memory, max_bin)
+    evals = [(dtrain, "train")]
+    if num_val:
+        dval = _make_dmatrix(iterator(val_idx, "val"), external_memory, max_bin, ref=dtrain)
+        evals.append((dval, "val"))
+    history: Dict[str, Dict[str, List[float]]] = {}
+    booster = xgb.train(
+        params, dtrain, num_rounds,
+        evals=evals, evals_result=history, verbose_eval=max(1, num_rounds // 10),
+    )
+
+    model = RiskModel(booster, FEATURE_NAMES, horizon_s)
+    model.save(output_dir / MODEL_FILE)
+    summary = {
+        "horizon_s": horizon_s,
+        "shards": len(shards),
+        "rows": sum(r for r, _ in counts),
+        "positives": sum(p for _, p in counts),
+        "labels_s": labels_s,
+        "train_rows": rows,
+        "train_positives": positives,
+        "val_shards": num_val,
+        "num_rounds": num_rounds,
+        "external_memory": external_memory,
+        "final": {name: {metric: values[-1] for metric, values in metrics.items()}
+                  for name, metrics in history.items()},
+        "elapsed_s": time.perf_counter() - start,
+    }
+    with open(output_dir / SUMMARY_FILE, "w") as f:
+        json.dump(summary, f, indent=2)
+    return model
@@ -1,3 +1,287 @@
 # YAML scenario loader - reads scenario configs from YAML files
+# ScenarioCorpus loads a whole directory of scenario YAMLs. Each file is parsed (with
+# libyaml's C loader when available) and validated once; the validated configs are
+# kept in a compact binary index (.npz) in the user cache, keyed per file by mtime and
+# size with a content hash as fallback. Reopening a corpus only re-reads files that
+# changed. Filter fields (map_type, traffic_density, ...) are columns of the index, so
+# filtering never decodes a scenario, and configs are only built when iterated.
 
-# TODO: Implement YAML loader (Phase 7)
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import yaml
+
+from robust_autonomy_stack.config.schema import SafeLoader, ScenarioConfig
+
+
+# Bump when the cached layout changes so old index files are rebuilt
+INDEX_VERSION = 1
+SCENARIO_CACHE_DIR = Path.home() / ".cache" / "robust_autonomy_stack" / "scenario_index"
+YAML_PATTERNS = ("*.yaml", "*.yml")
+
+# Validated configs are only reused while the schema they were validated against holds
+_SCHEMA_HASH = hashlib.blake2b(
+    json.dumps(ScenarioConfig.model_json_schema(), sort_keys=True).encode(), digest_size=8
+).hexdigest()
+
+# Per-file status in the index
+OK, INVALID, NOT_SCENARIO = 0, 1, 2
+
+# Index columns filter() works on (placeholders for rows that are not valid scenarios)
+FILTER_COLUMNS = {
+    "names": str,
+    "map_type": str,
+    "traffic_density": np.float64,
+    "num_agents": np.int64,
+    "seed": np.int64,  # -1: no seed
+}
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _parse(data: bytes) -> Tuple[int, str]:
+    # (status, payload): validated config as compact JSON, or the error message
+    try:
+        raw = yaml.load(data, Loader=SafeLoader)
+        if isinstance(raw, dict) and "scenarios" in raw:
+            return NOT_SCENARIO, "benchmark suite"
+        if not isinstance(raw, dict):
+            return INVALID, "top level is not a mapping"
+        config = ScenarioConfig(**raw)
+    except Exception as e:  # YAML or validation error: recorded so the file is not re-parsed
+        return INVALID, f"{type(e).__name__}: {e}"
+    return OK, json.dumps(config.model_dump(mode="json"), separators=(",", ":"))
+
+
+def _columns(status: int, payload: str) -> tuple:
+    if status != OK:
+        return ("", "", np.nan, -1, -1)
+    config = json.loads(payload)
+    seed = config["seed"]
+    return (config["name"], config["map_type"], config["traffic_density"], config["num_agents"],
+            -1 if seed is None else seed)
+
+
+class ScenarioCorpus:
+    # Validated, cached, filterable view of every scenario YAML under a directory
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        recursive: bool = True,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+    ):
+        # Files that fail to parse or validate are skipped (see .errors); files with a
+        # top-level `scenarios` key are benchmark suites and are skipped silently
+        self.root = Path(root)
+        self.recursive = recursive
+        self.cache_path: Optional[Path] = None
+        if use_cache:
+            key = hashlib.blake2b(f"{self.root.resolve()}|{recursive}".encode(), digest_size=8).hexdigest()
+            cache_dir = Path(cache_dir) if cache_dir is not None else SCENARIO_CACHE_DIR
+            self.cache_path = cache_dir / f"{self.root.name or 'root'}_{key}_v{INDEX_VERSION}.npz"
+        self.reparsed = 0  # files parsed and validated while opening
+        self._load()
+
+    # Index maintenance
+
+    def _scan(self) -> List[str]:
+        # Scenario file paths relative to root, sorted
+        names = []
+        if self.recursive:
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                dirnames.sort()
+                rel = os.path.relpath(dirpath, self.root)
+                for name in filenames:
+                    if any(fnmatch.fnmatch(name, p) for p in YAML_PATTERNS):
+                        names.append(name if rel == "." else os.path.join(rel, name))
+        else:
+            names = [entry.name for entry in os.scandir(self.root)
+                     if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in YAML_PATTERNS)]
+        return sorted(names)
+
+    def _read_index(self) -> Dict[str, tuple]:
+        # {relative path: (mtime_ns, size, digest, status, payload, columns)} from the cache
+        if self.cache_path is None or not self.cache_path.is_file():
+            return {}
+        try:
+            with np.load(self.cache_path) as data:
+                if int(data["version"]) != INDEX_VERSION or str(data["schema"]) != _SCHEMA_HASH:
+                    return {}
+                blob = data["payload"].tobytes()
+                offsets = data["offsets"].tolist()
+                columns = list(zip(*(data[name].tolist() for name in FILTER_COLUMNS)))
+                return {
+                    name: (mtime, size, digest, status, blob[offsets[i]:offsets[i + 1]].decode(), columns[i])
+                    for i, (name, mtime, size, digest, status) in enumerate(zip(
+                        data["path"].tolist(), data["mtime_ns"].tolist(), data["size"].tolist(),
+                        data["digest"].tolist(), data["status"].tolist(),
+                    ))
+                }
+        except (OSError, KeyError, ValueError):
+            return {}  # Unreadable: rebuild
+
+    def _load(self):
+        cached = self._read_index()
+        names = self._scan()
+        entries = []
+        changed = len(cached) != len(names)
+        for name in names:
+            st = os.stat(self.root / name)
+            entry = cached.get(name)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                entries.append(entry)
+                continue
+            changed = True
+            data = (self.root / name).read_bytes()
+            digest = _digest(data)
+            if entry is not None and entry[2] == digest:
+                # Touched but unchanged: keep the validated config
+                entries.append((st.st_mtime_ns, st.st_size) + entry[2:])
+                continue
+            status, payload = _parse(data)
+            self.reparsed += 1
+            entries.append((st.st_mtime_ns, st.st_size, digest, status, payload, _columns(status, payload)))
+
+        payloads = [entry[4].encode() for entry in entries]
+        self.paths = np.array(names, dtype=str)
+        self.mtime_ns = np.array([e[0] for e in entries], dtype=np.int64)
+        self.size = np.array([e[1] for e in entries], dtype=np.int64)
+        self.digest = np.array([e[2] for e in entries], dtype="U32")
+        self.status = np.array([e[3] for e in entries], dtype=np.int8)
+        self.offsets = np.concatenate(([0], np.cumsum([len(p) for p in payloads]))).astype(np.int64)
+        self.payload = np.frombuffer(b"".join(payloads), dtype=np.uint8)
+        columns = list(zip(*(e[5] for e in entries))) or [()] * len(FILTER_COLUMNS)
+        for (name, dtype), values in zip(FILTER_COLUMNS.items(), columns):
+            setattr(self, name, np.array(values, dtype=dtype))
+        self.rows = np.flatnonzero(self.status == OK)
+        self._row_of = {name: i for i, name in enumerate(names)}
+        if changed and self.cache_path is not None:
+            self._write_index()
+
+    def _write_index(self):
+        # Unique temp file + rename, so concurrent openers never read or clobber a
+        # half-written index
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, prefix=self.cache_path.stem, suffix=".tmp.npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=INDEX_VERSION,
+                    schema=_SCHEMA_HASH,
+                    path=self.paths,
+                    mtime_ns=self.mtime_ns,
+                    size=self.size,
+                    digest=self.digest,
+                    status=self.status,
+                    offsets=self.offsets,
+                    payload=self.payload,
+                    **{name: getattr(self, name) for name in FILTER_COLUMNS},
+                )
+            os.replace(tmp, self.cache_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _payload(self, i: int) -> str:
+        return self.payload[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+
+    # Access
+
+    @property
+    def errors(self) -> Dict[Path, str]:
+        # Files that failed to parse or validate, with the error
+        return {self.root / self.paths[i]: self._payload(i) for i in np.flatnonzero(self.status == INVALID)}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[ScenarioConfig]:
+        for _, config in self.items():
+            yield config
+
+    def items(self) -> Iterator[Tuple[Path, ScenarioConfig]]:
+        # Lazily yields (path, config); configs were validated when indexed, so they
+        # are rebuilt without re-running validation
+        for i in self.rows:
+            yield self.root / self.paths[i], ScenarioConfig.model_construct(**json.loads(self._payload(i)))
+
+    def get(self, path: Union[str, Path]) -> ScenarioConfig:
+        # Config of one file in the corpus (absolute or relative to root)
+        path = Path(path)
+        rel = os.path.relpath(path, self.root.absolute()) if path.is_absolute() else str(path)
+        i = self._row_of.get(rel)
+        if i is None:
+            raise KeyError(f"{path} is not in the scenario corpus {self.root}")
+        if self.status[i] != OK:
+            raise ValueError(f"{path} is not a valid scenario: {self._payload(i)}")
+        return ScenarioConfig.model_construct(**json.loads(self._payload(i)))
+
+    def filter(
+        self,
+        map_type: Union[str, Sequence[str], None] = None,
+        traffic_density: Union[float, Tuple[Optional[float], Optional[float]], None] = None,
+        num_agents: Union[int, Tuple[Optional[int], Optional[int]], None] = None,
+        name: Optional[str] = None,
+    ) -> "ScenarioCorpus":
+        # Subset view; ranges are inclusive (lo, hi) tuples with None for open ends,
+        # name is a glob pattern
+        keep = np.zeros(len(self.paths), dtype=bool)
+        keep[self.rows] = True
+        if map_type is not None:
+            keep &= np.isin(self.map_type, [map_type] if isinstance(map_type, str) else list(map_type))
+        keep &= _in_range(self.traffic_density, traffic_density)
+        keep &= _in_range(self.num_agents, num_agents)
+        if name is not None:
+            keep &= np.array([fnmatch.fnmatch(n, name) for n in self.names], dtype=bool)
+        view = object.__new__(ScenarioCorpus)
+        view.__dict__.update(self.__dict__)
+        view.rows = np.flatnonzero(keep)
+        return view
+
+
+def _in_range(values: np.ndarray, spec) -> np.ndarray:
+    if spec is None:
+        return np.ones(values.shape[0], dtype=bool)
+    if not isinstance(spec, tuple):
+        return values == spec
+    lo, hi = spec
+    keep = np.ones(values.shape[0], dtype=bool)
+    if lo is not None:
+        keep &= values >= lo
+    if hi is not None:
+        keep &= values <= hi
+    return keep
+
+
+def load_scenarios(paths: Sequence[Union[str, Path]], cache_dir: Optional[Path] = None) -> List[ScenarioConfig]:
+    # Configs for explicit scenario files, in order. Without cache_dir only the listed
+    # files are parsed and nothing is written; with it, each file is looked up in its
+    # directory's cached corpus (which indexes every scenario YAML in that directory)
+    configs = []
+    if cache_dir is None:
+        for path in paths:
+            status, payload = _parse(Path(path).read_bytes())
+            if status != OK:
+                raise ValueError(f"{path} is not a valid scenario: {payload}")
+            configs.append(ScenarioConfig.model_construct(**json.loads(payload)))
+        return configs
+
+    corpora: Dict[Path, ScenarioCorpus] = {}
+    for path in paths:
+        path = Path(path).absolute()
+        corpus = corpora.get(path.parent)
+        if corpus is None:
+            corpus = corpora[path.parent] = ScenarioCorpus(path.parent, recursive=False, cache_dir=cache_dir)
+        configs.append(corpus.get(path))
+    return configs
@@ -0,0 +1,97 @@
+# Camera frame ring buffer - preallocated frame storage shared by all consumers
+# Frames are copied in once, into a fixed slot, and handed out as read-only views
+# tagged with a frame id and timestamp. A view stays valid until its slot is
+# reused `capacity` frames later; check is_current() before reading old frames.
+
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.config.schema import SensorConfig
+
+
+class Frame(NamedTuple):
+    frame_id: int
+    step: int  # simulator step the frame was captured at (-1 if unknown)
+    timestamp: float  # time.monotonic() at capture
+    image: np.ndarray  # read-only view into the ring
+
+
+class FrameRingBuffer:
+    # Fixed-capacity ring of equally shaped frames
+
+    def __init__(self, capacity: int, shape: Tuple[int, ...], dtype=np.uint8):
+        if capacity < 1:
+            raise ValueError(f"Ring buffer capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._frames = np.zeros((capacity,) + self.shape, dtype=self.dtype)
+        # One read-only view per slot, created once
+        self._views = []
+        for slot in range(capacity):
+            view = self._frames[slot]
+            view.flags.writeable = False
+            self._views.append(view)
+        self._ids = np.full(capacity, -1, dtype=np.int64)
+        self._steps = np.full(capacity, -1, dtype=np.int64)
+        self._stamps = np.zeros(capacity)
+        self._next_id = 0
+
+    @classmethod
+    def for_sensor(
+        cls, sensor: SensorConfig, shape: Optional[Tuple[int, ...]] = None, dtype=np.uint8
+    ) -> "FrameRingBuffer":
+        # Capacity covers sensor.frame_history_s at sensor.fps; shape defaults to (H, W, 3)
+        capacity = max(1, math.ceil(sensor.fps * sensor.frame_history_s))
+        if shape is None:
+            shape = (sensor.height, sensor.width, 3)
+        return cls(capacity, shape, dtype)
+
+    def __len__(self) -> int:
+        return min(self._next_id, self.capacity)
+
+    @property
+    def latest_id(self) -> int:
+        return self._next_id - 1
+
+    def write(self, image: np.ndarray, step: int = -1, timestamp: Optional[float] = None) -> Frame:
+        # Copy image into the next slot (the only copy a frame ever gets)
+        if image.shape != self.shape:
+            raise ValueError(f"Frame shape {image.shape} does not match ring shape {self.shape}")
+        frame_id = self._next_id
+        slot = frame_id % self.capacity
+        np.copyto(self._frames[slot], image, casting="unsafe")
+        self._ids[slot] = frame_id
+        self._steps[slot] = step
+        self._stamps[slot] = time.monotonic() if timestamp is None else timestamp
+        self._next_id += 1
+        return self._frame(slot)
+
+    def _frame(self, slot: int) -> Frame:
+        return Frame(
+            int(self._ids[slot]), int(self._steps[slot]), float(self._stamps[slot]), self._views[slot]
+        )
+
+    def latest(self) -> Optional[Frame]:
+        if self._next_id == 0:
+            return None
+        return self._frame(self.latest_id % self.capacity)
+
+    def get(self, frame_id: int) -> Optional[Frame]:
+        # Frame by id, or None if it was never written or has been overwritten
+        slot = frame_id % self.capacity
+        if frame_id < 0 or self._ids[slot] != frame_id:
+            return None
+        return self._frame(slot)
+
+    def is_current(self, frame: Frame) -> bool:
+        # True while the frame's slot still holds that frame
+        return self._ids[frame.frame_id % self.capacity] == frame.frame_id
+
+    def history(self, count: Optional[int] = None) -> List[Frame]:
+        # Up to count most recent frames, newest first
+        count = len(self) if count is None else min(count, len(self))
+        return [self._frame((self.latest_id - i) % self.capacity) for i in range(count)]
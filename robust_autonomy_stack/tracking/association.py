@@ -1,3 +1,221 @@
 # Data association for multi-object tracking - matches detections to existing tracks
+# Gating is vectorized over all track x detection pairs. The gated pairs form a
+# sparse bipartite graph whose connected components are solved independently with
+# linear_sum_assignment, so cost grows with cluster size rather than N x M.
 
-# TODO: Implement data association (Phase 3)
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from robust_autonomy_stack.utils.lazy import lazy_import
+
+optimize = lazy_import("scipy.optimize")
+sparse = lazy_import("scipy.sparse")
+csgraph = lazy_import("scipy.sparse.csgraph")
+
+
+# 99% chi-square gate for 2-D position residuals
+CHI2_GATE_2D = 9.21
+# Component sizes (tracks + detections) above this share the last histogram bin
+MAX_COMPONENT_BIN = 32
+
+
+def mahalanobis_gate(
+    predicted: np.ndarray,
+    innovation_cov: np.ndarray,
+    detections: np.ndarray,
+    threshold: float = CHI2_GATE_2D,
+) -> np.ndarray:
+    # Squared Mahalanobis distance (N, M); pairs outside the gate are inf
+    # predicted (N, 2), innovation_cov (N, 2, 2), detections (M, 2)
+    a = innovation_cov[:, 0, 0]
+    b = innovation_cov[:, 0, 1]
+    d = innovation_cov[:, 1, 1]
+    det = a * d - b * b
+    diff = detections[None, :, :] - predicted[:, None, :]
+    dx, dy = diff[..., 0], diff[..., 1]
+    # Closed-form 2x2 inverse quadratic form
+    cost = (d[:, None] * dx * dx - 2.0 * b[:, None] * dx * dy + a[:, None] * dy * dy) / det[:, None]
+    cost[cost > threshold] = np.inf
+    return cost
+
+
+def euclidean_gate(
+    predicted: np.ndarray,
+    detections: np.ndarray,
+    max_distance: float,
+) -> np.ndarray:
+    # Euclidean distance (N, M); pairs farther than max_distance are inf
+    diff = detections[None, :, :] - predicted[:, None, :]
+    cost = np.hypot(diff[..., 0], diff[..., 1])
+    cost[cost > max_distance] = np.inf
+    return cost
+
+
+@dataclass
+class AssociationResult:
+    # Matches as parallel arrays of track rows and detection indices
+
+    track_indices: np.ndarray
+    detection_indices: np.ndarray
+    match_costs: np.ndarray
+    unmatched_tracks: np.ndarray
+    unmatched_detections: np.ndarray
+    component_sizes: List[int] = field(default_factory=list)
+
+
+@dataclass
+class AssociationStats:
+    # Per-frame and cumulative timing / component statistics
+
+    frames: int = 0
+    last_time_ms: float = 0.0
+    total_time_ms: float = 0.0
+    max_time_ms: float = 0.0
+    last_num_components: int = 0
+    last_max_component: int = 0
+    max_component: int = 0
+    gated_pairs: int = 0
+    total_pairs: int = 0
+    # component_size_hist[k] = number of components with k nodes (last bin: >= MAX_COMPONENT_BIN)
+    component_size_hist: np.ndarray = field(
+        default_factory=lambda: np.zeros(MAX_COMPONENT_BIN + 1, dtype=np.int64)
+    )
+
+    @property
+    def mean_time_ms(self) -> float:
+        return self.total_time_ms / self.frames if self.frames else 0.0
+
+    @property
+    def gate_ratio(self) -> float:
+        return self.gated_pairs / self.total_pairs if self.total_pairs else 0.0
+
+
+class Associator:
+    # Gated, component-wise Hungarian assignment of detections to tracks
+
+    def __init__(
+        self,
+        gate: str = "mahalanobis",
+        gate_threshold: float = CHI2_GATE_2D,
+        max_distance: float = 5.0,
+    ):
+        if gate not in ("mahalanobis", "euclidean"):
+            raise ValueError(f"Unknown gate '{gate}' (expected 'mahalanobis' or 'euclidean')")
+        self.gate = gate
+        self.gate_threshold = gate_threshold
+        self.max_distance = max_distance
+        self.stats = AssociationStats()
+
+    def gate_costs(
+        self,
+        predicted: np.ndarray,
+        detections: np.ndarray,
+        innovation_cov: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        if self.gate == "mahalanobis":
+            if innovation_cov is None:
+                raise ValueError("Mahalanobis gating needs the track innovation covariances")
+            return mahalanobis_gate(predicted, innovation_cov, detections, self.gate_threshold)
+        return euclidean_gate(predicted, detections, self.max_distance)
+
+    def associate(
+        self,
+        predicted: np.ndarray,
+        detections: np.ndarray,
+        innovation_cov: Optional[np.ndarray] = None,
+    ) -> AssociationResult:
+        # predicted (N, 2) track positions, detections (M, 2)
+        start = time.perf_counter()
+        n, m = predicted.shape[0], detections.shape[0]
+        if n == 0 or m == 0:
+            return self._all_unmatched(start, n, m)
+
+        cost = self.gate_costs(predicted, detections, innovation_cov)
+        rows, cols = np.nonzero(np.isfinite(cost))
+        if rows.size == 0:
+            # Nothing passed the gate (e.g. an object left and a new one appeared)
+            return self._all_unmatched(start, n, m)
+
+        # Bipartite graph: nodes [0, n) are tracks, [n, n + m) are detections
+        graph = sparse.coo_matrix(
+            (np.ones(rows.shape[0], dtype=np.int8), (rows, cols + n)), shape=(n + m, n + m)
+        )
+        _, labels = csgraph.connected_components(graph, directed=False)
+
+        # Group gated edges by component; components without edges are isolated nodes
+        edge_labels = labels[rows]
+        order = np.argsort(edge_labels, kind="stable")
+        rows, cols, edge_labels = rows[order], cols[order], edge_labels[order]
+        bounds = np.flatnonzero(np.diff(edge_labels)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [rows.shape[0]]))
+
+        matched_t, matched_d, sizes = [], [], []
+        for s, e in zip(starts, ends):
+            if e - s == 1:
+                # Single gated pair: trivially matched
+                matched_t.append(rows[s:e])
+                matched_d.append(cols[s:e])
+                sizes.append(2)
+                continue
+            t_ids = np.unique(rows[s:e])
+            d_ids = np.unique(cols[s:e])
+            sizes.append(t_ids.shape[0] + d_ids.shape[0])
+            block = cost[np.ix_(t_ids, d_ids)]
+            finite = np.isfinite(block)
+            # Gated-out pairs get a cost no real match can exceed, then are dropped
+            block = np.where(finite, block, block[finite].max() * 10.0 + 1e6)
+            r, c = optimize.linear_sum_assignment(block)
+            keep = finite[r, c]
+            matched_t.append(t_ids[r[keep]])
+            matched_d.append(d_ids[c[keep]])
+
+        track_idx = np.concatenate(matched_t) if matched_t else np.empty(0, dtype=np.intp)
+        det_idx = np.concatenate(matched_d) if matched_d else np.empty(0, dtype=np.intp)
+        track_mask = np.ones(n, dtype=bool)
+        track_mask[track_idx] = False
+        det_mask = np.ones(m, dtype=bool)
+        det_mask[det_idx] = False
+
+        result = AssociationResult(
+            track_indices=track_idx,
+            detection_indices=det_idx,
+            match_costs=cost[track_idx, det_idx],
+            unmatched_tracks=np.flatnonzero(track_mask),
+            unmatched_detections=np.flatnonzero(det_mask),
+            component_sizes=sizes,
+        )
+        self._record(start, result, rows.shape[0], n * m)
+        return result
+
+    def _all_unmatched(self, start: float, n: int, m: int) -> AssociationResult:
+        result = AssociationResult(
+            track_indices=np.empty(0, dtype=np.intp),
+            detection_indices=np.empty(0, dtype=np.intp),
+            match_costs=np.empty(0),
+            unmatched_tracks=np.arange(n),
+            unmatched_detections=np.arange(m),
+        )
+        self._record(start, result, 0, n * m)
+        return result
+
+    def _record(self, start: float, result: AssociationResult, gated: int, total: int):
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        stats = self.stats
+        stats.frames += 1
+        stats.last_time_ms = elapsed_ms
+        stats.total_time_ms += elapsed_ms
+        stats.max_time_ms = max(stats.max_time_ms, elapsed_ms)
+        stats.gated_pairs += gated
+        stats.total_pairs += total
+        sizes = result.component_sizes
+        stats.last_num_components = len(sizes)
+        stats.last_max_component = max(sizes) if sizes else 0
+        stats.max_component = max(stats.max_component, stats.last_max_component)
+        if sizes:
+            stats.component_size_hist += np.bincount(
+                np.minimum(sizes, MAX_COMPONENT_BIN), minlength=MAX_COMPONENT_BIN + 1
+            )
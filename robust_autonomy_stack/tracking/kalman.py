@@ -1,3 +1,185 @@
 # Kalman filter for object state estimation - tracks [x, y, vx, vy] with uncertainty
+# All tracks live in one filter bank: states (N, 4) and covariances (N, 4, 4) are
+# contiguous arrays, so predict/update for every track is a handful of batched
+# NumPy ops. Active tracks always occupy rows [0, n); removal swaps the last
+# active row into the hole, and capacity only grows (doubling) when full.
 
-# TODO: Implement Kalman filter (Phase 3)
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+
+DIM_X = 4  # [x, y, vx, vy]
+DIM_Z = 2  # [x, y] position measurements
+
+
+class KalmanFilterBank:
+    # Constant-velocity Kalman filters for many tracks at once
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        process_noise: float = 1.0,
+        measurement_noise: float = 0.5,
+        initial_velocity_std: float = 5.0,
+    ):
+        # process_noise: white acceleration spectral density (m^2/s^3)
+        # measurement_noise: position measurement std (m)
+        self.process_noise = process_noise
+        self.R = np.eye(DIM_Z) * measurement_noise ** 2
+        self.initial_velocity_var = initial_velocity_std ** 2
+
+        self.n = 0
+        self._next_id = 0
+        self._slot_of = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        # (Re)allocate storage, keeping the active rows
+        x = np.zeros((capacity, DIM_X))
+        P = np.zeros((capacity, DIM_X, DIM_X))
+        ids = np.full(capacity, -1, dtype=np.int64)
+        age = np.zeros(capacity, dtype=np.int32)
+        hits = np.zeros(capacity, dtype=np.int32)
+        misses = np.zeros(capacity, dtype=np.int32)
+        if self.n:
+            x[:self.n] = self._x[:self.n]
+            P[:self.n] = self._P[:self.n]
+            ids[:self.n] = self._ids[:self.n]
+            age[:self.n] = self._age[:self.n]
+            hits[:self.n] = self._hits[:self.n]
+            misses[:self.n] = self._misses[:self.n]
+        self._x, self._P, self._ids = x, P, ids
+        self._age, self._hits, self._misses = age, hits, misses
+
+    @property
+    def capacity(self) -> int:
+        return self._x.shape[0]
+
+    # Views of the active rows (slot i <-> ids[i]); they are invalidated by add/remove
+
+    @property
+    def states(self) -> np.ndarray:
+        return self._x[:self.n]
+
+    @property
+    def covariances(self) -> np.ndarray:
+        return self._P[:self.n]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.n]
+
+    @property
+    def age(self) -> np.ndarray:
+        return self._age[:self.n]
+
+    @property
+    def hits(self) -> np.ndarray:
+        return self._hits[:self.n]
+
+    @property
+    def misses(self) -> np.ndarray:
+        return self._misses[:self.n]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def slots(self, track_ids: Iterable[int]) -> np.ndarray:
+        # Current row of each track id
+        return np.array([self._slot_of[int(i)] for i in track_ids], dtype=np.intp)
+
+    def add(
+        self,
+        positions: np.ndarray,
+        velocities: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # Start tracks from (k, 2) position measurements; returns their new ids
+        positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        k = positions.shape[0]
+        if self.n + k > self.capacity:
+            capacity = self.capacity
+            while capacity < self.n + k:
+                capacity *= 2
+            self._allocate(capacity)
+
+        rows = slice(self.n, self.n + k)
+        self._x[rows, :2] = positions
+        self._x[rows, 2:] = 0.0 if velocities is None else velocities
+        self._P[rows] = 0.0
+        self._P[rows, 0, 0] = self._P[rows, 1, 1] = self.R[0, 0]
+        self._P[rows, 2, 2] = self._P[rows, 3, 3] = self.initial_velocity_var
+        new_ids = np.arange(self._next_id, self._next_id + k, dtype=np.int64)
+        self._ids[rows] = new_ids
+        self._age[rows] = 0
+        self._hits[rows] = 1
+        self._misses[rows] = 0
+        for offset, track_id in enumerate(new_ids):
+            self._slot_of[int(track_id)] = self.n + offset
+        self._next_id += k
+        self.n += k
+        return new_ids
+
+    def remove(self, track_ids: Iterable[int]):
+        # Drop tracks by id, compacting by moving the last active row into each hole
+        slots = sorted((self._slot_of.pop(int(i)) for i in track_ids), reverse=True)
+        arrays = (self._x, self._P, self._ids, self._age, self._hits, self._misses)
+        for slot in slots:
+            last = self.n - 1
+            if slot != last:
+                for array in arrays:
+                    array[slot] = array[last]
+                self._slot_of[int(self._ids[slot])] = slot
+            self._ids[last] = -1
+            self.n -= 1
+
+    def transition(self, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Constant-velocity F and discrete white-acceleration Q for a timestep
+        F = np.eye(DIM_X)
+        F[0, 2] = F[1, 3] = dt
+        q = self.process_noise
+        Q = np.zeros((DIM_X, DIM_X))
+        Q[0, 0] = Q[1, 1] = q * dt ** 3 / 3.0
+        Q[0, 2] = Q[2, 0] = Q[1, 3] = Q[3, 1] = q * dt ** 2 / 2.0
+        Q[2, 2] = Q[3, 3] = q * dt
+        return F, Q
+
+    def predict(self, dt: float):
+        # Propagate every active track by dt
+        if self.n == 0:
+            return
+        x = self._x[:self.n]
+        P = self._P[:self.n]
+        F, Q = self.transition(dt)
+        x[:, :2] += dt * x[:, 2:]
+        P[:] = F @ P @ F.T + Q
+        self._age[:self.n] += 1
+
+    def innovation_covariances(self, slots: Optional[np.ndarray] = None) -> np.ndarray:
+        # S = H P H^T + R for the given rows (all active rows by default), (k, 2, 2)
+        P = self._P[:self.n] if slots is None else self._P[slots]
+        return P[:, :DIM_Z, :DIM_Z] + self.R
+
+    def update(self, slots: np.ndarray, measurements: np.ndarray):
+        # Fuse (k, 2) position measurements into the tracks at the given rows
+        slots = np.asarray(slots, dtype=np.intp)
+        if slots.shape[0] == 0:
+            return
+        x = self._x[slots]
+        P = self._P[slots]
+        residual = measurements - x[:, :DIM_Z]
+        S = P[:, :DIM_Z, :DIM_Z] + self.R
+        # K = P H^T S^-1, with H selecting the position rows
+        K = np.linalg.solve(S, P[:, :DIM_Z, :]).transpose(0, 2, 1)
+        x += np.einsum("kij,kj->ki", K, residual)
+        P -= K @ P[:, :DIM_Z, :]
+        # Keep covariances symmetric against round-off
+        P[:] = 0.5 * (P + P.transpose(0, 2, 1))
+        self._x[slots] = x
+        self._P[slots] = P
+        self._hits[slots] += 1
+        self._misses[slots] = 0
+
+    def mark_missed(self, slots: np.ndarray):
+        # Count a frame without a measurement for the given rows
+        self._misses[np.asarray(slots, dtype=np.intp)] += 1
@@ -1,3 +1,67 @@
 # Multi-object tracker - manages lifecycle of all tracked objects
+# Predict all tracks with the filter bank, associate detections, update matched
+# tracks, age out stale ones and start new tracks from unmatched detections.
 
-# TODO: Implement tracker (Phase 3)
+from typing import Optional, Tuple
+
+import numpy as np
+
+from robust_autonomy_stack.tracking.association import CHI2_GATE_2D, Associator
+from robust_autonomy_stack.tracking.kalman import KalmanFilterBank
+from robust_autonomy_stack.utils.profiling import timed
+
+
+class MultiObjectTracker:
+    # Tracks 2-D position detections over time
+
+    def __init__(
+        self,
+        dt: float = 0.05,
+        gate: str = "mahalanobis",
+        gate_threshold: float = CHI2_GATE_2D,
+        max_distance: float = 5.0,
+        max_misses: int = 5,
+        min_hits: int = 3,
+        process_noise: float = 1.0,
+        measurement_noise: float = 0.5,
+    ):
+        self.dt = dt
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.bank = KalmanFilterBank(
+            process_noise=process_noise, measurement_noise=measurement_noise
+        )
+        # gate_threshold (chi-square) applies to the Mahalanobis gate, max_distance (m)
+        # to the Euclidean one
+        self.associator = Associator(
+            gate=gate, gate_threshold=gate_threshold, max_distance=max_distance
+        )
+        # Mean match cost of last frame: squared Mahalanobis distance, or metres
+        # under the Euclidean gate
+        self.last_residual = 0.0
+
+    @timed("tracking")
+    def step(self, detections: np.ndarray, dt: Optional[float] = None):
+        # Advance one frame with (M, 2) detections in world coordinates
+        detections = np.asarray(detections, dtype=float).reshape(-1, 2)
+        bank = self.bank
+        bank.predict(self.dt if dt is None else dt)
+
+        result = self.associator.associate(
+            bank.states[:, :2], detections, bank.innovation_covariances()
+        )
+        bank.update(result.track_indices, detections[result.detection_indices])
+        bank.mark_missed(result.unmatched_tracks)
+        self.last_residual = float(result.match_costs.mean()) if result.match_costs.size else 0.0
+
+        stale = bank.ids[bank.misses > self.max_misses]
+        if stale.size:
+            bank.remove(stale)
+        if result.unmatched_detections.size:
+            bank.add(detections[result.unmatched_detections])
+        return result
+
+    def confirmed(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (ids, states) of tracks seen at least min_hits times
+        mask = self.bank.hits >= self.min_hits
+        return self.bank.ids[mask], self.bank.states[mask]
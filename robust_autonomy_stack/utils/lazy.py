@@ -0,0 +1,58 @@
+# Deferred imports - heavy dependencies load on first use instead of at import time
+# lazy_import("cv2") hands back a stand-in module; the real module is imported on the
+# first attribute access and each attribute is then cached on the stand-in, so hot
+# paths pay one dict lookup. A missing dependency only fails the code that uses it.
+# lazy_exports() builds the PEP 562 __getattr__/__dir__ pair for package __init__
+# files, so `from package import Name` only imports the submodule that defines Name.
+
+import importlib
+import sys
+import types
+from typing import Callable, Dict, List, Tuple
+
+
+class LazyModule(types.ModuleType):
+    # Module stand-in that imports the real module on first attribute access
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if "_lazy_module" in self.__dict__ else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    # The module itself when it is already imported, else a LazyModule for it
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    # (__getattr__, __dir__) for a package re-exporting names from its submodules;
+    # exports maps name -> submodule (relative to package). Resolved names are set on
+    # the package, so each is looked up once
+    def __getattr__(name: str):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(f"{package}.{submodule}"), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
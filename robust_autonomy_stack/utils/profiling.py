@@ -0,0 +1,224 @@
+# Per-stage latency instrumentation - perf_counter_ns timers feeding fixed-size histograms
+# Stages are timed with `with PROFILER.stage("planning"):` or the @timed("planning")
+# decorator. While the profiler is disabled (the default) stage() hands back one shared
+# no-op context and @timed adds a single attribute check, so instrumented code can stay
+# instrumented. Enabled, each sample is one histogram bucket increment; an optional
+# per-tick trace can be exported as Chrome trace-event JSON (chrome://tracing, Perfetto).
+
+import functools
+import json
+import math
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# Pipeline stages in tick order (sub-stages are "<stage>.<part>")
+STAGES = (
+    "sim_step", "sensors", "cv", "tracking", "prediction", "planning", "control", "safety",
+    "logging",
+)
+
+# Histogram buckets: log-spaced from 100 ns to 100 s, 20 per decade (~12% wide)
+_MIN_NS = 100
+_BUCKETS_PER_DECADE = 20
+_NUM_BUCKETS = 9 * _BUCKETS_PER_DECADE + 1
+_LOG_MIN = math.log10(_MIN_NS)
+
+_NULL = nullcontext()
+
+
+class LatencyHistogram:
+    # Fixed-size log-bucketed latency histogram (counts never reallocate)
+    # Counts are a plain list: a scalar list increment is several times cheaper than
+    # indexing into a NumPy array on this hot path
+
+    def __init__(self):
+        self.counts = [0] * _NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        if ns > _MIN_NS:
+            bucket = min(int((math.log10(ns) - _LOG_MIN) * _BUCKETS_PER_DECADE) + 1, _NUM_BUCKETS - 1)
+        else:
+            bucket = 0
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        return self
+
+    def percentile_ns(self, q: float) -> float:
+        # Upper edge of the bucket holding the q-quantile (capped at the observed max)
+        if self.count == 0:
+            return math.nan
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side="left"))
+        bucket = min(bucket, _NUM_BUCKETS - 1)
+        upper = 10 ** (_LOG_MIN + bucket / _BUCKETS_PER_DECADE)
+        return min(upper, self.max_ns)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else math.nan
+
+
+class _Stage:
+    # Context manager timing one stage; reused per stage name (not re-entrant per name)
+
+    __slots__ = ("profiler", "name", "hist", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.hist = profiler.histogram(name)
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.hist.record(end - self.start)
+        if self.profiler.trace_enabled:
+            self.profiler._trace_event(self.name, self.start, end)
+        return False
+
+
+class Profiler:
+    # Collects per-stage latency histograms and, optionally, a per-tick event trace
+
+    def __init__(self, enabled: bool = False, trace: bool = False, max_trace_events: int = 1_000_000):
+        self.enabled = enabled
+        self.trace_enabled = trace
+        self.max_trace_events = max_trace_events
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._stages: Dict[str, _Stage] = {}
+        self.tick_index = 0
+        self._events: List[tuple] = []
+        self.dropped_events = 0
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, trace: bool = False):
+        self.enabled = True
+        self.trace_enabled = trace
+
+    def disable(self):
+        self.enabled = False
+        self.trace_enabled = False
+
+    def reset(self):
+        self.histograms.clear()
+        self._stages.clear()
+        self._events.clear()
+        self.tick_index = 0
+        self.dropped_events = 0
+        self._origin_ns = time.perf_counter_ns()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        return hist
+
+    def stage(self, name: str):
+        # Context manager timing `name`; a shared no-op when disabled
+        if not self.enabled:
+            return _NULL
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+        return stage
+
+    def record(self, name: str, ns: int):
+        # Add an externally measured duration
+        if self.enabled:
+            self.histogram(name).record(ns)
+
+    def tick(self):
+        # Mark the start of the next control tick (groups trace events)
+        self.tick_index += 1
+
+    def _trace_event(self, name: str, start_ns: int, end_ns: int):
+        if len(self._events) < self.max_trace_events:
+            self._events.append((name, start_ns, end_ns - start_ns, self.tick_index))
+        else:
+            self.dropped_events += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        # {stage: {count, mean/p50/p95/p99/max in ms}}, pipeline stages first
+        order = {name: i for i, name in enumerate(STAGES)}
+        names = sorted(self.histograms, key=lambda n: (order.get(n.split(".")[0], len(order)), n))
+        result = {}
+        for name in names:
+            hist = self.histograms[name]
+            result[name] = {
+                "count": hist.count,
+                "mean_ms": hist.mean_ns / 1e6,
+                "p50_ms": hist.percentile_ns(0.50) / 1e6,
+                "p95_ms": hist.percentile_ns(0.95) / 1e6,
+                "p99_ms": hist.percentile_ns(0.99) / 1e6,
+                "max_ms": hist.max_ns / 1e6,
+            }
+        return result
+
+    def format_summary(self) -> str:
+        lines = [f"{'stage':<22} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name, row in self.summary().items():
+            lines.append(
+                f"{name:<22} {row['count']:>7} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+                f"{row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}"
+            )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: Path):
+        # Complete ("X") events in microseconds, one row per top-level stage
+        tids = {}
+        events = []
+        for name, start_ns, dur_ns, tick in self._events:
+            tid = tids.setdefault(name.split(".")[0], len(tids) + 1)
+            events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1e3,
+                "dur": dur_ns / 1e3,
+                "pid": 1,
+                "tid": tid,
+                "args": {"tick": tick},
+            })
+        for name, tid in tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# Process-wide profiler used by the stack's instrumentation points
+PROFILER = Profiler()
+
+
+def timed(name: str, profiler: Optional[Profiler] = None) -> Callable:
+    # Decorator timing every call of the wrapped function as stage `name`
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            prof = PROFILER if profiler is None else profiler
+            if not prof.enabled:
+                return fn(*args, **kwargs)
+            with prof.stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
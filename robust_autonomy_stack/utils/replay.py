@@ -1,3 +1,231 @@
 # Replay utilities for reproducing runs using saved seeds and configs
+# A recording is compact: the ScenarioConfig, the seed, the per-step action stream
+# and periodic checkpoints (ego record + kinematic snapshot of every vehicle).
+# Exact replay re-simulates the actions from the seeded reset; checkpoints verify
+# it step-for-step and let seek() jump close to a step without re-simulating from 0.
+# The actions stored are the ones the simulator applied, which for the async
+# shared-memory transport lag the ones the stack sent.
 
-# TODO: Implement replay (Phase 7)
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from robust_autonomy_stack.adapters.ego_state import EGO_STATE_DTYPE
+from robust_autonomy_stack.config.schema import ScenarioConfig
+from robust_autonomy_stack.evaluation.episode import adapter_config_from_scenario
+
+
+RECORDING_FILE = "recording.npz"
+# Max ego position difference (m) still counted as the same trajectory
+DIVERGENCE_TOLERANCE_M = 1e-3
+
+
+@dataclass
+class RunRecording:
+    # Everything needed to reconstruct an episode
+
+    scenario: ScenarioConfig
+    seed: int
+    actions: np.ndarray  # (T, 2) float64 (bit-exact), action applied at step t
+    # Checkpoint k is the state after checkpoint_steps[k] actions
+    checkpoint_steps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    checkpoint_ego: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=EGO_STATE_DTYPE))
+    checkpoint_vehicles: List[np.ndarray] = field(default_factory=list)  # (V_k, 5) each
+    transport: str = "in_process"  # or the SimProcess mode the run used
+
+    @property
+    def num_steps(self) -> int:
+        return self.actions.shape[0]
+
+    def save(self, path: Path):
+        counts = np.array([v.shape[0] for v in self.checkpoint_vehicles], dtype=np.int64)
+        vehicles = (
+            np.concatenate(self.checkpoint_vehicles) if self.checkpoint_vehicles else np.empty((0, 5))
+        )
+        np.savez_compressed(
+            path,
+            scenario=np.array(self.scenario.model_dump_json()),
+            seed=np.array(self.seed),
+            actions=self.actions,
+            checkpoint_steps=self.checkpoint_steps,
+            checkpoint_ego=self.checkpoint_ego,
+            checkpoint_counts=counts,
+            checkpoint_vehicles=vehicles,
+            transport=np.array(self.transport),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "RunRecording":
+        with np.load(path) as data:
+            counts = data["checkpoint_counts"]
+            vehicles = np.split(data["checkpoint_vehicles"], np.cumsum(counts)[:-1]) if counts.size else []
+            return cls(
+                scenario=ScenarioConfig(**json.loads(str(data["scenario"]))),
+                seed=int(data["seed"]),
+                actions=data["actions"],
+                checkpoint_steps=data["checkpoint_steps"],
+                checkpoint_ego=data["checkpoint_ego"],
+                checkpoint_vehicles=list(vehicles),
+                transport=str(data["transport"]) if "transport" in data else "in_process",
+            )
+
+
+class Recorder:
+    # Collects the action stream and periodic checkpoints while a run executes
+
+    def __init__(
+        self,
+        scenario: ScenarioConfig,
+        seed: int,
+        checkpoint_interval: int = 100,
+        transport: str = "in_process",
+    ):
+        self.scenario = scenario
+        self.seed = seed
+        self.checkpoint_interval = checkpoint_interval
+        self.transport = transport
+        self._actions: List[np.ndarray] = []
+        self._steps: List[int] = []
+        self._ego: List[np.ndarray] = []
+        self._vehicles: List[np.ndarray] = []
+
+    def checkpoint(self, adapter):
+        # Record the adapter state after len(actions) steps
+        self._steps.append(len(self._actions))
+        self._ego.append(adapter.get_ego_record().copy())
+        self._vehicles.append(adapter.snapshot_state())
+
+    def record(self, action: np.ndarray, adapter):
+        # Call after each adapter.step(); action is the one the simulator applied
+        # (info["applied_action"] from a SimProcess, else the action passed to step)
+        self._actions.append(np.asarray(action, dtype=np.float64))
+        if len(self._actions) % self.checkpoint_interval == 0:
+            self.checkpoint(adapter)
+
+    def finish(self) -> RunRecording:
+        return RunRecording(
+            scenario=self.scenario,
+            seed=self.seed,
+            actions=np.array(self._actions, dtype=np.float64).reshape(-1, 2),
+            checkpoint_steps=np.array(self._steps, dtype=np.int64),
+            checkpoint_ego=np.array(self._ego, dtype=EGO_STATE_DTYPE).reshape(-1),
+            checkpoint_vehicles=self._vehicles,
+            transport=self.transport,
+        )
+
+    def save(self, run_dir: Path) -> Path:
+        path = Path(run_dir) / RECORDING_FILE
+        self.finish().save(path)
+        return path
+
+
+@dataclass
+class ReplayResult:
+    steps: int
+    checkpoints_checked: int = 0
+    divergence_step: Optional[int] = None  # first checkpoint step that didn't match
+    max_position_error: float = 0.0
+
+    @property
+    def exact(self) -> bool:
+        return self.divergence_step is None
+
+
+class Replayer:
+    # Drives a MetaDriveAdapter through a recording
+    # Without render the replay is headless and only steps physics with the recorded
+    # actions (no camera, perception or planning), which is much faster than the run
+
+    def __init__(self, recording: RunRecording, render: bool = False, adapter=None):
+        self.recording = recording
+        self.render = render
+        if adapter is None:
+            from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
+
+            config = adapter_config_from_scenario(recording.scenario, recording.seed, self.render)
+            adapter = MetaDriveAdapter(config)
+        self.adapter = adapter
+        self.step = 0
+        self._started = False
+
+    def close(self):
+        self.adapter.close()
+
+    def _advance(self, to_step: int, on_step: Optional[Callable] = None, result: Optional[ReplayResult] = None):
+        # Apply recorded actions until self.step == to_step, checking checkpoints passed
+        actions = self.recording.actions
+        checks = {int(s): i for i, s in enumerate(self.recording.checkpoint_steps)}
+        while self.step < to_step:
+            obs, reward, terminated, truncated, info = self.adapter.step(actions[self.step])
+            self.step += 1
+            if self.render:
+                self.adapter.render()
+            if on_step is not None:
+                on_step(self.step, obs, reward, info)
+            if result is not None and self.step in checks:
+                self._verify(checks[self.step], result)
+
+    def _verify(self, index: int, result: ReplayResult):
+        expected = self.recording.checkpoint_ego[index]
+        actual = self.adapter.get_ego_record()
+        error = float(np.hypot(actual["x"] - expected["x"], actual["y"] - expected["y"]))
+        result.checkpoints_checked += 1
+        result.max_position_error = max(result.max_position_error, error)
+        if error > DIVERGENCE_TOLERANCE_M and result.divergence_step is None:
+            result.divergence_step = self.step
+
+    def run(self, to_step: Optional[int] = None, on_step: Optional[Callable] = None) -> ReplayResult:
+        # Exact replay from the seeded reset; on_step(step, obs, reward, info) per step
+        to_step = self.recording.num_steps if to_step is None else min(to_step, self.recording.num_steps)
+        self._reset()
+        result = ReplayResult(steps=to_step)
+        self._advance(to_step, on_step, result)
+        return result
+
+    def _reset(self):
+        self.adapter.reset(seed=self.recording.seed)
+        self.step = 0
+        self._started = True
+
+    def seek(self, step: int, exact: bool = True) -> int:
+        # Position the simulation at `step` (state after `step` actions)
+        # exact=True re-simulates from the seeded reset (or continues forward from the
+        # current step). exact=False restores the nearest checkpoint at or before `step`
+        # and simulates the remainder; snapshots hold vehicle poses/velocities but not
+        # traffic-policy internals, so that result can drift slightly.
+        step = max(0, min(step, self.recording.num_steps))
+        steps = self.recording.checkpoint_steps
+        usable = np.flatnonzero(steps <= step)
+        # Moving forward from the current position is always the cheapest option
+        can_continue = self._started and self.step <= step
+
+        if not exact and usable.size and not (can_continue and self.step >= steps[usable[-1]]):
+            index = usable[-1]
+            # Resetting with the seed rebuilds the same map and traffic population,
+            # which restore_state() then moves into place
+            self._reset()
+            try:
+                self.adapter.restore_state(self.recording.checkpoint_vehicles[index])
+                self.step = int(steps[index])
+            except ValueError:
+                # Traffic population changed since reset (spawns/despawns): re-simulate
+                pass
+        elif not can_continue:
+            self._reset()
+        self._advance(step)
+        return self.step
+
+
+def find_recording(run_id: str, runs_dir: Path) -> Path:
+    # Resolve a run id (directory name under runs_dir, or a path) to its recording file
+    candidates = [Path(run_id), Path(runs_dir) / run_id]
+    candidates.extend(sorted(Path(runs_dir).glob(f"**/{run_id}")))
+    for candidate in candidates:
+        if candidate.is_file() and candidate.suffix == ".npz":
+            return candidate
+        if (candidate / RECORDING_FILE).is_file():
+            return candidate / RECORDING_FILE
+    raise FileNotFoundError(f"No recording found for run '{run_id}' under {runs_dir}")
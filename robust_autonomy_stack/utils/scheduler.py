@@ -0,0 +1,240 @@
+# Real-time tick scheduler - fixed-rate control loop with per-stage time budgets
+# Each tick gets period_s (1 / SensorConfig.fps by default) and every stage a share of
+# it. A stage that overruns its budget triggers that stage's degradation policy for
+# the next tick(s); a tick that overruns its period counts as a deadline miss. The
+# miss history is exposed as features for the safety monitor.
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from robust_autonomy_stack.utils.profiling import PROFILER, Profiler
+
+
+# Degradation policies
+REUSE_PREDICTION = "reuse_prediction"  # keep last tick's agent predictions
+CUT_CANDIDATES = "cut_candidates"  # sample fewer trajectory candidates
+SKIP_BEV = "skip_bev"  # keep last tick's BEV grid
+
+# Fraction of the tick period each stage may use (sim stepping gets the remainder)
+DEFAULT_BUDGETS = {
+    "sensors": 0.10,
+    "cv": 0.15,
+    "tracking": 0.10,
+    "prediction": 0.10,
+    "planning": 0.25,
+    "control": 0.05,
+    "safety": 0.05,
+}
+
+DEFAULT_POLICIES = {
+    "cv": SKIP_BEV,
+    "prediction": REUSE_PREDICTION,
+    "planning": CUT_CANDIDATES,
+}
+
+# Features the scheduler contributes to the safety feature vector
+DEADLINE_FEATURE_NAMES = ("deadline_miss_rate", "tick_overrun_ratio", "degraded_stages")
+
+
+@dataclass
+class SchedulerStats:
+    ticks: int = 0
+    deadline_misses: int = 0
+    max_tick_s: float = 0.0
+    stage_overruns: Dict[str, int] = field(default_factory=dict)
+    degradations: Dict[str, int] = field(default_factory=dict)  # ticks each policy was active
+
+    @property
+    def miss_rate(self) -> float:
+        return self.deadline_misses / self.ticks if self.ticks else 0.0
+
+
+class _BudgetedStage:
+    # Times one stage against its budget (one instance per stage name, reused)
+
+    __slots__ = ("scheduler", "name", "budget_ns", "start")
+
+    def __init__(self, scheduler: "TickScheduler", name: str, budget_ns: Optional[int]):
+        self.scheduler = scheduler
+        self.name = name
+        self.budget_ns = budget_ns
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        self.scheduler._stage_done(self.name, elapsed, self.budget_ns)
+        return False
+
+
+class TickScheduler:
+    # Paces the loop at period_s and applies degradation policies on stage overruns
+
+    def __init__(
+        self,
+        period_s: float,
+        budgets: Optional[Dict[str, float]] = None,
+        policies: Optional[Dict[str, str]] = None,
+        realtime: bool = True,
+        full_candidates: Optional[int] = None,
+        min_candidates: int = 6,
+        miss_window: int = 100,
+        profiler: Profiler = PROFILER,
+    ):
+        # budgets: stage -> fraction of period_s; realtime=False measures without sleeping
+        # full_candidates: sampler candidate count when planning is not degraded
+        self.period_s = period_s
+        self.period_ns = int(period_s * 1e9)
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.realtime = realtime
+        self.full_candidates = full_candidates
+        self.min_candidates = min_candidates
+        self.profiler = profiler
+        self.stats = SchedulerStats()
+
+        self._stages = {
+            name: _BudgetedStage(self, name, int(fraction * self.period_ns))
+            for name, fraction in self.budgets.items()
+        }
+        self._active: Dict[str, bool] = {policy: False for policy in (REUSE_PREDICTION, SKIP_BEV)}
+        self._pending: Dict[str, bool] = dict(self._active)
+        self._max_candidates = full_candidates
+        self._recent = deque(maxlen=miss_window)  # per-tick miss flags
+        self._tick_start_ns = 0
+        self._next_deadline_ns: Optional[int] = None
+        self.last_tick_s = 0.0
+
+    @classmethod
+    def from_sensor(cls, sensor, **kwargs) -> "TickScheduler":
+        # Tick at the camera rate (SensorConfig.fps)
+        return cls(1.0 / sensor.fps, **kwargs)
+
+    # Tick boundaries
+
+    def begin_tick(self):
+        # Start a tick; degradations decided during the previous tick take effect now
+        now = time.perf_counter_ns()
+        if self._next_deadline_ns is None:
+            self._next_deadline_ns = now + self.period_ns
+        self._tick_start_ns = now
+        self._active.update(self._pending)
+        for policy, on in self._pending.items():
+            self._pending[policy] = False
+            if on:
+                self.stats.degradations[policy] = self.stats.degradations.get(policy, 0) + 1
+        if self._max_candidates != self.full_candidates:
+            self.stats.degradations[CUT_CANDIDATES] = self.stats.degradations.get(CUT_CANDIDATES, 0) + 1
+        self.profiler.tick()
+
+    def end_tick(self) -> bool:
+        # Finish the tick, sleeping until the next period boundary in realtime mode
+        # Returns True if the tick missed its deadline
+        now = time.perf_counter_ns()
+        elapsed = now - self._tick_start_ns
+        self.last_tick_s = elapsed / 1e9
+        # Realtime ticks are held to the fixed period grid; otherwise each tick is just
+        # compared with the period
+        missed = now > self._next_deadline_ns if self.realtime else elapsed > self.period_ns
+        stats = self.stats
+        stats.ticks += 1
+        stats.max_tick_s = max(stats.max_tick_s, self.last_tick_s)
+        if missed:
+            stats.deadline_misses += 1
+        self._recent.append(missed)
+
+        if not self.realtime:
+            self._next_deadline_ns = None
+        elif missed:
+            # Behind schedule: restart the grid from now rather than trying to catch up
+            self._next_deadline_ns = now + self.period_ns
+        else:
+            time.sleep((self._next_deadline_ns - now) / 1e9)
+            self._next_deadline_ns += self.period_ns
+        return missed
+
+    # Stages
+
+    def stage(self, name: str):
+        # Budgeted timer for a stage (unbudgeted names are just timed for the profiler)
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _BudgetedStage(self, name, None)
+        return stage
+
+    def _stage_done(self, name: str, elapsed_ns: int, budget_ns: Optional[int]):
+        self.profiler.record(name, elapsed_ns)
+        if budget_ns is None:
+            return
+        policy = self.policies.get(name)
+        if elapsed_ns > budget_ns:
+            self.stats.stage_overruns[name] = self.stats.stage_overruns.get(name, 0) + 1
+            if policy == CUT_CANDIDATES:
+                self._cut_candidates()
+            elif policy is not None:
+                self._pending[policy] = True
+        elif policy == CUT_CANDIDATES and elapsed_ns < budget_ns // 2:
+            self._restore_candidates()
+
+    def _cut_candidates(self):
+        # Halve the candidate count (multiplicative decrease)
+        if self.full_candidates is None:
+            return
+        current = self._max_candidates or self.full_candidates
+        self._max_candidates = max(self.min_candidates, current // 2)
+
+    def _restore_candidates(self):
+        # Grow back by a quarter of the full set per comfortable tick (additive increase)
+        if self.full_candidates is None or self._max_candidates == self.full_candidates:
+            return
+        step = max(1, self.full_candidates // 4)
+        self._max_candidates = min(self.full_candidates, self._max_candidates + step)
+
+    # Degradation queries for the stack
+
+    @property
+    def reuse_prediction(self) -> bool:
+        return self._active[REUSE_PREDICTION]
+
+    @property
+    def skip_bev(self) -> bool:
+        return self._active[SKIP_BEV]
+
+    @property
+    def max_candidates(self) -> Optional[int]:
+        # Pass to TrajectorySampler.sample(max_candidates=...)
+        return self._max_candidates
+
+    @property
+    def degraded(self) -> bool:
+        return any(self._active.values()) or self._max_candidates != self.full_candidates
+
+    def deadline_features(self) -> Dict[str, float]:
+        # Values for DEADLINE_FEATURE_NAMES: recent miss rate, last tick / period, and
+        # how many degradation policies are active
+        recent = self._recent
+        degraded = sum(self._active.values()) + (self._max_candidates != self.full_candidates)
+        return {
+            "deadline_miss_rate": sum(recent) / len(recent) if recent else 0.0,
+            "tick_overrun_ratio": self.last_tick_s / self.period_s,
+            "degraded_stages": float(degraded),
+        }
+
+    def format_summary(self) -> str:
+        stats = self.stats
+        lines = [
+            f"Ticks: {stats.ticks} at {1.0 / self.period_s:.0f} Hz, deadline misses: "
+            f"{stats.deadline_misses} ({stats.miss_rate:.1%}), slowest tick {stats.max_tick_s * 1e3:.1f} ms"
+        ]
+        if stats.stage_overruns:
+            overruns = ", ".join(f"{name}={count}" for name, count in sorted(stats.stage_overruns.items()))
+            lines.append(f"Stage overruns: {overruns}")
+        if stats.degradations:
+            degraded = ", ".join(f"{name}={count}" for name, count in sorted(stats.degradations.items()))
+            lines.append(f"Degraded ticks: {degraded}")
+        return "\n".join(lines)
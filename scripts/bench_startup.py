@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# Startup benchmark: import time of CLI commands that should not need the heavy stack
+# Each command runs in a fresh interpreter under `python -X importtime`; its import
+# time is the sum of the per-module self times (best of --repeats runs). A command
+# fails when that exceeds its budget or when it imports any of HEAVY_MODULES, so an
+# eager `import metadrive` (or torch, xgboost, ...) slipping onto the path is caught
+# even on a fast machine. Exits non-zero on any failure.
+#
+#   python scripts/bench_startup.py [--repeats 5] [--scale 1.0] [--top 10]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencies only the simulation / training commands may load
+HEAVY_MODULES = (
+    "metadrive", "panda3d", "torch", "stable_baselines3", "gymnasium", "xgboost",
+    "sklearn", "scipy", "shapely", "cv2", "matplotlib", "pyarrow", "pandas",
+)
+
+# name -> (CLI arguments, import budget in ms); {tmp} is an empty scratch directory
+COMMANDS = {
+    "help": (["--help"], 60.0),
+    "replay-lookup": (["replay", "--run-id", "missing", "--runs-dir", "{tmp}"], 400.0),
+    "report": (["report", "--runs-dir", "{tmp}", "--output", "{tmp}/report", "--no-plots"], 300.0),
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    # {module: (self_us, cumulative_us)} from -X importtime output
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(args: List[str], env: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "robust_autonomy_stack.cli", *args],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup import-time benchmark")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per command (best is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Budget multiplier for slow machines")
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest imports per command")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+
+    failures = []
+    print(f"{'command':<14} {'import ms':>10} {'budget ms':>10} {'modules':>8}  status")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (cli_args, budget_ms) in COMMANDS.items():
+            cli_args = [a.format(tmp=tmp) for a in cli_args]
+            best = None
+            for _ in range(max(1, args.repeats)):
+                modules = measure(cli_args, env)
+                total_ms = sum(s for s, _ in modules.values()) / 1000
+                if best is None or total_ms < best[0]:
+                    best = (total_ms, modules)
+            total_ms, modules = best
+            budget_ms *= args.scale
+            heavy = sorted({m.split(".")[0] for m in modules} & set(HEAVY_MODULES))
+
+            problems = []
+            if total_ms > budget_ms:
+                problems.append("over budget")
+            if heavy:
+                problems.append("imports " + ", ".join(heavy))
+            print(f"{name:<14} {total_ms:>10.1f} {budget_ms:>10.1f} {len(modules):>8}  "
+                  f"{'; '.join(problems) or 'ok'}")
+            if problems:
+                failures.append(name)
+            if args.top or problems:
+                slowest = sorted(modules.items(), key=lambda item: -item[1][1])[: args.top or 10]
+                for module, (_, cumulative_us) in slowest:
+                    print(f"    {cumulative_us / 1000:>8.1f} ms  {module}")
+
+    if failures:
+        print(f"Startup regression in: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
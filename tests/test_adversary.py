@@ -0,0 +1,154 @@
+# Tests for the adversary environment's seed streams, observations and pushes
+
+import math
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adversary.env import AGENT_FEATURES, AdversaryEnv, scenario_seed
+from robust_autonomy_stack.config.schema import AdversaryConfig, ScenarioConfig
+
+
+class StubAdapter:
+    # Static scene: snapshot rows are [x, y, heading, vx, vy], ego first
+
+    dt = 0.1
+
+    def __init__(self, vehicles):
+        self.vehicles = np.array(vehicles, dtype=float)
+        self.seeds = []
+        self.info = {}
+
+    def reset(self, seed=None):
+        self.seeds.append(seed)
+        return np.zeros(3), {"setup_time_s": 0.5}
+
+    def step(self, action):
+        return np.zeros(3), 0.0, False, False, dict(self.info)
+
+    def snapshot_state(self):
+        return self.vehicles.copy()
+
+    def set_vehicle_velocity(self, index, vx, vy):
+        self.vehicles[index, 3:5] = vx, vy
+
+    def close(self):
+        pass
+
+
+def make_env(vehicles, worker_index=0, num_workers=1, **config):
+    config = AdversaryConfig(scenario="scenario.yaml", **config)
+    env = AdversaryEnv(config, ScenarioConfig(name="stub", seed=100), worker_index, num_workers)
+    env._make_adapter = lambda: StubAdapter(vehicles)
+    return env
+
+
+# Ego at (10, 5) heading north at 4 m/s; a: 10 m ahead, 2 m/s faster; b: 3 m to the
+# left, drifting 1 m/s east (rightwards); c: far away
+SCENE = [
+    [10.0, 5.0, math.pi / 2, 0.0, 4.0],
+    [10.0, 15.0, 0.0, 0.0, 6.0],
+    [7.0, 5.0, 0.0, 1.0, 4.0],
+    [100.0, 100.0, 0.0, 0.0, 0.0],
+]
+
+
+def test_scenario_seed_interleaves_workers():
+    seeds = [[scenario_seed(100, w, 3, episode, 7) for episode in range(3)] for w in range(3)]
+    assert seeds == [[100, 103, 106], [101, 104, 100], [102, 105, 101]]
+    # No repeats across workers until the range of 7 seeds is used up
+    first = [seed for row in seeds for seed in row[:2]]
+    assert sorted(first) == list(range(100, 106))
+
+
+def test_reset_follows_the_worker_seed_stream():
+    env = make_env(SCENE, worker_index=1, num_workers=3, num_seeds=7)
+    _, info = env.reset()
+    assert info == {"scenario_seed": 101, "setup_time_s": 0.5}
+    env.reset()
+    assert env.adapter.seeds == [101, 104]
+    env.reset(seed=0)  # restarts the stream
+    env.reset(options={"scenario_seed": 42})
+    assert env.adapter.seeds == [101, 104, 101, 42]
+
+
+def test_observation_in_ego_frame():
+    env = make_env(SCENE, num_nearby_agents=2)
+    obs, _ = env.reset()
+    assert obs.shape == env.observation_space.shape == (2 + 2 * AGENT_FEATURES,)
+    np.testing.assert_allclose(obs[:2], [4.0, 0.0], atol=1e-6)  # forward speed, no sideslip
+    agents = obs[2:].reshape(-1, AGENT_FEATURES)
+    # Nearest first: b (3 m left, moving right), then a (10 m ahead, pulling away)
+    np.testing.assert_allclose(agents[0], [0.0, 3.0, 0.0, -1.0, 1.0], atol=1e-6)
+    np.testing.assert_allclose(agents[1], [10.0, 0.0, 2.0, 0.0, 1.0], atol=1e-6)
+    assert env._nearest == 2
+
+    # Fewer vehicles than slots: the remaining slots stay empty; alone, nothing to push
+    env = make_env(SCENE[:2], num_nearby_agents=2)
+    agents = env.reset()[0][2:].reshape(-1, AGENT_FEATURES)
+    assert agents[0, 4] == 1.0 and not agents[1].any()
+    env = make_env(SCENE[:1])
+    obs, _ = env.reset()
+    assert not obs[2:].any() and env._nearest is None
+    env.step(np.array([1.0, 1.0]))  # no push target: a no-op push
+
+
+def test_step_pushes_nearest_vehicle_and_rewards_failure():
+    env = make_env(
+        SCENE, num_nearby_agents=2, max_push_accel=3.0, effort_cost=0.5, ttc_reward_scale=0.0
+    )
+    env.reset()
+    # Full forward push: +0.3 m/s along the ego heading (world +y) on vehicle b only
+    obs, reward, terminated, truncated, info = env.step(np.array([1.0, 0.0]))
+    np.testing.assert_allclose(env.adapter.vehicles[2, 3:5], [1.0, 4.3])
+    np.testing.assert_allclose(env.adapter.vehicles[[0, 1, 3]], np.array(SCENE)[[0, 1, 3]])
+    assert reward == pytest.approx(-0.5) and not terminated and not truncated
+    assert info["scenario_seed"] == 100 and info["ego_outcome"] == "max_steps"
+    assert obs[2 + 2] == pytest.approx(0.3)  # b's relative forward speed
+
+    env.adapter.info = {"crash": True}
+    _, reward, terminated, _, info = env.step(np.zeros(2))
+    assert terminated and info["ego_outcome"] == "crash"
+    assert reward == pytest.approx(env.config.failure_reward)
+
+
+def test_step_truncates_at_episode_limit():
+    env = make_env(SCENE, max_episode_steps=2)
+    env.reset()
+    assert not env.step(np.zeros(2))[3]
+    assert env.step(np.zeros(2))[3]
+    env.close()
+    assert env.adapter is None
+
+
+class CountdownEnv(gym.Env):
+    # Episodes of exactly two steps
+    observation_space = gym.spaces.Box(-1.0, 1.0, shape=(1,), dtype=np.float32)
+    action_space = gym.spaces.Box(-1.0, 1.0, shape=(1,), dtype=np.float32)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self.left = 2
+        return np.zeros(1, dtype=np.float32), {}
+
+    def step(self, action):
+        self.left -= 1
+        return np.zeros(1, dtype=np.float32), 0.0, self.left == 0, False, {}
+
+
+def test_throughput_vec_env_accounting():
+    pytest.importorskip("stable_baselines3")
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    from robust_autonomy_stack.adversary.training import ThroughputVecEnv
+
+    venv = ThroughputVecEnv(DummyVecEnv([CountdownEnv, CountdownEnv]))
+    assert venv.env_steps_per_s == 0.0
+    venv.reset()
+    for _ in range(5):
+        venv.step(np.zeros((2, 1), dtype=np.float32))
+    # 5 vectorized steps on 2 workers; each worker finishes episodes at steps 2 and 4
+    assert venv.env_steps == 10 and venv.episodes == 4
+    assert venv.env_time_s > 0 and venv.env_steps_per_s == pytest.approx(10 / venv.env_time_s)
+    venv.close()
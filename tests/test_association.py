@@ -0,0 +1,126 @@
+# Tests for gated, component-wise data association and the multi-object tracker
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from robust_autonomy_stack.tracking.association import (
+    CHI2_GATE_2D,
+    Associator,
+    euclidean_gate,
+    mahalanobis_gate,
+)
+from robust_autonomy_stack.tracking.tracker import MultiObjectTracker
+
+
+def dense_assignment(cost: np.ndarray):
+    # Reference: one Hungarian solve over the full matrix, gated-out pairs dropped
+    finite = np.isfinite(cost)
+    if not finite.any():
+        return 0, 0.0
+    block = np.where(finite, cost, 1e9)
+    r, c = linear_sum_assignment(block)
+    keep = finite[r, c]
+    return int(keep.sum()), float(cost[r[keep], c[keep]].sum())
+
+
+def random_cov(rng, n):
+    a = rng.normal(size=(n, 2, 2))
+    return a @ a.transpose(0, 2, 1) + np.eye(2) * 0.5
+
+
+def test_mahalanobis_gate_matches_explicit_inverse():
+    rng = np.random.default_rng(0)
+    predicted = rng.normal(size=(6, 2))
+    detections = rng.normal(size=(5, 2))
+    cov = random_cov(rng, 6)
+    cost = mahalanobis_gate(predicted, cov, detections, threshold=np.inf)
+    for i in range(6):
+        inv = np.linalg.inv(cov[i])
+        for j in range(5):
+            d = detections[j] - predicted[i]
+            assert cost[i, j] == pytest.approx(d @ inv @ d)
+
+
+def test_gates_mark_far_pairs_inf():
+    predicted = np.array([[0.0, 0.0]])
+    detections = np.array([[1.0, 0.0], [10.0, 0.0]])
+    cost = euclidean_gate(predicted, detections, max_distance=5.0)
+    assert cost[0, 0] == 1.0 and np.isinf(cost[0, 1])
+    cov = np.eye(2)[None]
+    cost = mahalanobis_gate(predicted, cov, detections)
+    assert cost[0, 0] == 1.0 and np.isinf(cost[0, 1])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_componentwise_matches_dense_hungarian(seed):
+    rng = np.random.default_rng(seed)
+    n, m = rng.integers(1, 15, size=2)
+    predicted = rng.uniform(0, 30, size=(n, 2))
+    detections = rng.uniform(0, 30, size=(m, 2))
+    associator = Associator(gate="euclidean", max_distance=6.0)
+    result = associator.associate(predicted, detections)
+
+    cost = euclidean_gate(predicted, detections, 6.0)
+    count, total = dense_assignment(cost)
+    assert result.track_indices.size == count
+    assert result.match_costs.sum() == pytest.approx(total)
+    assert np.all(np.isfinite(result.match_costs))
+    # Every track and detection is either matched once or listed as unmatched
+    assert sorted(np.concatenate((result.track_indices, result.unmatched_tracks))) == list(range(n))
+    assert sorted(np.concatenate((result.detection_indices, result.unmatched_detections))) == list(range(m))
+
+
+def test_mahalanobis_association_matches_dense_hungarian():
+    rng = np.random.default_rng(1)
+    predicted = rng.uniform(0, 10, size=(12, 2))
+    detections = predicted[rng.permutation(12)[:9]] + rng.normal(0, 0.5, size=(9, 2))
+    cov = random_cov(rng, 12)
+    result = Associator().associate(predicted, detections, cov)
+    count, total = dense_assignment(mahalanobis_gate(predicted, cov, detections, CHI2_GATE_2D))
+    assert result.track_indices.size == count
+    assert result.match_costs.sum() == pytest.approx(total)
+
+
+@pytest.mark.parametrize("n, m", [(0, 0), (0, 3), (3, 0)])
+def test_empty_inputs(n, m):
+    result = Associator(gate="euclidean").associate(np.zeros((n, 2)), np.zeros((m, 2)))
+    assert result.track_indices.size == 0
+    assert list(result.unmatched_tracks) == list(range(n))
+    assert list(result.unmatched_detections) == list(range(m))
+
+
+def test_nothing_inside_gate():
+    associator = Associator(gate="euclidean", max_distance=5.0)
+    result = associator.associate(np.array([[0.0, 0.0], [1.0, 1.0]]), np.array([[100.0, 100.0]]))
+    assert result.track_indices.size == 0
+    assert list(result.unmatched_tracks) == [0, 1]
+    assert list(result.unmatched_detections) == [0]
+    assert associator.stats.frames == 1
+
+
+def test_tracker_object_leaves_and_new_one_appears():
+    # Regression: an all-gated-out frame used to raise in the component loop
+    tracker = MultiObjectTracker()
+    tracker.step([[0.0, 0.0]])
+    result = tracker.step([[100.0, 100.0]])
+    assert list(result.unmatched_detections) == [0]
+    assert len(tracker.bank) == 2
+
+
+def test_tracker_passes_max_distance_to_euclidean_gate():
+    tracker = MultiObjectTracker(gate="euclidean", max_distance=20.0)
+    assert tracker.associator.max_distance == 20.0
+    tracker.step([[0.0, 0.0]])
+    result = tracker.step([[12.0, 0.0]])
+    assert result.track_indices.size == 1
+    assert tracker.last_residual == pytest.approx(12.0, abs=1.0)
+
+
+def test_tracker_confirms_steady_target():
+    tracker = MultiObjectTracker(min_hits=3)
+    for k in range(5):
+        tracker.step([[k * 0.5, 0.0]], dt=0.05)
+    ids, states = tracker.confirmed()
+    assert ids.size == 1
+    assert states[0, 0] == pytest.approx(2.0, abs=0.3)
@@ -0,0 +1,85 @@
+# Tests for the bird's-eye view projector: geometry and backend agreement
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from robust_autonomy_stack.config.schema import BEVConfig, SensorConfig  # noqa: E402
+from robust_autonomy_stack.cv.bev_projector import (  # noqa: E402
+    INTER_LINEAR,
+    BEVProjector,
+    bev_cell_centers,
+    build_remap_tables,
+    ground_to_pixel,
+)
+
+
+SENSOR = SensorConfig(width=160, height=120)
+BEV = BEVConfig(x_max=30.0, y_extent=10.0, resolution=0.5)
+
+
+@pytest.fixture(scope="module")
+def images():
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(SENSOR.height, SENSOR.width, 3), dtype=np.uint8)
+    labels = rng.integers(0, 12, size=(SENSOR.height, SENSOR.width), dtype=np.uint8)
+    return rgb, labels
+
+
+def test_geometry():
+    # The optical axis hits the ground straight ahead at mount_z / tan(-pitch) and
+    # projects to the image center column
+    distance = SENSOR.mount_z / np.tan(np.radians(-SENSOR.pitch))
+    u, v, valid = ground_to_pixel(SENSOR, np.array([SENSOR.mount_x + distance]), np.array([0.0]))
+    assert valid[0]
+    assert u[0] == pytest.approx((SENSOR.width - 1) / 2.0)
+    assert v[0] == pytest.approx((SENSOR.height - 1) / 2.0)
+    # Behind the camera is never visible
+    assert not ground_to_pixel(SENSOR, np.array([-5.0]), np.array([0.0]))[2][0]
+
+    grid_x, grid_y, cell = bev_cell_centers(BEV)
+    assert grid_x.shape == (60, 40) and cell == 0.5
+    assert grid_x[0, 0] == 29.75 and grid_y[0, 0] == 9.75  # far left corner
+    assert build_remap_tables(SENSOR, BEV) is build_remap_tables(SensorConfig(width=160, height=120), BEV)
+
+
+def test_backends_agree(images):
+    fast = BEVProjector(SENSOR, BEV, backend="cv2")
+    gather = BEVProjector(SENSOR, BEV, backend="numpy")
+    valid = fast.tables.valid
+    assert valid.any() and not valid.all()
+    for image in images:
+        expected = gather.project(image)
+        assert expected.shape == valid.shape + image.shape[2:] and expected.dtype == image.dtype
+        np.testing.assert_array_equal(fast.project(image), expected)
+        assert not expected[~valid].any()
+    # Linear interpolation stays close to nearest on smooth input
+    ramp = np.tile(np.arange(SENSOR.width, dtype=np.float32), (SENSOR.height, 1))
+    diff = fast.project(ramp, interpolation=INTER_LINEAR) - gather.project(ramp)
+    assert np.abs(diff[valid]).max() <= 0.5 + 1e-3
+
+
+@pytest.mark.parametrize("backend", ["cv2", "numpy"])
+def test_out_buffers(images, backend):
+    projector = BEVProjector(SENSOR, BEV, backend=backend)
+    rgb, labels = images
+    expected = projector.project(rgb)
+
+    out = np.full(expected.shape, 7, dtype=np.uint8)
+    assert projector.project(rgb, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+
+    # A strided view: results must land in the caller's array, not in a copy
+    backing = np.zeros(expected.shape[:1] + (2 * expected.shape[1],) + expected.shape[2:], dtype=np.uint8)
+    view = backing[:, ::2]
+    assert projector.project(rgb, out=view) is view
+    np.testing.assert_array_equal(backing[:, ::2], expected)
+    assert not backing[:, 1::2].any()
+
+    with pytest.raises(ValueError):
+        projector.project(rgb, out=np.empty(expected.shape, dtype=np.float32))
+    with pytest.raises(ValueError):
+        projector.project(labels, out=out)
+    with pytest.raises(ValueError):
+        projector.project(rgb[:-1])
@@ -0,0 +1,136 @@
+# Tests for the ring-buffer safety feature extractor
+
+import math
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adapters.ego_state import new_ego_record
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.evaluation.logger import RunLogger
+from robust_autonomy_stack.safety.features import (
+    FEATURE_NAMES,
+    SIGNAL_NAMES,
+    TTC_CAP_S,
+    WINDOW_STATS,
+    FeatureExtractor,
+    RingWindow,
+    extract_run_features,
+    logged_signal_names,
+)
+from robust_autonomy_stack.utils.scheduler import DEADLINE_FEATURE_NAMES
+
+
+def reference_window(values, size, alpha):
+    # Brute force over the full history: window stats of the last `size` values, EWMA
+    # over every non-NaN value so far
+    window = np.array(values[-size:], dtype=np.float64)
+    finite = window[~np.isnan(window)]
+    ewma = math.nan
+    for v in values:
+        if v == v:
+            ewma = v if ewma != ewma else ewma + alpha * (v - ewma)
+    if finite.size:
+        stats = [finite.mean(), finite.min(), finite.max()]
+    else:
+        stats = [math.nan] * 3
+    return np.array(stats + [ewma, values[-1]])
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 32])
+def test_ring_window_matches_brute_force(size):
+    rng = np.random.default_rng(size)
+    values = rng.normal(0, 5, 400)
+    values[rng.random(400) < 0.2] = np.nan
+    values[100:100 + 2 * size] = np.nan  # whole windows of missing data
+    values[250:260] = 3.0  # ties in the monotonic deques
+    window = RingWindow(size, alpha=0.3)
+    out = np.empty(5)
+    for i, v in enumerate(values):
+        window.push(float(v))
+        window.write(out, 0)
+        np.testing.assert_allclose(out, reference_window(list(values[:i + 1]), size, 0.3), rtol=1e-9, atol=1e-9)
+
+
+def test_ring_window_mean_does_not_drift():
+    window = RingWindow(16, alpha=0.1)
+    out = np.empty(5)
+    for v in np.random.default_rng(0).normal(1e8, 1.0, 100_000):
+        window.push(float(v))
+    window.push(0.5)
+    for _ in range(15):
+        window.push(0.5)
+    window.write(out, 0)
+    assert out[0] == 0.5  # exact once the big values have left the window
+
+
+def test_ring_window_reset():
+    window = RingWindow(4, alpha=0.5)
+    for v in (1.0, 2.0, 3.0):
+        window.push(v)
+    window.reset()
+    out = np.zeros(5)
+    window.write(out, 0)
+    assert np.isnan(out).all()
+    window.push(7.0)
+    window.write(out, 0)
+    assert out.tolist() == [7.0] * 5
+
+
+def test_feature_layout():
+    assert len(FEATURE_NAMES) == len(SIGNAL_NAMES) * len(WINDOW_STATS) + len(DEADLINE_FEATURE_NAMES)
+    extractor = FeatureExtractor(StackConfig(risk_horizon_s=1.0), dt=0.1, include_deadline=False)
+    assert extractor.window_ticks == 10
+    assert extractor.num_features == len(SIGNAL_NAMES) * len(WINDOW_STATS)
+    assert FeatureExtractor(StackConfig(risk_horizon_s=0.01), dt=0.1).window_ticks == 1
+
+
+def test_update_caps_ttc_and_handles_missing_signals():
+    extractor = FeatureExtractor(StackConfig(), dt=0.05)
+    vec = extractor.update({"min_ttc": math.inf, "speed": 4.0})
+    names = extractor.feature_names
+    assert vec[names.index("min_ttc_max")] == TTC_CAP_S
+    assert vec[names.index("speed_last")] == 4.0
+    assert np.isnan(vec[names.index("cost_margin_mean")])
+    assert np.isnan(vec[names.index("deadline_miss_rate")])
+    vec = extractor.update({"speed": 6.0}, deadline={"deadline_miss_rate": 0.25})
+    assert vec[names.index("speed_mean")] == 5.0
+    assert vec[names.index("deadline_miss_rate")] == 0.25
+    assert vec is extractor.vector
+
+
+def test_extract_matches_online_updates():
+    rng = np.random.default_rng(1)
+    n = 300
+    columns = {name: rng.normal(size=n) for name in SIGNAL_NAMES if name != "prediction_error"}
+    columns["min_ttc"] = rng.uniform(0, 20, n)
+    columns["deadline_miss_rate"] = rng.random(n)
+    extractor = FeatureExtractor(StackConfig(), dt=0.1)
+    bulk = extractor.extract(columns)
+    online = FeatureExtractor(StackConfig(), dt=0.1)
+    for row in range(n):
+        signals = {name: col[row] for name, col in columns.items() if name in SIGNAL_NAMES}
+        deadline = {"deadline_miss_rate": columns["deadline_miss_rate"][row]}
+        np.testing.assert_array_equal(bulk[row], online.update(signals, deadline))
+    assert extractor.extract({}, rows=0).shape == (0, extractor.num_features)
+
+
+def test_extract_run_features_from_log(tmp_path):
+    dt = 0.1
+    signals = logged_signal_names()
+    rng = np.random.default_rng(2)
+    speeds = rng.uniform(0, 15, 50)
+    logged = rng.normal(size=(50, len(signals))).astype(np.float32)
+    ego = new_ego_record()
+    ego["valid"] = True
+    with RunLogger(tmp_path, feature_names=signals, chunk_rows=16, dt=dt) as logger:
+        for step in range(50):
+            ego["speed"] = speeds[step]
+            logger.log_tick(step, ego, (0.0, 0.0), 0.0, features=logged[step])
+
+    features = extract_run_features(tmp_path)
+    expected = FeatureExtractor(StackConfig(), dt).extract(
+        {**{name: logged[:, i] for i, name in enumerate(signals)},
+         "speed": speeds.astype(np.float32), "steering": np.zeros(50)}
+    )
+    np.testing.assert_allclose(features, expected, rtol=1e-6)
@@ -0,0 +1,58 @@
+# Tests for the camera frame ring buffer
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.config.schema import SensorConfig
+from robust_autonomy_stack.sensors.frame_buffer import FrameRingBuffer
+
+
+def image(value, shape=(2, 3, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_latest_and_get_before_wraparound():
+    ring = FrameRingBuffer(3, (2, 3, 3))
+    assert ring.latest() is None and len(ring) == 0 and ring.get(0) is None
+
+    first = ring.write(image(1), step=10, timestamp=1.5)
+    second = ring.write(image(2), step=11, timestamp=2.5)
+    assert len(ring) == 2 and ring.latest_id == 1
+    latest = ring.latest()
+    assert (latest.frame_id, latest.step, latest.timestamp) == (1, 11, 2.5)
+    assert latest.image is second.image  # the same view, not a copy
+    assert ring.get(0).step == 10 and (ring.get(0).image == 1).all()
+    assert ring.get(2) is None and ring.get(-1) is None
+    assert ring.is_current(first)
+
+    # Frames are read-only views into the ring
+    with pytest.raises(ValueError):
+        first.image[0, 0, 0] = 9
+
+
+def test_wraparound_overwrites_oldest():
+    ring = FrameRingBuffer(3, (2, 3, 3))
+    frames = [ring.write(image(i), step=i) for i in range(5)]
+    assert len(ring) == 3 and ring.latest_id == 4
+    # Ids 0 and 1 were overwritten by 3 and 4
+    assert ring.get(0) is None and ring.get(1) is None
+    assert not ring.is_current(frames[0]) and not ring.is_current(frames[1])
+    assert ring.is_current(frames[2]) and ring.is_current(frames[4])
+    # The old view now shows the frame that reused its slot
+    assert (frames[1].image == 4).all()
+    assert [frame.frame_id for frame in ring.history()] == [4, 3, 2]
+    assert [int(frame.image[0, 0, 0]) for frame in ring.history(2)] == [4, 3]
+    assert ring.get(3).step == 3
+
+
+def test_shape_checks_and_sensor_sizing():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(0, (2, 2))
+    ring = FrameRingBuffer(2, (2, 3, 3))
+    with pytest.raises(ValueError):
+        ring.write(np.zeros((3, 2, 3), dtype=np.uint8))
+
+    sensor = SensorConfig()
+    ring = FrameRingBuffer.for_sensor(sensor)
+    assert ring.shape == (sensor.height, sensor.width, 3)
+    assert ring.capacity == max(1, int(np.ceil(sensor.fps * sensor.frame_history_s)))
@@ -0,0 +1,132 @@
+# Tests for the batched Kalman filter bank
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.tracking.kalman import DIM_X, KalmanFilterBank
+
+
+class ReferenceFilter:
+    # Textbook single-track constant-velocity Kalman filter
+
+    H = np.hstack([np.eye(2), np.zeros((2, 2))])
+
+    def __init__(self, bank: KalmanFilterBank, position):
+        self.x = np.array([position[0], position[1], 0.0, 0.0])
+        self.P = np.diag([bank.R[0, 0], bank.R[1, 1], bank.initial_velocity_var, bank.initial_velocity_var])
+        self.R = bank.R
+        self.bank = bank
+
+    def predict(self, dt):
+        F, Q = self.bank.transition(dt)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, z):
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(DIM_X) - K @ self.H) @ self.P
+
+
+def assert_matches(bank, reference):
+    assert sorted(bank.ids.tolist()) == sorted(reference)
+    for track_id, ref in reference.items():
+        slot = bank.slots([track_id])[0]
+        np.testing.assert_allclose(bank.states[slot], ref.x, atol=1e-9)
+        np.testing.assert_allclose(bank.covariances[slot], ref.P, atol=1e-9)
+
+
+def test_bank_matches_per_track_filters_through_add_and_remove():
+    rng = np.random.default_rng(0)
+    bank = KalmanFilterBank(capacity=2)
+    reference = {}
+    for frame in range(60):
+        dt = rng.uniform(0.02, 0.1)
+        bank.predict(dt)
+        for ref in reference.values():
+            ref.predict(dt)
+
+        ids = bank.ids.copy()
+        if ids.size:
+            chosen = ids[rng.random(ids.size) < 0.7]
+            z = rng.normal(0, 3, (chosen.size, 2))
+            bank.update(bank.slots(chosen), z)
+            for track_id, zi in zip(chosen, z):
+                reference[int(track_id)].update(zi)
+            # Swap-remove a random subset, including the last active row at times
+            drop = ids[rng.random(ids.size) < 0.15]
+            bank.remove(drop)
+            for track_id in drop:
+                del reference[int(track_id)]
+
+        positions = rng.normal(0, 10, (rng.integers(0, 4), 2))
+        for track_id, p in zip(bank.add(positions), positions):
+            reference[int(track_id)] = ReferenceFilter(bank, p)
+        assert_matches(bank, reference)
+    assert bank.capacity >= len(bank)
+
+
+def test_remove_keeps_slot_map_consistent():
+    bank = KalmanFilterBank(capacity=4)
+    ids = bank.add(np.arange(10.0).reshape(5, 2))
+    bank.hits[:] = np.arange(5)
+    bank.remove([ids[0], ids[4], ids[2]])
+    assert len(bank) == 2
+    assert sorted(bank.ids.tolist()) == [ids[1], ids[3]]
+    for track_id in (ids[1], ids[3]):
+        slot = bank.slots([track_id])[0]
+        assert bank.states[slot, 0] == 2.0 * track_id
+        assert bank.hits[slot] == track_id
+    assert bank._ids[2:].tolist() == [-1] * (bank.capacity - 2)
+
+
+def test_remove_all_then_add():
+    bank = KalmanFilterBank()
+    ids = bank.add([[0.0, 0.0], [1.0, 1.0]])
+    bank.remove(ids)
+    assert len(bank) == 0
+    bank.predict(0.1)  # no-op on an empty bank
+    new = bank.add([[5.0, 5.0]])
+    assert new[0] == 2  # ids are never reused
+    assert bank.states[0, :2].tolist() == [5.0, 5.0]
+
+
+def test_update_and_mark_missed_counters():
+    bank = KalmanFilterBank()
+    bank.add([[0.0, 0.0], [1.0, 0.0]])
+    bank.update(np.array([0]), np.array([[0.1, 0.0]]))
+    bank.mark_missed(np.array([1]))
+    bank.update(np.empty(0, dtype=np.intp), np.empty((0, 2)))
+    assert bank.hits.tolist() == [2, 1]
+    assert bank.misses.tolist() == [0, 1]
+
+
+def test_covariances_stay_symmetric_positive_definite():
+    rng = np.random.default_rng(1)
+    bank = KalmanFilterBank(process_noise=0.1, measurement_noise=0.01)
+    bank.add(rng.normal(size=(20, 2)))
+    for _ in range(200):
+        bank.predict(0.05)
+        bank.update(np.arange(20), bank.states[:, :2] + rng.normal(0, 0.01, (20, 2)))
+    P = bank.covariances
+    np.testing.assert_allclose(P, P.transpose(0, 2, 1))
+    assert np.all(np.linalg.eigvalsh(P) > 0)
+
+
+def test_innovation_covariances():
+    bank = KalmanFilterBank(measurement_noise=0.5)
+    bank.add([[0.0, 0.0], [3.0, 4.0]])
+    S = bank.innovation_covariances()
+    assert S.shape == (2, 2, 2)
+    np.testing.assert_allclose(S[0], np.eye(2) * 0.5)
+    assert bank.innovation_covariances(np.array([1])).shape == (1, 2, 2)
+
+
+@pytest.mark.parametrize("dt", [0.0, 0.05, 1.0])
+def test_predict_moves_by_velocity(dt):
+    bank = KalmanFilterBank()
+    bank.add([[1.0, 2.0]], velocities=[[3.0, -1.0]])
+    bank.predict(dt)
+    np.testing.assert_allclose(bank.states[0], [1.0 + 3.0 * dt, 2.0 - dt, 3.0, -1.0])
+    assert bank.age[0] == 1
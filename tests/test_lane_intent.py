@@ -0,0 +1,124 @@
+# Tests for the lane index and lane-following intent prediction
+
+import math
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from robust_autonomy_stack.config.schema import StackConfig  # noqa: E402
+from robust_autonomy_stack.prediction.constant_velocity import ConstantVelocityPredictor  # noqa: E402
+from robust_autonomy_stack.prediction.lane_intent import (  # noqa: E402
+    LaneIndex,
+    LaneIntentPredictor,
+    lane_index_cache_path,
+    load_lane_index,
+)
+
+
+def line(start, end, spacing=1.0):
+    # Centerline samples every `spacing` metres from start, plus the end point
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    length = float(np.hypot(*(end - start)))
+    s = np.append(np.arange(0.0, length, spacing), length)
+    return start + (s / length)[:, None] * (end - start)
+
+
+def road():
+    # a: (0,0) -> (10,0), continues into b: (10,0) -> (20,0); c runs north from (5,-20)
+    # and ends far from everything, so it is a dead end
+    keys = ["a", "b", "c"]
+    return keys, [line((0, 0), (10, 0)), line((10, 0), (20, 0)), line((5, -20), (5, -12.5))]
+
+
+@pytest.fixture
+def index():
+    return LaneIndex(*road(), spacing=1.0)
+
+
+def test_layout_and_successors(index):
+    assert index.num_lanes == 3
+    np.testing.assert_allclose(index.lane_length, [10.0, 10.0, 7.5])
+    assert index.successor.tolist() == [1, -1, -1]
+    with pytest.raises(ValueError):
+        LaneIndex(["x"], [np.zeros((1, 2))], 1.0)
+
+
+def test_project(index):
+    points = np.array([[3.5, 1.0], [12.25, -0.5], [5.0, -15.2], [4.0, -15.0]])
+    lane, s, lateral, heading = index.project(points)
+    assert lane.tolist() == [0, 1, 2, 2]
+    np.testing.assert_allclose(s, [3.5, 2.25, 4.8, 5.0])
+    # Lateral is positive to the left of the lane direction
+    np.testing.assert_allclose(lateral, [1.0, -0.5, 0.0, 1.0], atol=1e-12)
+    np.testing.assert_allclose(heading, [0.0, 0.0, math.pi / 2, math.pi / 2])
+
+    lane, dist = index.nearest_lane(np.array([[3.0, 0.2], [100.0, 100.0]]), max_distance=5.0)
+    assert lane.tolist() == [0, -1] and dist[0] == pytest.approx(0.2)
+
+
+def test_sample_ahead_follows_successors(index):
+    positions, headings = index.sample_ahead(np.array([0]), np.array([8.0]), np.array([1.0, 5.0, 11.5]))
+    np.testing.assert_allclose(positions[0], [[9.0, 0.0], [13.0, 0.0], [19.5, 0.0]], atol=1e-12)
+    np.testing.assert_allclose(headings[0], 0.0)
+
+    # Past the end of b (no successor) the centerline is extrapolated straight ahead
+    positions, _ = index.sample_ahead(np.array([0]), np.array([8.0]), np.array([15.0]))
+    np.testing.assert_allclose(positions[0, 0], [23.0, 0.0], atol=1e-12)
+
+    # Per-agent distances, and a dead-end lane on its own
+    positions, headings = index.sample_ahead(
+        np.array([2, 1]), np.array([1.0, 0.0]), np.array([[2.0, 10.0], [0.5, 3.0]])
+    )
+    np.testing.assert_allclose(positions[0], [[5.0, -17.0], [5.0, -9.0]], atol=1e-12)
+    np.testing.assert_allclose(positions[1], [[10.5, 0.0], [13.0, 0.0]], atol=1e-12)
+    np.testing.assert_allclose(headings[0], math.pi / 2)
+
+
+def test_predictor_follows_lanes_and_falls_back(index):
+    config = StackConfig()
+    predictor = LaneIntentPredictor(config, index)
+    states = np.array([
+        [2.0, 0.3, 4.0, 0.0],  # on lane a, moving along it
+        [50.0, 50.0, 1.0, 2.0],  # far from every lane
+        [8.0, 0.0, -4.0, 0.0],  # on lane a but driving against it
+    ])
+    expected = ConstantVelocityPredictor(config).predict(states)
+    prediction = predictor.predict(states)
+    times = predictor.times
+
+    # Lane follower: snaps to the centerline and rolls along a, b and past b's end
+    np.testing.assert_allclose(prediction.positions[0, :, 0], 2.0 + 4.0 * times)
+    np.testing.assert_allclose(prediction.positions[0, :, 1], 0.0, atol=1e-12)
+    # Off-lane and wrong-way agents keep the constant-velocity prediction
+    np.testing.assert_allclose(prediction.positions[1:], expected.positions[1:])
+    np.testing.assert_allclose(prediction.yaws[1:], expected.yaws[1:])
+
+    assert predictor.predict(np.empty((0, 4))).num_agents == 0
+
+
+class StubAdapter:
+    def __init__(self):
+        self.calls = 0
+
+    def get_lane_centerlines(self, spacing):
+        self.calls += 1
+        return road()
+
+
+def test_load_lane_index_caches(tmp_path):
+    adapter = StubAdapter()
+    built = load_lane_index(adapter, "SS", 3, cache_dir=tmp_path)
+    loaded = load_lane_index(adapter, "SS", 3, cache_dir=tmp_path)
+    assert adapter.calls == 1
+    np.testing.assert_array_equal(loaded.points, built.points)
+    assert loaded.lane_keys == built.lane_keys and loaded.successor.tolist() == [1, -1, -1]
+    # Only the cache file is left behind (no temp files)
+    assert os.listdir(tmp_path) == [lane_index_cache_path("SS", 3, 1.0, tmp_path).name]
+
+    # An unreadable cache file is rebuilt
+    lane_index_cache_path("SS", 3, 1.0, tmp_path).write_bytes(b"junk")
+    load_lane_index(adapter, "SS", 3, cache_dir=tmp_path)
+    assert adapter.calls == 2
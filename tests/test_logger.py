@@ -0,0 +1,62 @@
+# Tests for the chunked run logger
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adapters.ego_state import ego_record_to_dict, new_ego_record
+from robust_autonomy_stack.evaluation.logger import RunLogger, lane_names, load_run_log
+
+
+def ego_record(x):
+    ego = new_ego_record()
+    ego["x"], ego["speed"], ego["valid"] = x, 2.0 * x, True
+    return ego
+
+
+def test_round_trip_across_reused_chunks(tmp_path):
+    # 2 chunk buffers of 4 rows for 20 rows: every buffer is reused several times
+    with RunLogger(tmp_path, feature_names=["a", "b"], chunk_rows=4, max_pending_chunks=1) as logger:
+        for step in range(20):
+            features = [step, -step] if step < 10 else None
+            logger.log_tick(step, ego_record(float(step)), (0.1, 0.5), 1.0, {"crash": step == 19},
+                            features=features)
+    log = load_run_log(tmp_path)
+    assert log["step"].tolist() == list(range(20))
+    np.testing.assert_array_equal(log["ego_speed"], 2.0 * np.arange(20))
+    np.testing.assert_array_equal(log["feat_a"][:10], np.arange(10))
+    # Rows logged without features are NaN, not leftovers from an earlier chunk
+    assert np.isnan(log["feat_a"][10:]).all() and np.isnan(log["feat_b"][10:]).all()
+    assert log["crash"].tolist() == [False] * 19 + [True]
+
+
+def test_lane_ids_and_string_table(tmp_path):
+    lanes = [("a", "b", 0), ("a", "b", 1), None, ("a", "b", 0)]
+    with RunLogger(tmp_path, chunk_rows=3) as logger:
+        for step, lane in enumerate(lanes):
+            logger.log_tick(step, ego_record(1.0), (0.0, 0.0), 0.0, lane=lane)
+        # The legacy dict carries its own lane_index
+        logger.log_tick(4, ego_record_to_dict(ego_record(2.0), ("c", "d", 2)), (0.0, 0.0), 0.0)
+    log = load_run_log(tmp_path, ["ego_lane_id", "ego_x"])
+    assert log["ego_lane_id"].tolist() == [0, 1, -1, 0, 2]
+    assert lane_names(tmp_path) == [str(("a", "b", 0)), str(("a", "b", 1)), str(("c", "d", 2))]
+    assert log["ego_x"].tolist() == [1.0] * 4 + [2.0]
+
+
+def test_invalid_ego_and_empty_log(tmp_path):
+    with RunLogger(tmp_path / "run", chunk_rows=2) as logger:
+        logger.log_tick(0, new_ego_record(), (0.0, 0.0), 0.0)
+        logger.log_tick(1, {}, (0.0, 0.0), 0.0)
+    log = load_run_log(tmp_path / "run")
+    assert np.isnan(log["ego_x"]).all() and not log["ego_on_lane"].any()
+
+    RunLogger(tmp_path / "empty").close()
+    empty = load_run_log(tmp_path / "empty", ["step", "ego_lane_id"])
+    assert empty["step"].shape == (0,) and empty["ego_lane_id"].dtype == np.int32
+
+
+def test_log_after_close_raises(tmp_path):
+    logger = RunLogger(tmp_path)
+    logger.close()
+    logger.close()  # idempotent
+    with pytest.raises(RuntimeError):
+        logger.log_tick(0, new_ego_record(), (0.0, 0.0), 0.0)
@@ -0,0 +1,117 @@
+# Tests for the adapter's per-step caching, against a stub MetaDrive environment
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adapters import metadrive_adapter
+from robust_autonomy_stack.adapters.metadrive_adapter import MetaDriveAdapter
+from robust_autonomy_stack.config.schema import SensorConfig
+
+
+class StubCamera:
+    def __init__(self):
+        self.reads = 0
+
+    def perceive(self):
+        self.reads += 1
+        return np.full((4, 6, 3), self.reads, dtype=np.uint8)
+
+
+class StubVehicle:
+    # Counts position reads; each step moves the vehicle 1 m along x
+    def __init__(self):
+        self.x = 0.0
+        self.position_reads = 0
+        self.velocity = (3.0, 4.0)
+        self.heading_theta = 0.25
+        self.steering = 0.1
+        self.on_lane = True
+        self.lane_index = ("a", "b", 0)
+        self.image_sensors = {"rgb_camera": StubCamera()}
+
+    @property
+    def position(self):
+        self.position_reads += 1
+        return (self.x, 2.0)
+
+    def set_velocity(self, velocity):
+        self.velocity = velocity
+
+
+class StubEnv:
+    def __init__(self, config):
+        self.config = dict(config, physics_world_step_size=0.02, decision_repeat=5)
+        self.agent = StubVehicle()
+        self.main_camera = object()
+
+    def reset(self, seed=None):
+        return np.zeros(3), {}
+
+    def step(self, action):
+        if self.agent is not None:
+            self.agent.x += 1.0
+        return np.zeros(3), 0.0, False, False, {}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setattr(metadrive_adapter, "metadrive", SimpleNamespace(MetaDriveEnv=StubEnv))
+    adapter = MetaDriveAdapter({}, sensor_config=SensorConfig(fps=10, frame_history_s=0.2))
+    adapter.reset()
+    return adapter
+
+
+def test_camera_read_once_per_step(adapter):
+    camera = adapter.env.agent.image_sensors["rgb_camera"]
+    frame = adapter.get_camera_frame()
+    assert adapter.get_camera_frame().image is frame.image
+    assert adapter.get_camera_image() is frame.image
+    assert camera.reads == 1 and adapter.frames.capacity == 2
+
+    adapter.step(np.zeros(2))
+    second = adapter.get_camera_frame()
+    assert camera.reads == 2 and second.frame_id == frame.frame_id + 1
+    assert second.step == 1 and (second.image == 2).all()
+    # The third frame reuses the first frame's slot
+    adapter.step(np.zeros(2))
+    adapter.get_camera_frame()
+    assert not adapter.frames.is_current(frame) and adapter.frames.is_current(second)
+
+
+def test_ego_record_read_once_per_step(adapter, monkeypatch):
+    vehicle = adapter.env.agent
+    ego = adapter.get_ego_record()
+    assert ego["valid"] and (ego["x"], ego["y"], ego["speed"]) == (0.0, 2.0, 5.0)
+    assert adapter.get_ego_record() is ego and vehicle.position_reads == 1
+
+    # out receives a copy of the cached record
+    out = np.zeros_like(ego)
+    assert adapter.get_ego_record(out) is out and out["heading"] == 0.25
+    assert vehicle.position_reads == 1
+
+    adapter.step(np.zeros(2))
+    assert adapter.get_ego_record()["x"] == 1.0 and vehicle.position_reads == 2
+    assert out["x"] == 0.0
+
+    # Setting the ego velocity invalidates the cached record
+    monkeypatch.setattr(adapter, "_vehicles", lambda: [vehicle])
+    adapter.set_vehicle_velocity(0, 6.0, 8.0)
+    assert adapter.get_ego_record()["speed"] == 10.0 and vehicle.position_reads == 3
+    with pytest.raises(IndexError):
+        adapter.set_vehicle_velocity(1, 0.0, 0.0)
+
+
+def test_ego_state_dict_and_missing_agent(adapter):
+    state = adapter.get_ego_state()
+    assert state["position"]["x"] == 0.0 and state["speed"] == 5.0
+    assert state["lane_index"] == adapter.get_lane_index() == ("a", "b", 0)
+
+    adapter.env.agent = None
+    adapter.step(np.zeros(2))
+    assert not adapter.get_ego_record()["valid"]
+    assert adapter.get_ego_state() == {} and adapter.get_lane_index() is None
@@ -0,0 +1,182 @@
+# Tests for the streaming, mergeable metric accumulators
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adapters.ego_state import new_ego_record
+from robust_autonomy_stack.evaluation.episode import EpisodeResult
+from robust_autonomy_stack.evaluation.metrics import (
+    EpisodeMetrics,
+    Histogram,
+    QuantileSketch,
+    RunningStats,
+    SuiteMetrics,
+    time_to_collision,
+)
+
+
+def assert_stats_match(stats: RunningStats, values: np.ndarray):
+    assert stats.count == values.size
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-12, abs=1e-12)
+    assert stats.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert stats.min == values.min() and stats.max == values.max()
+
+
+def test_running_stats_welford_matches_numpy():
+    values = np.random.default_rng(0).normal(1e6, 3.0, 5000)  # large offset: naive sums lose precision
+    stats = RunningStats()
+    for v in values:
+        stats.update(float(v))
+    assert_stats_match(stats, values)
+
+
+def test_running_stats_merge_is_order_independent():
+    rng = np.random.default_rng(1)
+    chunks = [rng.normal(rng.uniform(-5, 5), rng.uniform(0.1, 4), rng.integers(0, 300)) for _ in range(12)]
+    parts = []
+    for chunk in chunks:
+        part = RunningStats()
+        part.update_batch(chunk)
+        parts.append(part)
+    forward, backward = RunningStats(), RunningStats()
+    for part in parts:
+        forward.merge(RunningStats.from_dict(part.to_dict()))
+    for part in reversed(parts):
+        backward.merge(RunningStats.from_dict(part.to_dict()))
+    values = np.concatenate(chunks)
+    assert_stats_match(forward, values)
+    assert_stats_match(backward, values)
+
+
+def test_running_stats_empty_and_single():
+    stats = RunningStats()
+    stats.update_batch(np.empty(0))
+    stats.merge(RunningStats())
+    assert stats.count == 0 and stats.variance == 0.0
+    assert stats.summary() == {"count": 0}
+    assert RunningStats.from_dict(json.loads(json.dumps(stats.to_dict()))).count == 0
+    stats.update(2.5)
+    assert stats.variance == 0.0 and stats.min == stats.max == 2.5
+
+
+def sketch_reference(values: np.ndarray, q: float) -> float:
+    # Rank convention of QuantileSketch.quantile: the value at floor(q * (n - 1))
+    return np.sort(values)[int(math.floor(q * (values.size - 1)))]
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantile_sketch_relative_error(accuracy):
+    rng = np.random.default_rng(2)
+    values = np.concatenate([
+        rng.lognormal(0, 2, 4000), -rng.lognormal(1, 1, 1000), np.zeros(200), rng.normal(0, 1e-8, 50)
+    ])
+    rng.shuffle(values)
+    sketch = QuantileSketch(relative_accuracy=accuracy)
+    sketch.update_batch(values[:3000])
+    for v in values[3000:]:
+        sketch.update(float(v))
+    assert sketch.count == values.size
+    for q in (0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0):
+        true = sketch_reference(values, q)
+        estimate = sketch.quantile(q)
+        if abs(true) < sketch.min_value:
+            assert estimate == 0.0
+        else:
+            assert abs(estimate - true) <= accuracy * abs(true) * (1 + 1e-9)
+
+
+def test_quantile_sketch_merge_equals_single_sketch():
+    rng = np.random.default_rng(3)
+    values = rng.exponential(2.0, 3000) - 0.5
+    whole = QuantileSketch()
+    whole.update_batch(values)
+    merged = QuantileSketch()
+    for chunk in np.array_split(values, 7):
+        part = QuantileSketch()
+        part.update_batch(chunk)
+        merged.merge(QuantileSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+    assert merged.count == whole.count
+    assert merged.quantiles((0.05, 0.5, 0.95)) == whole.quantiles((0.05, 0.5, 0.95))
+
+
+def test_quantile_sketch_degenerate_inputs():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    sketch.update_batch(np.array([np.nan, np.inf, -np.inf]))
+    sketch.update(math.nan)
+    assert sketch.count == 0
+    sketch.update(5.0)
+    assert sketch.quantile(0.0) == sketch.quantile(1.0) == pytest.approx(5.0, rel=0.01)
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(relative_accuracy=0.02))
+
+
+def test_histogram_matches_numpy_and_scalar_path():
+    rng = np.random.default_rng(4)
+    edges = np.linspace(-1.0, 1.0, 11)
+    values = np.concatenate([rng.uniform(-1.5, 1.5, 1000), edges])  # edges exercise boundaries
+    batch, scalar = Histogram(edges), Histogram(edges)
+    batch.update_batch(values)
+    for v in values:
+        scalar.update(float(v))
+    expected, _ = np.histogram(values, bins=edges)
+    assert batch.counts.tolist() == expected.tolist() == scalar.counts.tolist()
+    assert batch.underflow == scalar.underflow == int((values < -1.0).sum())
+    assert batch.overflow == scalar.overflow == int((values > 1.0).sum())
+    with pytest.raises(ValueError):
+        batch.merge(Histogram([0.0, 1.0]))
+
+
+def test_time_to_collision():
+    # Ego at origin heading +x at 10 m/s; agent 20 m ahead at 5 m/s -> 4 s
+    snapshot = np.array([[0.0, 0.0, 0.0, 10.0, 0.0], [20.0, 0.5, 0.0, 5.0, 0.0]])
+    assert time_to_collision(snapshot) == pytest.approx(4.0)
+    assert time_to_collision(snapshot[:1]) == math.inf
+    behind = snapshot.copy()
+    behind[1, 0] = -20.0
+    assert time_to_collision(behind) == math.inf
+    aside = snapshot.copy()
+    aside[1, 1] = 5.0
+    assert time_to_collision(aside) == math.inf
+
+
+def make_result(index, speeds, outcome="arrive_dest"):
+    metrics = EpisodeMetrics(dt=0.1)
+    ego = new_ego_record()
+    ego["valid"] = True
+    ego["on_lane"] = True
+    for k, speed in enumerate(speeds):
+        ego["speed"] = speed
+        metrics.update_tick(ego, ttc=2.0 + k)
+    return EpisodeResult(index=index, scenario="s", map_type="S", seed=index, outcome=outcome,
+                         steps=len(speeds), extra={"metrics": metrics.to_dict()})
+
+
+def test_suite_metrics_sharded_merge_matches_single_pass():
+    rng = np.random.default_rng(5)
+    results = [make_result(i, rng.uniform(0, 20, rng.integers(3, 40)).tolist(),
+                           "crash" if i % 4 == 0 else "arrive_dest") for i in range(20)]
+    single = SuiteMetrics().add_episodes(results)
+    shards = [SuiteMetrics().add_episodes(results[i::3]) for i in range(3)]
+    merged = SuiteMetrics()
+    for shard in shards:
+        merged.merge(SuiteMetrics.from_dict(json.loads(json.dumps(shard.to_dict()))))
+    a, b = single.summary(), merged.summary()
+    assert a["episodes"] == b["episodes"] == 20
+    assert a["failure_rate"] == b["failure_rate"] == 0.25
+    assert a["speed_mps"]["mean"] == pytest.approx(b["speed_mps"]["mean"])
+    assert a["speed_mps"]["std"] == pytest.approx(b["speed_mps"]["std"])
+    assert a["jerk_mps3"]["p50"] == b["jerk_mps3"]["p50"]
+    assert single.speed_hist.counts.tolist() == merged.speed_hist.counts.tolist()
+    all_speeds = np.concatenate([[r.extra["metrics"]["speed"]["mean"]] * r.steps for r in results])
+    assert a["speed_mps"]["mean"] == pytest.approx(all_speeds.mean())
+
+
+def test_suite_metrics_without_completed_episodes():
+    failed = EpisodeResult(index=0, scenario="s", map_type="S", seed=0, status="error")
+    summary = SuiteMetrics().add_episodes([failed]).summary()
+    assert summary["completed"] == 0
+    assert summary["success_rate"] is None and summary["off_lane_fraction"] is None
@@ -0,0 +1,99 @@
+# Tests for the per-stage latency histograms and the Chrome trace export
+
+import json
+import math
+
+import pytest
+
+from robust_autonomy_stack.utils.profiling import LatencyHistogram, Profiler, timed
+
+# Relative width of one histogram bucket (20 per decade)
+BUCKET = 10 ** (1 / 20)
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    assert math.isnan(hist.percentile_ns(0.5)) and math.isnan(hist.mean_ns)
+    for _ in range(90):
+        hist.record(1_000)
+    for _ in range(10):
+        hist.record(1_000_000)
+    assert hist.count == 100 and hist.max_ns == 1_000_000
+    assert hist.mean_ns == pytest.approx((90 * 1_000 + 10 * 1_000_000) / 100)
+    # Percentiles are bucket upper edges, at most one bucket above the sample
+    assert 1_000 <= hist.percentile_ns(0.50) <= 1_000 * BUCKET
+    assert 1_000 <= hist.percentile_ns(0.90) <= 1_000 * BUCKET
+    # ... and never above the observed max
+    assert hist.percentile_ns(0.95) == hist.percentile_ns(0.99) == 1_000_000
+
+    other = LatencyHistogram()
+    other.record(50)  # below the first bucket edge
+    other.record(10**12)  # beyond the last bucket
+    hist.merge(other)
+    assert hist.count == 102 and hist.max_ns == 10**12
+    assert hist.percentile_ns(0.0) <= 100
+    assert hist.percentile_ns(1.0) <= 10**12
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    assert profiler.stage("planning") is profiler.stage("control")
+    with profiler.stage("planning"):
+        pass
+    profiler.record("planning", 5_000)
+
+    @timed("control", profiler)
+    def control(x):
+        return 2 * x
+
+    assert control(3) == 6
+    assert profiler.histograms == {} and profiler.summary() == {}
+
+
+def test_summary_order_and_timed():
+    profiler = Profiler(enabled=True)
+
+    @timed("planning.score", profiler)
+    def score():
+        return "ok"
+
+    for name in ("custom", "logging", "planning", "sim_step"):
+        profiler.record(name, 2_000_000)
+    assert score() == "ok"
+    with profiler.stage("safety"):
+        pass
+
+    summary = profiler.summary()
+    # Pipeline stages in tick order (sub-stages with their parent), then the rest
+    order = ["sim_step", "planning", "planning.score", "safety", "logging", "custom"]
+    assert list(summary) == order
+    assert summary["sim_step"]["count"] == 1 and summary["sim_step"]["max_ms"] == 2.0
+    assert "planning.score" in profiler.format_summary()
+
+
+def test_chrome_trace_export(tmp_path):
+    profiler = Profiler(enabled=True, trace=True, max_trace_events=3)
+    for _ in range(2):
+        profiler.tick()
+        with profiler.stage("planning"):
+            with profiler.stage("planning.sample"):
+                pass
+    assert profiler.dropped_events == 1  # the fourth event is over the limit
+
+    path = tmp_path / "trace.json"
+    profiler.export_chrome_trace(path)
+    with open(path) as f:
+        trace = json.load(f)
+    events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert [(e["name"], e["args"]["tick"]) for e in events] == [
+        ("planning.sample", 1), ("planning", 1), ("planning.sample", 2),
+    ]
+    for event in events:
+        assert event["ts"] >= 0 and event["dur"] >= 0 and event["pid"] == 1
+    # Sub-stages share their parent's row, which is named by a metadata event
+    assert {event["tid"] for event in events} == {1}
+    (meta,) = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+    assert meta["args"] == {"name": "planning"} and meta["tid"] == 1
+
+    profiler.reset()
+    assert profiler.histograms == {} and profiler.tick_index == 0
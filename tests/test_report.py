@@ -0,0 +1,79 @@
+# Tests for the incremental, content-hash cached run report
+
+import pytest
+
+from robust_autonomy_stack.adapters.ego_state import new_ego_record
+from robust_autonomy_stack.evaluation import report
+from robust_autonomy_stack.evaluation.logger import META_FILE, RunLogger
+from robust_autonomy_stack.evaluation.report import CACHE_DIR, generate_report, run_log_hash
+
+
+def write_run(run_dir, steps, crash_step=None):
+    with RunLogger(run_dir, chunk_rows=4) as logger:
+        for step in range(steps):
+            ego = new_ego_record()
+            ego["x"], ego["speed"], ego["valid"] = float(step), 2.0, True
+            logger.log_tick(step, ego, (0.0, 0.5), 1.0, {"crash": step == crash_step})
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    # Records the run directory of every run that is actually rendered
+    calls = []
+    render_run = report.render_run
+
+    def counting(run_dir, entry_dir, save_plots=True):
+        calls.append(run_dir.name)
+        return render_run(run_dir, entry_dir, save_plots)
+
+    monkeypatch.setattr(report, "render_run", counting)
+    return calls
+
+
+def cache_entries(out_dir):
+    return sorted(path.name for path in (out_dir / CACHE_DIR).iterdir())
+
+
+def test_cache_hit_miss_and_pruning(tmp_path, render_calls):
+    runs, out = tmp_path / "runs", tmp_path / "report"
+    write_run(runs / "a", 6)
+    write_run(runs / "b", 5, crash_step=3)
+    hash_a, hash_b = run_log_hash(runs / "a"), run_log_hash(runs / "b")
+    assert hash_a != hash_b and run_log_hash(runs / "a") == hash_a
+
+    index = generate_report(runs, out, save_plots=False, num_workers=1)
+    assert sorted(render_calls) == ["a", "b"]
+    assert cache_entries(out) == sorted([hash_a, hash_b])
+    page = index.read_text()
+    assert "<td>crash</td>" in page and "class='fail'" in page
+
+    # Nothing changed: every row comes from the cache
+    render_calls.clear()
+    generate_report(runs, out, save_plots=False, num_workers=1)
+    assert render_calls == []
+
+    # Rewriting a log changes its hash; only that run is rendered, and its old
+    # entry (plus any leftover temp dir) is pruned
+    write_run(runs / "b", 7)
+    (out / CACHE_DIR / f"{hash_a}.tmp123").mkdir()
+    render_calls.clear()
+    generate_report(runs, out, save_plots=False, num_workers=1)
+    new_b = run_log_hash(runs / "b")
+    assert render_calls == ["b"] and new_b != hash_b
+    assert cache_entries(out) == sorted([hash_a, new_b])
+
+    # Without pruning, entries of removed runs are kept
+    (runs / "b" / META_FILE).unlink()
+    generate_report(runs, out, save_plots=False, num_workers=1, prune=False)
+    assert new_b in cache_entries(out)
+
+
+def test_cached_row_without_plots_is_rendered_again(tmp_path, render_calls):
+    pytest.importorskip("matplotlib")
+    runs, out = tmp_path / "runs", tmp_path / "report"
+    write_run(runs / "a", 4)
+    generate_report(runs, out, save_plots=False, num_workers=1)
+    generate_report(runs, out, save_plots=True, num_workers=1)
+    assert render_calls == ["a", "a"]
+    entry = out / CACHE_DIR / run_log_hash(runs / "a")
+    assert (entry / "trajectory.png").is_file() and (entry / "timeseries.png").is_file()
@@ -0,0 +1,112 @@
+# Tests for risk model inference: compiled trees against XGBoost's own predictions
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from robust_autonomy_stack.safety.risk_model import CompiledTrees, RiskModel  # noqa: E402
+
+
+NUM_FEATURES = 6
+
+
+def training_data(rng, n=3000, missing=0.1):
+    X = rng.normal(size=(n, NUM_FEATURES)).astype(np.float32)
+    logit = 1.5 * X[:, 0] - X[:, 1] * X[:, 2] + np.where(X[:, 3] > 0.5, 2.0, -0.5)
+    y = (rng.random(n) < 1.0 / (1.0 + np.exp(-logit))).astype(np.float32)
+    # Missing values in training make the learned default directions non-trivial
+    X[rng.random(X.shape) < missing] = np.nan
+    return X, y
+
+
+def train(X, y, rounds=30, **params):
+    params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.3, "nthread": 1, **params}
+    return xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=rounds)
+
+
+@pytest.fixture(scope="module")
+def booster():
+    return train(*training_data(np.random.default_rng(0)))
+
+
+def test_compiled_trees_match_booster(booster):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(500, NUM_FEATURES)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[:20] = np.nan  # all-missing rows follow default_left all the way down
+    compiled = CompiledTrees(booster)
+    expected = booster.predict(xgb.DMatrix(X))
+    actual = np.array([compiled.predict(row) for row in X])
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_compiled_trees_exact_threshold_goes_right(booster):
+    # XGBoost sends x < threshold left, so a value equal to a split threshold goes right
+    compiled = CompiledTrees(booster)
+    root = compiled.roots[0]
+    X = np.zeros((1, NUM_FEATURES), dtype=np.float32)
+    X[0, compiled.feature[root]] = compiled.threshold[root]
+    expected = booster.predict(xgb.DMatrix(X))[0]
+    assert compiled.predict(X[0]) == pytest.approx(expected, rel=1e-5)
+
+
+def test_compiled_trees_single_leaf_trees():
+    # Constant labels: the booster's trees have no splits at all
+    X = np.random.default_rng(2).normal(size=(200, NUM_FEATURES)).astype(np.float32)
+    booster = train(X, np.ones(200, dtype=np.float32), rounds=3)
+    compiled = CompiledTrees(booster)
+    assert compiled.depth == 0
+    expected = booster.predict(xgb.DMatrix(X[:5]))
+    np.testing.assert_allclose([compiled.predict(row) for row in X[:5]], expected, rtol=1e-5)
+
+
+def test_unsupported_objective_falls_back_to_inplace_predict():
+    X, y = training_data(np.random.default_rng(3), n=500)
+    booster = train(X, y, rounds=5, objective="reg:squarederror")
+    with pytest.raises(ValueError):
+        CompiledTrees(booster)
+    model = RiskModel(booster, [f"f{i}" for i in range(NUM_FEATURES)])
+    assert model.compiled is None
+    row = np.nan_to_num(X[0])
+    assert model.predict(row) == pytest.approx(float(booster.inplace_predict(row[None])[0]), rel=1e-6)
+
+
+def test_risk_model_paths_agree(booster):
+    rng = np.random.default_rng(4)
+    X = rng.normal(size=(300, NUM_FEATURES)).astype(np.float32)
+    names = [f"f{i}" for i in range(NUM_FEATURES)]
+    fast = RiskModel(booster, names, batch_size=64)
+    slow = RiskModel(booster, names, compile_trees=False)
+    per_tick = np.array([fast.predict(row) for row in X])
+    np.testing.assert_allclose(per_tick, [slow.predict(row) for row in X], rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(fast.predict_batch(X), per_tick, rtol=1e-5, atol=1e-6)
+    assert fast.predict_batch(np.empty((0, NUM_FEATURES))).shape == (0,)
+    with pytest.raises(ValueError):
+        fast.predict_batch(X[:, :3])
+    stats = fast.latency_stats()
+    assert stats["calls"] == 300 and stats["p50_us"] <= stats["max_us"]
+
+
+def test_save_load_round_trip(booster, tmp_path):
+    names = [f"f{i}" for i in range(NUM_FEATURES)]
+    model = RiskModel(booster, names, horizon_s=2.5)
+    path = tmp_path / "risk_model.ubj"
+    model.save(path)
+    loaded = RiskModel.load(path)
+    assert loaded.feature_names == names and loaded.horizon_s == 2.5
+    row = np.random.default_rng(5).normal(size=NUM_FEATURES).astype(np.float32)
+    assert loaded.predict(row) == pytest.approx(model.predict(row), rel=1e-6)
+
+
+def test_estimator_with_predict_proba():
+    sklearn_linear = pytest.importorskip("sklearn.linear_model")
+    X, y = training_data(np.random.default_rng(6), n=500, missing=0.0)
+    estimator = sklearn_linear.LogisticRegression().fit(X, y)
+    model = RiskModel(estimator, [f"f{i}" for i in range(NUM_FEATURES)])
+    assert model.predict(X[0]) == pytest.approx(estimator.predict_proba(X[:1])[0, 1], rel=1e-5)
+    np.testing.assert_allclose(model.predict_batch(X[:10]), estimator.predict_proba(X[:10])[:, 1], rtol=1e-5)
+    with pytest.raises(TypeError):
+        model.save("unused.ubj")
+    with pytest.raises(TypeError):
+        RiskModel(object(), ["f0"])
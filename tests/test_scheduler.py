@@ -0,0 +1,44 @@
+# Tests for the tick scheduler's planning degradation (AIMD candidate count)
+
+import time
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.planning.trajectory_sampler import TrajectorySampler
+from robust_autonomy_stack.utils.scheduler import CUT_CANDIDATES, TickScheduler
+
+
+def planning_tick(scheduler, sampler, sleep_s=0.0):
+    scheduler.begin_tick()
+    with scheduler.stage("planning"):
+        batch = sampler.sample(0.0, 0.0, 0.0, 5.0, max_candidates=scheduler.max_candidates)
+        time.sleep(sleep_s)
+    scheduler.end_tick()
+    return len(batch)
+
+
+def test_planning_overrun_cuts_and_restores_candidates():
+    sampler = TrajectorySampler(StackConfig())
+    full = sampler.num_candidates
+    # 40 ms period: the planning budget is 10 ms
+    scheduler = TickScheduler(0.04, realtime=False, full_candidates=full, min_candidates=6)
+    assert planning_tick(scheduler, sampler) == full
+
+    counts = [planning_tick(scheduler, sampler, sleep_s=0.02) for _ in range(6)]
+    assert counts[0] == full  # the cut applies from the next tick
+    assert counts[1] < full and counts == sorted(counts, reverse=True)
+    assert scheduler.max_candidates == 6
+    assert scheduler.stats.degradations[CUT_CANDIDATES] >= 5
+
+    while scheduler.max_candidates != full:
+        planning_tick(scheduler, sampler)
+    assert planning_tick(scheduler, sampler) == full
+
+
+def test_no_candidate_count_means_no_cut():
+    scheduler = TickScheduler(0.04, realtime=False)
+    scheduler.begin_tick()
+    with scheduler.stage("planning"):
+        time.sleep(0.02)
+    scheduler.end_tick()
+    assert scheduler.max_candidates is None
+    assert scheduler.stats.stage_overruns["planning"] == 1
@@ -0,0 +1,90 @@
+# Tests for the shared-memory seqlock ring used by the simulator transport
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.adapters.ego_state import new_ego_record
+from robust_autonomy_stack.adapters.shm_transport import (
+    ACTION_DTYPE,
+    ShmRing,
+    _publish_observation,
+    observation_dtype,
+)
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRing.create(ACTION_DTYPE, 4)
+    yield ring
+    ring.close()
+
+
+def publish_action(ring, value):
+    def fill(record):
+        record["command"] = 0
+        record["seed"] = -1
+        record["action"] = (value, -value)
+
+    return ring.publish(fill)
+
+
+def test_read_round_trip_and_lapping(ring):
+    out = np.zeros((), dtype=ACTION_DTYPE)
+    for i in range(3):
+        publish_action(ring, float(i))
+    assert ring.read(1, out) and out["action"].tolist() == [1.0, -1.0]
+    assert ring.wait_for(3, timeout=0.0)
+    for i in range(3, 6):
+        publish_action(ring, float(i))
+    assert not ring.read(1, out)  # slot 1 now holds record 5
+    assert ring.read(5, out) and out["action"][0] == 5.0
+
+
+def test_read_of_abandoned_slot_raises(ring):
+    publish_action(ring, 1.0)
+    ring.seqs[0] += 1  # writer died halfway through rewriting slot 0
+    out = np.zeros((), dtype=ACTION_DTYPE)
+    with pytest.raises(RuntimeError):
+        ring.read(0, out, alive=lambda: False)
+    with pytest.raises(RuntimeError):
+        ring.read(0, out, timeout=0.01)
+
+
+def test_wait_for_gives_up(ring):
+    assert not ring.wait_for(1, timeout=0.01)
+    assert not ring.wait_for(1, timeout=60.0, alive=lambda: False)
+
+
+class StubAdapter:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def get_ego_record(self, out):
+        out[()] = new_ego_record()
+        out["speed"] = 3.0
+        return out
+
+    def get_lane_index(self):
+        return ("a", "b", 1)
+
+    def snapshot_state(self):
+        return self.snapshot
+
+
+def test_observation_record_carries_the_snapshot():
+    snapshot = np.arange(15, dtype=np.float64).reshape(3, 5)
+    record = np.zeros((), dtype=observation_dtype((4,), None, max_vehicles=8))
+    info = {"crash_vehicle": True}
+    held = np.array([0.1, 0.6])
+    _publish_observation(record, 7, np.ones(4), 0.5, False, False, info, StubAdapter(snapshot), False, held)
+    assert record["step"] == 7 and record["crash"] and record["ego"]["speed"] == 3.0
+    assert record["applied_action"].tolist() == [0.1, 0.6]
+    assert str(record["lane"]) == "('a', 'b', 1)"
+    assert record["num_vehicles"] == 3
+    np.testing.assert_array_equal(record["vehicles"][:3], snapshot)
+
+    # Larger scenes keep the true count, so the client knows to ask over the pipe
+    small = np.zeros((), dtype=observation_dtype((4,), None, max_vehicles=2))
+    _publish_observation(small, 0, np.ones(4), 0.0, False, False, {}, StubAdapter(snapshot), False, held)
+    assert small["num_vehicles"] == 3
+    np.testing.assert_array_equal(small["vehicles"], snapshot[:2])
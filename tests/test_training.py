@@ -0,0 +1,196 @@
+# Tests for the out-of-core risk model training pipeline
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("xgboost")
+
+from robust_autonomy_stack.safety.features import FEATURE_NAMES  # noqa: E402
+from robust_autonomy_stack.safety.training import (  # noqa: E402
+    MODEL_FILE,
+    SUMMARY_FILE,
+    ShardIterator,
+    build_shard_labels,
+    write_feature_shards,
+    failure_labels,
+    label_cache_path,
+    train_risk_model,
+)
+
+
+def reference_labels(episode_id, sim_time_s, failure, horizon_s):
+    # Brute force: any failing row of the same episode in (t, t + horizon_s]
+    labels = np.zeros(episode_id.shape[0], dtype=np.uint8)
+    for i in range(episode_id.shape[0]):
+        later = (episode_id == episode_id[i]) & (sim_time_s > sim_time_s[i])
+        labels[i] = np.any(later & failure & (sim_time_s - sim_time_s[i] <= horizon_s))
+    return labels
+
+
+def random_episodes(rng, num_episodes=8, dt=0.1):
+    episode_id, sim_time_s, failure = [], [], []
+    for episode in range(num_episodes):
+        n = int(rng.integers(1, 60))
+        episode_id.append(np.full(n, episode))
+        sim_time_s.append(np.arange(n) * dt)
+        fail = rng.random(n) < 0.05
+        if rng.random() < 0.5:
+            fail[-1] = True  # terminal crash
+        failure.append(fail)
+    return np.concatenate(episode_id), np.concatenate(sim_time_s), np.concatenate(failure)
+
+
+@pytest.mark.parametrize("horizon_s", [0.0, 0.1, 0.35, 2.0, 100.0])
+def test_failure_labels_match_brute_force(horizon_s):
+    rng = np.random.default_rng(int(horizon_s * 100))
+    episode_id, sim_time_s, failure = random_episodes(rng)
+    order = rng.permutation(episode_id.shape[0])  # rows in any order
+    args = episode_id[order], sim_time_s[order], failure[order]
+    np.testing.assert_array_equal(failure_labels(*args, horizon_s), reference_labels(*args, horizon_s))
+
+
+def test_failure_labels_do_not_cross_episodes():
+    # Episode 0 never fails; episode 1 fails on its first tick
+    episode_id = np.array([0, 0, 0, 1, 1])
+    sim_time_s = np.array([0.0, 0.1, 0.2, 0.0, 0.1])
+    failure = np.array([False, False, False, True, False])
+    assert failure_labels(episode_id, sim_time_s, failure, 10.0).tolist() == [0, 0, 0, 0, 0]
+
+
+def test_failure_labels_empty():
+    empty = np.empty(0)
+    assert failure_labels(empty, empty, empty.astype(bool), 1.0).shape == (0,)
+
+
+def write_shard(path, rng, first_episode, num_episodes, row_group_size=32):
+    episode_id, sim_time_s, failure = random_episodes(rng, num_episodes)
+    episode_id = episode_id + first_episode
+    n = episode_id.shape[0]
+    columns = {"episode_id": episode_id, "step": np.round(sim_time_s / 0.1).astype(np.int32),
+               "sim_time_s": sim_time_s}
+    # Feature 0 carries signal so the model has something to learn
+    columns.update({name: rng.normal(size=n).astype(np.float32) for name in FEATURE_NAMES})
+    columns[FEATURE_NAMES[0]] = (failure_labels(episode_id, sim_time_s, failure, 1.0)
+                                 + rng.normal(0, 0.3, n)).astype(np.float32)
+    columns["crash"] = failure
+    columns["out_of_road"] = np.zeros(n, dtype=bool)
+    pq.write_table(pa.table(columns), path, row_group_size=row_group_size)
+    return columns
+
+
+def test_build_shard_labels_and_cache(tmp_path):
+    rng = np.random.default_rng(0)
+    shard = tmp_path / "shard_00000.parquet"
+    columns = write_shard(shard, rng, 0, 5)
+    rows, positives = build_shard_labels(shard, 1.0, tmp_path / "cache")
+    expected = reference_labels(columns["episode_id"], columns["sim_time_s"], columns["crash"], 1.0)
+    cache = label_cache_path(shard, 1.0, tmp_path / "cache")
+    np.testing.assert_array_equal(np.load(cache), expected)
+    assert (rows, positives) == (expected.shape[0], int(expected.sum()))
+
+    # A fresh cache is reused as-is; other horizons get their own file
+    np.save(cache, np.zeros_like(expected))
+    assert build_shard_labels(shard, 1.0, tmp_path / "cache") == (rows, 0)
+    assert label_cache_path(shard, 2.0, tmp_path / "cache") != cache
+
+
+def test_label_cache_is_keyed_on_the_shard(tmp_path):
+    rng = np.random.default_rng(3)
+    cache = tmp_path / "cache"
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = tmp_path / "a" / "shard_00000.parquet"
+    other = tmp_path / "b" / "shard_00000.parquet"  # same name, different data
+    write_shard(first, rng, 0, 3)
+    columns = write_shard(other, rng, 0, 6)
+    build_shard_labels(first, 1.0, cache)
+    assert label_cache_path(first, 1.0, cache) != label_cache_path(other, 1.0, cache)
+    rows, _ = build_shard_labels(other, 1.0, cache)
+    assert rows == columns["episode_id"].shape[0]
+
+    # Rewriting a shard in place invalidates its labels
+    path_before = label_cache_path(first, 1.0, cache)
+    columns = write_shard(first, rng, 0, 5)
+    bump = first.stat()
+    os.utime(first, ns=(bump.st_atime_ns, bump.st_mtime_ns + 10**9))
+    assert label_cache_path(first, 1.0, cache) != path_before
+    assert build_shard_labels(first, 1.0, cache)[0] == columns["episode_id"].shape[0]
+
+
+def test_shard_iterator_rejects_misaligned_labels(tmp_path):
+    shard = tmp_path / "shard_00000.parquet"
+    write_shard(shard, np.random.default_rng(4), 0, 3)
+    labels = tmp_path / "labels.npy"
+    np.save(labels, np.zeros(2, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        ShardIterator([shard], [labels], list(FEATURE_NAMES[:1]))
+
+
+def test_write_feature_shards_removes_stale_shards(tmp_path, monkeypatch):
+    from robust_autonomy_stack.safety import training
+
+    written = []
+    monkeypatch.setattr(training, "_write_shard", lambda group, first, path, rows: written.append(path))
+    (tmp_path / "shard_00005.parquet").write_bytes(b"old")
+    (tmp_path / "notes.txt").write_text("kept")
+    paths = write_feature_shards([tmp_path / f"run{i}" for i in range(3)], tmp_path,
+                                 episodes_per_shard=2, num_workers=1)
+    assert [p.name for p in paths] == ["shard_00000.parquet", "shard_00001.parquet"] and written == paths
+    assert not (tmp_path / "shard_00005.parquet").exists()
+    assert (tmp_path / "notes.txt").exists()
+
+
+def test_shard_iterator_streams_every_row_group(tmp_path):
+    rng = np.random.default_rng(1)
+    shards = [tmp_path / f"shard_{i:05d}.parquet" for i in range(2)]
+    written = [write_shard(path, rng, 10 * i, 4, row_group_size=17) for i, path in enumerate(shards)]
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    for shard in shards:
+        build_shard_labels(shard, 1.0, cache)
+    names = list(FEATURE_NAMES[:3])
+    iterator = ShardIterator(shards, [label_cache_path(s, 1.0, cache) for s in shards], names)
+
+    batches = []
+    while iterator.next(lambda data, label, feature_names: batches.append((data, label))):
+        pass
+    features = np.concatenate([b[0] for b in batches])
+    labels = np.concatenate([b[1] for b in batches])
+    expected = np.concatenate([np.column_stack([w[name] for name in names]) for w in written])
+    np.testing.assert_array_equal(features, expected)
+    np.testing.assert_array_equal(
+        labels, np.concatenate([np.load(label_cache_path(s, 1.0, cache)) for s in shards])
+    )
+    assert len(batches) > len(shards)  # several row groups per shard
+    iterator.reset()
+    assert iterator.next(lambda **kwargs: None)
+
+
+@pytest.mark.parametrize("external_memory", [False, True])
+def test_train_risk_model_end_to_end(tmp_path, external_memory):
+    rng = np.random.default_rng(2)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(3):
+        write_shard(data_dir / f"shard_{i:05d}.parquet", rng, 100 * i, 20)
+    model = train_risk_model(data_dir, tmp_path / "model", horizon_s=1.0, num_rounds=5,
+                             external_memory=external_memory, num_workers=1)
+    assert (tmp_path / "model" / MODEL_FILE).is_file()
+    with open(tmp_path / "model" / SUMMARY_FILE) as f:
+        summary = json.load(f)
+    assert summary["shards"] == 3 and summary["rows"] >= summary["train_rows"] > 0
+    assert model.horizon_s == 1.0 and model.feature_names == list(FEATURE_NAMES)
+    risky = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+    safe = risky.copy()
+    risky[0], safe[0] = 1.0, 0.0
+    assert model.predict(risky) > model.predict(safe)
+
+
+def test_train_risk_model_without_shards(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        train_risk_model(tmp_path, tmp_path / "model")
@@ -0,0 +1,96 @@
+# Tests for the template-based candidate trajectory sampler
+
+import math
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.planning.trajectory_sampler import (
+    STATE_A,
+    STATE_DIM,
+    STATE_V,
+    STATE_X,
+    STATE_Y,
+    STATE_YAW,
+    TrajectorySampler,
+)
+
+
+@pytest.fixture
+def config():
+    return StackConfig()
+
+
+def test_shape_and_grid(config):
+    sampler = TrajectorySampler(config)
+    batch = sampler.sample(0.0, 0.0, 0.0, 5.0)
+    n = len(config.lateral_offsets) * len(config.speed_factors)
+    t = int(round(config.planning_horizon_s / config.planning_dt))
+    assert sampler.num_candidates == n == len(batch)
+    assert batch.states.shape == (n, t, STATE_DIM)
+    np.testing.assert_allclose(batch.times, config.planning_dt * np.arange(1, t + 1))
+    # Offset-major grid: candidate i = (offset i // S, speed i % S)
+    s = len(config.speed_factors)
+    np.testing.assert_allclose(batch.offsets, np.repeat(config.lateral_offsets, s))
+    end_speeds = [min(f * config.target_speed_mps, config.max_speed_mps) for f in config.speed_factors]
+    np.testing.assert_allclose(batch.end_speeds, np.tile(end_speeds, len(config.lateral_offsets)))
+
+
+def test_endpoints_in_ego_and_world_frames(config):
+    # The default horizon covers both transitions, so every candidate ends exactly at
+    # its lateral offset and end speed, with zero acceleration
+    sampler = TrajectorySampler(config)
+    batch = sampler.sample(0.0, 0.0, 0.0, 5.0)
+    np.testing.assert_allclose(batch.states[:, -1, STATE_Y], batch.offsets, atol=1e-12)
+    np.testing.assert_allclose(batch.states[:, -1, STATE_V], batch.end_speeds)
+    np.testing.assert_allclose(batch.states[:, -1, STATE_A], 0.0, atol=1e-12)
+    np.testing.assert_allclose(batch.states[:, -1, STATE_YAW], 0.0, atol=1e-12)
+    ego_frame = batch.states.copy()
+
+    # Same candidates from a rotated, translated ego pose
+    batch = sampler.sample(5.0, 2.0, math.pi / 2, 5.0)
+    np.testing.assert_allclose(batch.states[..., STATE_X], 5.0 - ego_frame[..., STATE_Y], atol=1e-9)
+    np.testing.assert_allclose(batch.states[..., STATE_Y], 2.0 + ego_frame[..., STATE_X], atol=1e-9)
+    np.testing.assert_allclose(batch.states[..., STATE_YAW], ego_frame[..., STATE_YAW] + math.pi / 2)
+    np.testing.assert_allclose(batch.states[..., STATE_V], ego_frame[..., STATE_V])
+
+
+def test_constant_speed_straight_candidate(config):
+    config = StackConfig(lateral_offsets=[0.0], speed_factors=[0.5])
+    speed = 0.5 * config.target_speed_mps
+    batch = TrajectorySampler(config).sample(1.0, -1.0, 0.0, speed)
+    np.testing.assert_allclose(batch.states[0, :, STATE_X], 1.0 + speed * batch.times)
+    np.testing.assert_allclose(batch.states[0, :, STATE_Y], -1.0)
+    np.testing.assert_allclose(batch.states[0, :, STATE_V], speed)
+
+
+def test_max_candidates_subset(config):
+    sampler = TrajectorySampler(config)
+    full = sampler.sample(3.0, 4.0, 0.3, 7.0)
+    full_states = full.states.copy()  # the next sample() reuses the buffer
+    n = sampler.num_candidates
+
+    subset = sampler.sample(3.0, 4.0, 0.3, 7.0, max_candidates=6)
+    index = subset.template_index
+    assert len(subset) == 6 and index[0] == 0 and index[-1] == n - 1
+    assert np.all(np.diff(index) > 0)
+    np.testing.assert_allclose(subset.states, full_states[index])
+    np.testing.assert_allclose(subset.offsets, full.offsets[index])
+
+    assert len(sampler.sample(0.0, 0.0, 0.0, 0.0, max_candidates=1)) == 1
+    assert len(sampler.sample(0.0, 0.0, 0.0, 0.0, max_candidates=10 * n)) == n
+    assert sampler.select(None).tolist() == list(range(n))
+
+
+def test_degenerate_configs_are_rejected():
+    with pytest.raises(ValidationError):
+        StackConfig(planning_horizon_s=0.05, planning_dt=0.1)
+    with pytest.raises(ValidationError):
+        StackConfig(lateral_offsets=[])
+    with pytest.raises(ValidationError):
+        StackConfig(speed_factors=[])
+    # A horizon of exactly one step gives single-sample candidates
+    config = StackConfig(planning_horizon_s=0.1, planning_dt=0.1)
+    assert TrajectorySampler(config).sample(0.0, 0.0, 0.0, 1.0).states.shape[1] == 1
@@ -0,0 +1,89 @@
+# Tests for batched trajectory scoring against hand-computed trajectories
+
+import math
+
+import numpy as np
+import pytest
+
+from robust_autonomy_stack.config.schema import StackConfig
+from robust_autonomy_stack.planning.collision_check import CollisionResult
+from robust_autonomy_stack.planning.trajectory_sampler import STATE_DIM, CandidateBatch
+from robust_autonomy_stack.planning.trajectory_scoring import TrajectoryScorer
+
+
+def make_batch(speeds, accels, yaws, offsets, dt=0.5):
+    speeds = np.asarray(speeds, dtype=float)
+    n, t = speeds.shape
+    states = np.zeros((n, t, STATE_DIM))
+    states[..., 2], states[..., 3], states[..., 4] = yaws, speeds, accels
+    return CandidateBatch(
+        states=states,
+        offsets=np.asarray(offsets, dtype=float),
+        end_speeds=speeds[:, -1],
+        template_index=np.arange(n),
+        times=dt * np.arange(1, t + 1),
+    )
+
+
+def collision(collides, first_step):
+    collides = np.asarray(collides, dtype=bool)
+    return CollisionResult(collides, np.asarray(first_step), np.full(collides.shape[0], np.inf))
+
+
+@pytest.fixture
+def scorer():
+    return TrajectoryScorer(StackConfig(target_speed_mps=10.0, max_speed_mps=7.0))
+
+
+@pytest.fixture
+def batch():
+    # 0: cruise at 10 m/s, straight; 1: speeds up from 5 to 8 m/s while turning left
+    return make_batch(
+        speeds=[[10.0, 10.0, 10.0], [5.0, 6.0, 8.0]],
+        accels=[[0.0, 0.0, 0.0], [2.0, 2.0, 4.0]],
+        yaws=[[0.0, 0.0, 0.0], [0.0, 0.1, 0.3]],
+        offsets=[0.0, 2.0],
+    )
+
+
+def test_terms_match_hand_computation(scorer, batch):
+    result = scorer.score(batch, collision([False, True], [3, 1]), drivable_offsets=(-1.0, 1.0))
+    terms = result.terms
+    # Collision: 1 + (1 - first_step / T)
+    np.testing.assert_allclose(terms["collision"], [0.0, 1.0 + 2.0 / 3.0])
+    # Progress: 1 - travelled / (target * horizon) = 1 - 19 * 0.5 / 15
+    np.testing.assert_allclose(terms["progress"], [0.0, 1.0 - 9.5 / 15.0])
+    # Comfort: accel (4+4+16)/9/3, jerk [0, 4] -> 16/25/2, lateral accel [1.2, 3.2] -> (0.36+2.56)/2
+    np.testing.assert_allclose(terms["comfort"], [0.0, 24.0 / 27.0 + 0.32 + 1.46])
+    # Legality: mean overspeed over max_speed 7, plus 1 m outside the drivable band
+    np.testing.assert_allclose(terms["legality"], [3.0 / 7.0, (8.0 / 7.0 - 1.0) / 3.0 + 1.0])
+
+    weights = scorer.weights
+    expected = sum(weights[name] * terms[name] for name in terms)
+    np.testing.assert_allclose(result.costs, expected)
+    assert result.best_index == 0 and result.best_cost == pytest.approx(10.0 * 3.0 / 7.0)
+    assert result.margin() == pytest.approx(expected[1] - expected[0])
+
+
+def test_skip_colliding(scorer, batch):
+    result = scorer.score(batch, collision([False, True], [3, 1]), skip_colliding=True)
+    assert result.num_skipped == 1 and math.isinf(result.costs[1])
+    assert np.isnan(result.terms["progress"][1]) and result.terms["collision"][1] > 0
+    assert result.best_index == 0 and result.margin() == math.inf
+
+    # When everything collides, every candidate is scored in full
+    result = scorer.score(batch, collision([True, True], [2, 1]), skip_colliding=True)
+    assert result.num_skipped == 0 and np.isfinite(result.costs).all()
+    assert result.best_index == 0  # later collision, less urgency
+
+
+def test_empty_and_single_step_batches(scorer):
+    empty = make_batch(np.empty((0, 3)), np.empty((0, 3)), np.empty((0, 3)), [])
+    result = scorer.score(empty, collision([], []))
+    assert result.costs.shape == (0,) and result.best_index == -1
+    assert result.best_cost == math.inf and result.margin() == math.inf
+
+    single = make_batch([[10.0], [4.0]], [[0.0], [3.0]], [[0.0], [0.0]], [0.0, 0.0], dt=0.2)
+    result = scorer.score(single, collision([False, False], [1, 1]))
+    np.testing.assert_allclose(result.terms["comfort"], [0.0, 1.0])
+    np.testing.assert_allclose(result.terms["progress"], [0.0, 0.6])
@@ -0,0 +1,161 @@
+# Tests for the cached scenario corpus and explicit scenario loading
+
+import os
+
+import pytest
+
+from robust_autonomy_stack.config.schema import BenchmarkConfig, ScenarioConfig
+from robust_autonomy_stack.evaluation.benchmark import expand_suite
+from robust_autonomy_stack.scenarios import yaml_loader
+from robust_autonomy_stack.scenarios.yaml_loader import ScenarioCorpus, load_scenarios
+
+
+def scenario_yaml(name, map_type="S", density=0.1, agents=10, seed=None):
+    text = f"name: {name}\nmap_type: {map_type}\ntraffic_density: {density}\nnum_agents: {agents}\n"
+    return text + (f"seed: {seed}\n" if seed is not None else "")
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    root = tmp_path / "scenarios"
+    (root / "nested").mkdir(parents=True)
+    (root / "a.yaml").write_text(scenario_yaml("a", "S", 0.1, 5, seed=1))
+    (root / "b.yml").write_text(scenario_yaml("b", "X", 0.5, 20))
+    (root / "nested" / "c.yaml").write_text(scenario_yaml("c", "X", 0.9, 40, seed=3))
+    (root / "bad.yaml").write_text("name: bad\ntraffic_density: 7.0\n")
+    (root / "broken.yaml").write_text("name: [unclosed\n")
+    (root / "suite.yaml").write_text("scenarios: ['*.yaml']\n")
+    (root / "notes.txt").write_text("not yaml")
+    return root
+
+
+def open_corpus(root, tmp_path, **kwargs):
+    return ScenarioCorpus(root, cache_dir=tmp_path / "cache", **kwargs)
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_corpus_contents_match_direct_validation(corpus_dir, tmp_path):
+    corpus = open_corpus(corpus_dir, tmp_path)
+    items = dict(corpus.items())
+    assert sorted(p.name for p in items) == ["a.yaml", "b.yml", "c.yaml"]
+    for path, config in items.items():
+        assert config == ScenarioConfig.from_yaml(path)
+    assert sorted(p.name for p in corpus.errors) == ["bad.yaml", "broken.yaml"]
+    assert len(open_corpus(corpus_dir, tmp_path, recursive=False)) == 2
+
+
+def test_index_invalidation_mtime_vs_digest(corpus_dir, tmp_path):
+    first = open_corpus(corpus_dir, tmp_path)
+    assert first.reparsed == 6  # every YAML (suites and invalid files included)
+    assert open_corpus(corpus_dir, tmp_path).reparsed == 0
+
+    # Touched but unchanged: the digest matches, so nothing is re-validated
+    bump_mtime(corpus_dir / "a.yaml")
+    touched = open_corpus(corpus_dir, tmp_path)
+    assert touched.reparsed == 0
+    assert open_corpus(corpus_dir, tmp_path).reparsed == 0  # new mtime was stored
+
+    # Same size, new mtime, new content: re-parsed through the digest check
+    path = corpus_dir / "a.yaml"
+    path.write_text(path.read_text().replace("seed: 1", "seed: 2"))
+    bump_mtime(path)
+    changed = open_corpus(corpus_dir, tmp_path)
+    assert changed.reparsed == 1
+    assert changed.get(path).seed == 2
+
+    # Added and removed files
+    (corpus_dir / "d.yaml").write_text(scenario_yaml("d"))
+    (corpus_dir / "b.yml").unlink()
+    updated = open_corpus(corpus_dir, tmp_path)
+    assert updated.reparsed == 1
+    assert sorted(c.name for c in updated) == ["a", "c", "d"]
+
+
+def test_schema_change_rebuilds_index(corpus_dir, tmp_path, monkeypatch):
+    open_corpus(corpus_dir, tmp_path)
+    monkeypatch.setattr(yaml_loader, "_SCHEMA_HASH", "changed")
+    assert open_corpus(corpus_dir, tmp_path).reparsed == 6
+
+
+def test_corrupt_index_is_rebuilt(corpus_dir, tmp_path):
+    corpus = open_corpus(corpus_dir, tmp_path)
+    corpus.cache_path.write_bytes(b"not an npz")
+    assert open_corpus(corpus_dir, tmp_path).reparsed == 6
+
+
+def test_index_writes_leave_no_temp_files(corpus_dir, tmp_path):
+    corpus = open_corpus(corpus_dir, tmp_path)
+    assert os.listdir(tmp_path / "cache") == [corpus.cache_path.name]
+
+
+def test_uncached_corpus_writes_nothing(corpus_dir, tmp_path):
+    corpus = ScenarioCorpus(corpus_dir, use_cache=False)
+    assert corpus.cache_path is None and len(corpus) == 3
+    assert ScenarioCorpus(corpus_dir, use_cache=False).reparsed == 6
+
+
+def test_filter(corpus_dir, tmp_path):
+    corpus = open_corpus(corpus_dir, tmp_path)
+    names = lambda view: sorted(c.name for c in view)  # noqa: E731
+    assert names(corpus.filter(map_type="X")) == ["b", "c"]
+    assert names(corpus.filter(map_type=["S", "X"])) == ["a", "b", "c"]
+    assert names(corpus.filter(traffic_density=(0.2, None))) == ["b", "c"]
+    assert names(corpus.filter(num_agents=(None, 20))) == ["a", "b"]
+    assert names(corpus.filter(num_agents=40)) == ["c"]
+    assert names(corpus.filter(name="[ab]")) == ["a", "b"]
+    assert names(corpus.filter(map_type="X").filter(num_agents=(0, 30))) == ["b"]
+    assert len(corpus.filter(map_type="nope")) == 0
+    assert len(corpus) == 3  # views do not change the corpus
+
+
+def test_get(corpus_dir, tmp_path):
+    corpus = open_corpus(corpus_dir, tmp_path)
+    assert corpus.get("nested/c.yaml").name == "c"
+    assert corpus.get(corpus_dir / "a.yaml").seed == 1
+    with pytest.raises(KeyError):
+        corpus.get("missing.yaml")
+    with pytest.raises(ValueError):
+        corpus.get("bad.yaml")
+
+
+def test_empty_directory(tmp_path):
+    (tmp_path / "empty").mkdir()
+    corpus = open_corpus(tmp_path / "empty", tmp_path)
+    assert len(corpus) == 0 and list(corpus) == [] and corpus.errors == {}
+    assert len(corpus.filter(map_type="X", traffic_density=(0, 1))) == 0
+    assert len(open_corpus(tmp_path / "empty", tmp_path)) == 0
+
+
+def test_load_scenarios_parses_only_listed_files(corpus_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(yaml_loader, "SCENARIO_CACHE_DIR", tmp_path / "default_cache")
+    configs = load_scenarios([corpus_dir / "b.yml", corpus_dir / "a.yaml"])
+    assert [c.name for c in configs] == ["b", "a"]
+    assert not (tmp_path / "default_cache").exists()
+    with pytest.raises(ValueError):
+        load_scenarios([corpus_dir / "bad.yaml"])
+    with pytest.raises(ValueError):
+        load_scenarios([corpus_dir / "suite.yaml"])
+
+
+def test_load_scenarios_with_cache(corpus_dir, tmp_path):
+    configs = load_scenarios([corpus_dir / "a.yaml", corpus_dir / "nested" / "c.yaml"], tmp_path / "cache")
+    assert [c.name for c in configs] == ["a", "c"]
+    assert len(list((tmp_path / "cache").glob("*.npz"))) == 2  # one index per directory
+    assert configs == load_scenarios([corpus_dir / "a.yaml", corpus_dir / "nested" / "c.yaml"])
+
+
+def test_expand_suite(corpus_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(yaml_loader, "SCENARIO_CACHE_DIR", tmp_path / "default_cache")
+    suite = BenchmarkConfig(scenarios=["a.yaml", "b.yml"], seeds=[])
+    tasks = expand_suite(suite, corpus_dir)
+    assert [(t.scenario["name"], t.seed) for t in tasks] == [("a", 1), ("b", 0)]
+    assert not (tmp_path / "default_cache").exists()
+    tasks = expand_suite(BenchmarkConfig(scenarios=["*.yml"], seeds=[4, 5]), corpus_dir, tmp_path / "c2")
+    assert [t.seed for t in tasks] == [4, 5]
+    assert any(p.suffix == ".npz" for p in (tmp_path / "c2").iterdir())
+    with pytest.raises(FileNotFoundError):
+        expand_suite(BenchmarkConfig(scenarios=["none*.yaml"]), corpus_dir)